@@ -4,5 +4,16 @@
 from .base import DataSourceBase
 from .tushare_source import TushareSource
 from .datahub import DataHub
+from .rate_limiter import RateLimiter, get_rate_limiter
+from .lake import ParquetLake
+from .catalog import SyncCatalog
+from .coverage import CoverageIndex, get_coverage_index
+from .pit_store import PITStore
+from .panel_store import PanelStore
 
-__all__ = ['DataSourceBase', 'TushareSource', 'DataHub']
+__all__ = [
+    'DataSourceBase', 'TushareSource', 'DataHub',
+    'RateLimiter', 'get_rate_limiter',
+    'ParquetLake', 'SyncCatalog', 'CoverageIndex', 'get_coverage_index',
+    'PITStore', 'PanelStore',
+]
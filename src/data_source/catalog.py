@@ -0,0 +1,131 @@
+"""数据同步元数据目录 (水位线)"""
+
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import pandas as pd
+
+from ..utils.io import load_parquet, save_parquet, ensure_dir
+
+
+# 全市场级水位线使用的占位股票代码
+MARKET_CODE = ''
+
+
+class SyncCatalog:
+    """
+    数据同步水位线目录
+
+    记录每个数据集 (及每只股票) 已同步到的最新 trade_date / ann_date / period，
+    增量更新时只需拉取水位线之后的数据
+
+    存储为 {meta_path}/sync_catalog.parquet，列:
+        dataset, ts_code, field, value, updated_at
+    """
+
+    COLUMNS = ['dataset', 'ts_code', 'field', 'value', 'updated_at']
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: 目录文件路径
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._marks: Dict[tuple, tuple] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        df = load_parquet(self.path)
+        for row in df.itertuples(index=False):
+            self._marks[(row.dataset, row.ts_code, row.field)] = (
+                row.value, row.updated_at
+            )
+
+    def save(self) -> None:
+        """持久化到磁盘 (原子替换)"""
+        with self._lock:
+            rows = [
+                (dataset, ts_code, field, value, updated_at)
+                for (dataset, ts_code, field), (value, updated_at)
+                in self._marks.items()
+            ]
+        df = pd.DataFrame(rows, columns=self.COLUMNS)
+        ensure_dir(self.path.parent)
+        tmp_path = self.path.with_name(f'.{self.path.name}.tmp')
+        save_parquet(df, tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+    def get(
+        self,
+        dataset: str,
+        field: str,
+        ts_code: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        获取水位线
+
+        Args:
+            dataset: 数据集名称
+            field: 水位字段 ('trade_date', 'ann_date', 'period', 'cal_date')
+            ts_code: 股票代码 (None 表示全市场)
+
+        Returns:
+            水位值 (YYYYMMDD)，未同步过则为 None
+        """
+        key = (dataset, ts_code or MARKET_CODE, field)
+        with self._lock:
+            mark = self._marks.get(key)
+        return mark[0] if mark else None
+
+    def set(
+        self,
+        dataset: str,
+        field: str,
+        value: Optional[str],
+        ts_code: Optional[str] = None,
+        force: bool = False
+    ) -> None:
+        """
+        设置水位线 (默认只前进不后退)
+
+        Args:
+            dataset: 数据集名称
+            field: 水位字段
+            value: 水位值 (YYYYMMDD)
+            ts_code: 股票代码 (None 表示全市场)
+            force: 允许水位回退 (用于重建数据)
+        """
+        if value is None or pd.isna(value):
+            return
+        value = str(value)
+        key = (dataset, ts_code or MARKET_CODE, field)
+        now = datetime.now().strftime('%Y%m%d%H%M%S')
+        with self._lock:
+            current = self._marks.get(key)
+            if force or current is None or value > current[0]:
+                self._marks[key] = (value, now)
+
+    def get_all(self, dataset: str, field: str) -> Dict[str, str]:
+        """获取某数据集所有股票的水位线 {ts_code: value}"""
+        with self._lock:
+            return {
+                ts_code: value
+                for (ds, ts_code, f), (value, _) in self._marks.items()
+                if ds == dataset and f == field and ts_code != MARKET_CODE
+            }
+
+    def to_frame(self) -> pd.DataFrame:
+        """导出为 DataFrame"""
+        with self._lock:
+            rows = [
+                (dataset, ts_code, field, value, updated_at)
+                for (dataset, ts_code, field), (value, updated_at)
+                in self._marks.items()
+            ]
+        return pd.DataFrame(rows, columns=self.COLUMNS)
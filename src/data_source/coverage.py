@@ -0,0 +1,153 @@
+"""本地数据覆盖区间索引"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from ..utils.config import get_data_path
+from ..utils.io import load_parquet, save_parquet, ensure_dir
+
+
+Interval = Tuple[str, str]
+
+
+def _shift_day(value: str, days: int) -> str:
+    return (pd.to_datetime(value) + pd.Timedelta(days=days)).strftime('%Y%m%d')
+
+
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """合并重叠或相邻 (相差一天) 的闭区间"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= _shift_day(merged[-1][1], 1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class CoverageIndex:
+    """
+    本地数据覆盖区间索引
+
+    记录每个 (数据集, 股票) 已从 API 拉取并落地的日期闭区间 (YYYYMMDD)。
+    区间表示"这段时间已请求过"，而非"每天都有数据" (停牌日、非公告日本就无数据)，
+    读取时只需把未覆盖的区间交给 API
+
+    股票代码为 MARKET_CODE ('') 的区间表示按交易日截面同步了全市场数据
+
+    存储为 {meta_path}/coverage.parquet，列: dataset, ts_code, start, end
+    """
+
+    COLUMNS = ['dataset', 'ts_code', 'start', 'end']
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: 索引文件路径
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._intervals: Dict[Tuple[str, str], List[Interval]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        df = load_parquet(self.path)
+        for (dataset, ts_code), group in df.groupby(['dataset', 'ts_code']):
+            self._intervals[(dataset, ts_code)] = merge_intervals(
+                list(zip(group['start'], group['end']))
+            )
+
+    def save(self) -> None:
+        """持久化到磁盘 (原子替换)"""
+        with self._lock:
+            rows = [
+                (dataset, ts_code, start, end)
+                for (dataset, ts_code), intervals in self._intervals.items()
+                for start, end in intervals
+            ]
+        df = pd.DataFrame(rows, columns=self.COLUMNS)
+        ensure_dir(self.path.parent)
+        tmp_path = self.path.with_name(f'.{self.path.name}.{threading.get_ident()}.tmp')
+        save_parquet(df, tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, dataset: str, ts_code: str) -> List[Interval]:
+        """已覆盖的区间列表"""
+        with self._lock:
+            return list(self._intervals.get((dataset, ts_code), []))
+
+    def add(self, dataset: str, ts_code: str, start: str, end: str) -> None:
+        """登记已覆盖区间"""
+        if start > end:
+            return
+        key = (dataset, ts_code)
+        with self._lock:
+            self._intervals[key] = merge_intervals(
+                self._intervals.get(key, []) + [(start, end)]
+            )
+
+    def missing(
+        self,
+        dataset: str,
+        ts_code: str,
+        start: str,
+        end: str
+    ) -> List[Interval]:
+        """
+        计算 [start, end] 中尚未覆盖的区间
+
+        Returns:
+            未覆盖的闭区间列表 (已完全覆盖则为空)
+        """
+        gaps: List[Interval] = []
+        cursor = start
+        for cov_start, cov_end in self.get(dataset, ts_code):
+            if cov_end < cursor:
+                continue
+            if cov_start > end:
+                break
+            if cov_start > cursor:
+                gaps.append((cursor, _shift_day(cov_start, -1)))
+            cursor = _shift_day(cov_end, 1)
+            if cursor > end:
+                return gaps
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def is_covered(
+        self,
+        dataset: str,
+        ts_code: str,
+        start: str,
+        end: str
+    ) -> bool:
+        """[start, end] 是否已完全覆盖"""
+        return not self.missing(dataset, ts_code, start, end)
+
+
+_indexes: Dict[Path, CoverageIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_coverage_index(path: Optional[Union[str, Path]] = None) -> CoverageIndex:
+    """
+    获取进程级共享的覆盖索引 (同一路径只加载一次，避免多实例互相覆盖)
+
+    Args:
+        path: 索引文件路径 (默认 data/meta/coverage.parquet)
+    """
+    if path is None:
+        path = get_data_path('meta') / 'coverage.parquet'
+    path = Path(path).resolve()
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = CoverageIndex(path)
+        return _indexes[path]
@@ -1,15 +1,28 @@
 # src/data_source/datahub.py
 """统一数据入口"""
 
-from typing import Optional, Dict, Any, List, Union
-from pathlib import Path
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, List, Sequence, Callable
 
 import pandas as pd
 
 from ..utils.config import load_config, get_data_path
 from ..utils.logger import get_logger
-from ..utils.io import load_parquet, save_parquet, ensure_dir
-from .tushare_source import TushareSource
+from ..utils.io import load_parquet, save_parquet
+from .tushare_source import TushareSource, split_date_range
+from .lake import ParquetLake
+from .catalog import MARKET_CODE, SyncCatalog
+from .coverage import get_coverage_index
+
+
+# 支持按交易日截面获取的行情数据集
+MARKET_DATASETS = ('daily', 'daily_basic', 'adj_factor')
+
+# 按股票、按公告日增量同步的基本面数据集
+FUNDAMENTAL_DATASETS = (
+    'income', 'balancesheet', 'cashflow', 'fina_indicator', 'dividend'
+)
 
 
 class DataHub:
@@ -41,6 +54,11 @@ class DataHub:
         self.processed_path = get_data_path('processed')
         self.meta_path = get_data_path('meta')
         
+        # 本地数据湖与同步水位线
+        self.coverage = get_coverage_index(self.meta_path / 'coverage.parquet')
+        self.lake = ParquetLake(self.raw_path, coverage=self.coverage)
+        self.catalog = SyncCatalog(self.meta_path / 'sync_catalog.parquet')
+        
         self.logger.info("DataHub 初始化完成")
     
     @property
@@ -50,6 +68,195 @@ class DataHub:
             self._ts_source = TushareSource()
         return self._ts_source
     
+    # =========================================================================
+    # 本地缓存 (read-through)
+    # =========================================================================
+    
+    def _resolve_range(
+        self, 
+        start_date: Optional[str], 
+        end_date: Optional[str]
+    ) -> tuple:
+        """补全缺省的日期区间: [配置起始日期, 今天]"""
+        if start_date is None:
+            start_date = self._default_start_date()
+        if end_date is None:
+            end_date = pd.Timestamp.today().strftime('%Y%m%d')
+        return start_date, end_date
+    
+    def _read_through(
+        self, 
+        dataset: str,
+        ts_code: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        fetch: Callable[[str, str], pd.DataFrame],
+        date_col: str = 'trade_date',
+        chunk_years: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        按股票读取数据: 本地已覆盖的区间直接读数据湖，只向 API 请求未覆盖的区间
+        
+        已由全市场截面 (sync_market) 落地的区间同样视为已覆盖
+        
+        Args:
+            dataset: 数据集名称
+            ts_code: 股票 (或指数) 代码
+            start_date: 开始日期 (None 为配置起始日期)
+            end_date: 结束日期 (None 为今天)
+            fetch: fetch(start, end) -> DataFrame，拉取单个区间
+            date_col: 区间对应的日期列 (行情为 trade_date，财报为 ann_date)
+            chunk_years: 未覆盖区间过长时的分段年数
+        """
+        start_date, end_date = self._resolve_range(start_date, end_date)
+        
+        # 今天的数据可能尚未发布，覆盖区间只登记到昨天
+        today = pd.Timestamp.today().strftime('%Y%m%d')
+        yesterday = self._prev_day(today)
+        
+        # 按股票未覆盖、且全市场截面也未覆盖的区间才需要请求 API
+        gaps = [
+            gap
+            for stock_start, stock_end in self.coverage.missing(
+                dataset, ts_code, start_date, end_date
+            )
+            for gap in self.coverage.missing(dataset, MARKET_CODE, stock_start, stock_end)
+        ]
+        for gap_start, gap_end in gaps:
+            if chunk_years:
+                ranges = split_date_range(gap_start, gap_end, chunk_years)
+            else:
+                ranges = [(gap_start, gap_end)]
+            
+            frames = [fetch(s, e) for s, e in ranges]
+            frames = [f for f in frames if f is not None and not f.empty]
+            if frames:
+                self.lake.write_stock(
+                    dataset, ts_code, pd.concat(frames, ignore_index=True)
+                )
+            self.coverage.add(
+                dataset, ts_code, gap_start, min(gap_end, yesterday)
+            )
+        
+        if gaps:
+            self.coverage.save()
+            self.logger.debug(f"{dataset} {ts_code} 补充拉取区间: {gaps}")
+        
+        # 自动选择布局: 部分区间只在按交易日分区时合并两种布局读取
+        df = self.lake.query(
+            dataset, ts_codes=[ts_code], start_date=start_date, end_date=end_date
+        )
+        if df.empty:
+            return df
+        return df.sort_values(date_col, ascending=False).reset_index(drop=True)
+    
+    def load(
+        self, 
+        dataset: str,
+        ts_codes: List[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        columns: List[str] = None,
+        filters: List = None
+    ) -> pd.DataFrame:
+        """
+        只从本地数据湖读取 (不访问 API)
+        
+        在完整覆盖请求范围的布局中选择扫描量更小的一种
+        (两种布局都不完整时合并读取)，列投影与过滤条件下推到 PyArrow
+        
+        Args:
+            dataset: 数据集名称 ('daily', 'daily_basic', 'adj_factor', ...)
+            ts_codes: 股票代码列表 (None 为全部)
+            start_date: 开始日期
+            end_date: 结束日期
+            columns: 要读取的列
+            filters: 额外过滤条件 (PyArrow DNF 格式)
+        """
+        return self.lake.query(
+            dataset,
+            ts_codes=ts_codes,
+            start_date=start_date,
+            end_date=end_date,
+            columns=columns,
+            filters=filters
+        )
+    
+    def _read_through_date(
+        self, 
+        dataset: str,
+        trade_date: str,
+        fetch: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """按交易日读取截面: 本地分区存在则直接读取，否则拉取并落地"""
+        if self.lake.has_date(dataset, trade_date):
+            return self.lake.read_date(dataset, trade_date)
+        
+        df = fetch()
+        if df is not None and not df.empty:
+            self.lake.write_date(dataset, trade_date, df)
+            self.coverage.add(dataset, MARKET_CODE, trade_date, trade_date)
+            self.coverage.save()
+        return df
+    
+    def _cached_market(
+        self, 
+        dataset: str,
+        ts_code: Optional[str],
+        trade_date: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        chunk_years: int = 3
+    ) -> Optional[pd.DataFrame]:
+        """
+        行情类数据的缓存读取
+        
+        Returns:
+            缓存结果；请求形式无法缓存 (如无股票无日期) 时返回 None
+        """
+        fetch_api = getattr(self.ts, f'get_{dataset}')
+        
+        if trade_date is not None:
+            df = self._read_through_date(
+                dataset, trade_date, lambda: fetch_api(trade_date=trade_date)
+            )
+            if ts_code is not None and df is not None and not df.empty:
+                df = df[df['ts_code'].isin(ts_code.split(','))].reset_index(drop=True)
+            return df
+        
+        if ts_code is None:
+            return None
+        
+        frames = [
+            self._read_through(
+                dataset, code, start_date, end_date,
+                lambda s, e, code=code: fetch_api(ts_code=code, start_date=s, end_date=e),
+                chunk_years=chunk_years
+            )
+            for code in ts_code.split(',')
+        ]
+        frames = [f for f in frames if not f.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
+    def _cached_fundamental(
+        self, 
+        dataset: str,
+        ts_code: str,
+        period: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> pd.DataFrame:
+        """财报类数据的缓存读取 (覆盖区间按公告日 ann_date 计)"""
+        fetch_api = getattr(self.ts, f'get_{dataset}')
+        df = self._read_through(
+            dataset, ts_code, start_date, end_date,
+            lambda s, e: fetch_api(ts_code=ts_code, start_date=s, end_date=e),
+            date_col='ann_date'
+        )
+        if period is not None and not df.empty:
+            df = df[df['end_date'] == period].reset_index(drop=True)
+        return df
+    
     # =========================================================================
     # 股票基础信息
     # =========================================================================
@@ -85,11 +292,17 @@ class DataHub:
         end_date: str = None,
         force_update: bool = False
     ) -> pd.DataFrame:
-        """获取交易日历"""
+        """
+        获取交易日历
+        
+        本地缓存未覆盖 end_date 时，只补充拉取缺失的尾部区间
+        """
         cache_file = self.meta_path / 'trade_cal.parquet'
         
         if self.use_cache and cache_file.exists() and not force_update:
             df = load_parquet(cache_file)
+            if end_date and not df.empty and end_date > df['cal_date'].max():
+                df = self._extend_trade_calendar(df, end_date)
             if start_date or end_date:
                 if start_date:
                     df = df[df['cal_date'] >= start_date]
@@ -101,9 +314,32 @@ class DataHub:
         
         if self.use_cache and not df.empty:
             save_parquet(df, cache_file)
+            self.catalog.set('trade_cal', 'cal_date', df['cal_date'].max(), force=True)
+            self.catalog.save()
         
         return df
     
+    def _extend_trade_calendar(
+        self, 
+        cached: pd.DataFrame, 
+        end_date: str
+    ) -> pd.DataFrame:
+        """拉取缓存日历之后到 end_date 的增量并写回缓存"""
+        last = cached['cal_date'].max()
+        start = (pd.to_datetime(last) + pd.Timedelta(days=1)).strftime('%Y%m%d')
+        delta = self.ts.get_trade_calendar(start, end_date)
+        
+        if delta is None or delta.empty:
+            return cached
+        
+        df = pd.concat([cached, delta], ignore_index=True).drop_duplicates(
+            subset=['cal_date'], keep='last'
+        ).sort_values('cal_date', ascending=False).reset_index(drop=True)
+        save_parquet(df, self.meta_path / 'trade_cal.parquet')
+        self.catalog.set('trade_cal', 'cal_date', df['cal_date'].max())
+        self.catalog.save()
+        return df
+    
     # =========================================================================
     # 市场行情
     # =========================================================================
@@ -119,12 +355,16 @@ class DataHub:
         """
         获取日线行情
         
-        支持按股票代码或按交易日期获取
+        支持按股票代码或按交易日期获取，启用缓存时优先读取本地数据湖
         """
         if use_cache is None:
             use_cache = self.use_cache
         
-        # 直接从 API 获取
+        if use_cache:
+            df = self._cached_market('daily', ts_code, trade_date, start_date, end_date)
+            if df is not None:
+                return df
+        
         return self.ts.get_daily(
             ts_code=ts_code,
             trade_date=trade_date,
@@ -137,9 +377,20 @@ class DataHub:
         ts_code: str = None,
         trade_date: str = None,
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        use_cache: bool = None
     ) -> pd.DataFrame:
         """获取每日指标 (PE/PB/市值等)"""
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        if use_cache:
+            df = self._cached_market(
+                'daily_basic', ts_code, trade_date, start_date, end_date
+            )
+            if df is not None:
+                return df
+        
         return self.ts.get_daily_basic(
             ts_code=ts_code,
             trade_date=trade_date,
@@ -152,9 +403,20 @@ class DataHub:
         ts_code: str = None,
         trade_date: str = None,
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        use_cache: bool = None
     ) -> pd.DataFrame:
         """获取复权因子"""
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        if use_cache:
+            df = self._cached_market(
+                'adj_factor', ts_code, trade_date, start_date, end_date
+            )
+            if df is not None:
+                return df
+        
         return self.ts.get_adj_factor(
             ts_code=ts_code,
             trade_date=trade_date,
@@ -162,6 +424,289 @@ class DataHub:
             end_date=end_date
         )
     
+    def get_trade_dates(
+        self, 
+        start_date: str, 
+        end_date: str
+    ) -> List[str]:
+        """获取日期范围内的交易日列表 (YYYYMMDD, 升序)"""
+        cal = self.get_trade_calendar(start_date, end_date)
+        if 'is_open' in cal.columns:
+            cal = cal[cal['is_open'].astype(int) == 1]
+        dates = cal['cal_date'].astype(str)
+        dates = dates[(dates >= start_date) & (dates <= end_date)]
+        return sorted(dates.unique().tolist())
+    
+    def sync_market(
+        self, 
+        start_date: str, 
+        end_date: str,
+        datasets: Sequence[str] = MARKET_DATASETS,
+        overwrite: bool = False,
+        max_workers: int = None
+    ) -> Dict[str, int]:
+        """
+        按交易日截面同步全市场行情到本地数据湖
+        
+        每个交易日每个数据集只需一次 API 调用 (trade_date=...)，
+        结果写入按交易日分区的 parquet 文件
+        
+        Args:
+            start_date: 开始日期 (YYYYMMDD)
+            end_date: 结束日期 (YYYYMMDD)
+            datasets: 数据集 ('daily', 'daily_basic', 'adj_factor')
+            overwrite: 是否覆盖已存在的交易日分区
+            max_workers: 并发线程数 (默认读取 tushare.max_workers)
+            
+        Returns:
+            各数据集写入的行数
+        """
+        if max_workers is None:
+            max_workers = self.config.get('tushare', {}).get('max_workers', 8)
+        
+        trade_dates = self.get_trade_dates(start_date, end_date)
+        tasks = [
+            (dataset, trade_date)
+            for trade_date in trade_dates
+            for dataset in datasets
+            if overwrite or not self.lake.has_date(dataset, trade_date)
+        ]
+        
+        self.logger.info(
+            f"截面同步 {start_date}-{end_date}: {len(trade_dates)} 个交易日, "
+            f"待下载 {len(tasks)} 个分区"
+        )
+        
+        source = self.ts
+        
+        def sync_one(dataset: str, trade_date: str) -> int:
+            fetch = getattr(source, f'get_{dataset}')
+            df = fetch(trade_date=trade_date)
+            if df is None or df.empty:
+                return 0
+            return self.lake.write_date(dataset, trade_date, df)
+        
+        rows = {dataset: 0 for dataset in datasets}
+        start = time.monotonic()
+        done = 0
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(sync_one, dataset, trade_date): (dataset, trade_date)
+                for dataset, trade_date in tasks
+            }
+            for future in as_completed(futures):
+                dataset, trade_date = futures[future]
+                try:
+                    rows[dataset] += future.result()
+                except Exception as e:
+                    self.logger.warning(f"同步 {dataset} {trade_date} 失败: {e}")
+                done += 1
+                if done % 200 == 0:
+                    elapsed = time.monotonic() - start
+                    self.logger.info(
+                        f"截面同步进度: {done}/{len(tasks)}, "
+                        f"{done / elapsed:.2f} 次/s"
+                    )
+        
+        for dataset in datasets:
+            self._add_market_coverage(dataset, start_date, end_date, trade_dates)
+        self.coverage.save()
+        
+        self.logger.info(
+            f"截面同步完成: {rows}, 耗时 {time.monotonic() - start:.1f}s"
+        )
+        return rows
+    
+    def _add_market_coverage(
+        self, 
+        dataset: str, 
+        start_date: str, 
+        end_date: str,
+        trade_dates: List[str]
+    ) -> None:
+        """登记全市场截面已落地的区间 (在缺失分区的交易日处断开，只登记到昨天)"""
+        end_date = min(end_date, self._prev_day(pd.Timestamp.today().strftime('%Y%m%d')))
+        cursor = start_date
+        for trade_date in trade_dates:
+            if not self.lake.has_date(dataset, trade_date):
+                self.coverage.add(
+                    dataset, MARKET_CODE, cursor, min(self._prev_day(trade_date), end_date)
+                )
+                cursor = self._next_day(trade_date)
+        self.coverage.add(dataset, MARKET_CODE, cursor, end_date)
+    
+    # =========================================================================
+    # 增量同步
+    # =========================================================================
+    
+    def _default_start_date(self) -> str:
+        """配置中的数据起始日期 (YYYYMMDD)"""
+        start = self.config.get('data', {}).get('start_date', '2010-01-01')
+        return pd.to_datetime(start).strftime('%Y%m%d')
+    
+    @staticmethod
+    def _next_day(value: str) -> str:
+        return (pd.to_datetime(value) + pd.Timedelta(days=1)).strftime('%Y%m%d')
+    
+    @staticmethod
+    def _prev_day(value: str) -> str:
+        return (pd.to_datetime(value) - pd.Timedelta(days=1)).strftime('%Y%m%d')
+    
+    def _update_market(
+        self, 
+        dataset: str, 
+        end_date: str,
+        max_workers: int = None
+    ) -> int:
+        """按 trade_date 水位线增量同步行情截面"""
+        mark = self.catalog.get(dataset, 'trade_date')
+        start_date = self._next_day(mark) if mark else self._default_start_date()
+        if start_date > end_date:
+            return 0
+        
+        rows = self.sync_market(
+            start_date, end_date, datasets=(dataset,), max_workers=max_workers
+        )[dataset]
+        
+        # 水位线推进到连续落地的最后一个交易日 (失败/未发布的日期之后不推进)
+        landed = []
+        for trade_date in self.get_trade_dates(start_date, end_date):
+            if not self.lake.has_date(dataset, trade_date):
+                break
+            self.catalog.set(dataset, 'trade_date', trade_date)
+            landed.append(trade_date)
+        
+        # 新截面追加到按股票分区并登记各股票覆盖区间，按股票读取不再请求 API
+        if landed:
+            self.lake.sync_layout(
+                dataset, 'by_stock', start_date=landed[0], end_date=landed[-1]
+            )
+            for ts_code in self.lake.list_stocks(dataset):
+                self.coverage.add(dataset, ts_code, start_date, landed[-1])
+        return rows
+    
+    def _update_fundamental_stock(
+        self, 
+        dataset: str, 
+        ts_code: str, 
+        end_date: str
+    ) -> int:
+        """按 ann_date 水位线增量同步单只股票的基本面数据"""
+        mark = self.catalog.get(dataset, 'ann_date', ts_code=ts_code)
+        start_date = self._next_day(mark) if mark else self._default_start_date()
+        if start_date > end_date:
+            return 0
+        
+        if dataset == 'dividend':
+            # 分红接口不支持日期区间，拉取后按公告日过滤
+            df = self.ts.get_dividend(ts_code=ts_code)
+            if df is not None and not df.empty:
+                df = df[df['ann_date'].notna()]
+                df = df[(df['ann_date'] >= start_date) & (df['ann_date'] <= end_date)]
+        else:
+            fetch = getattr(self.ts, f'get_{dataset}')
+            df = fetch(ts_code=ts_code, start_date=start_date, end_date=end_date)
+        
+        if df is not None and not df.empty:
+            self.lake.write_stock(dataset, ts_code, df)
+        self.coverage.add(
+            dataset, ts_code, start_date,
+            min(end_date, self._prev_day(pd.Timestamp.today().strftime('%Y%m%d')))
+        )
+        if df is None or df.empty:
+            return 0
+        
+        self.catalog.set(dataset, 'ann_date', df['ann_date'].max(), ts_code=ts_code)
+        if 'end_date' in df.columns:
+            self.catalog.set(dataset, 'period', df['end_date'].max(), ts_code=ts_code)
+        return len(df)
+    
+    def _update_fundamental(
+        self, 
+        dataset: str, 
+        ts_codes: Sequence[str],
+        end_date: str,
+        max_workers: int = None
+    ) -> int:
+        """并发增量同步全部股票的基本面数据"""
+        if max_workers is None:
+            max_workers = self.config.get('tushare', {}).get('max_workers', 8)
+        
+        # 在主线程完成数据源初始化，避免多个线程重复创建
+        _ = self.ts
+        rows = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._update_fundamental_stock, dataset, ts_code, end_date
+                ): ts_code
+                for ts_code in ts_codes
+            }
+            for future in as_completed(futures):
+                try:
+                    rows += future.result()
+                except Exception as e:
+                    self.logger.warning(f"增量同步 {dataset} {futures[future]} 失败: {e}")
+        return rows
+    
+    def update(
+        self, 
+        end_date: str = None,
+        datasets: Sequence[str] = None,
+        ts_codes: Sequence[str] = None,
+        max_workers: int = None
+    ) -> Dict[str, int]:
+        """
+        按水位线增量更新本地数据
+        
+        - 交易日历: 只补充缓存之后的区间
+        - 股票列表: 单次调用刷新
+        - 行情 (daily/daily_basic/adj_factor): 从 trade_date 水位线之后按截面同步，
+          并追加到按股票分区、登记各股票覆盖区间
+        - 基本面 (income/balancesheet/cashflow/fina_indicator/dividend):
+          每只股票从各自的 ann_date 水位线之后拉取
+        
+        Args:
+            end_date: 更新截止日期 (默认今天)
+            datasets: 要更新的数据集 (默认全部)
+            ts_codes: 基本面更新的股票范围 (默认全部上市股票)
+            max_workers: 并发线程数
+            
+        Returns:
+            各数据集新增的行数
+        """
+        if end_date is None:
+            end_date = pd.Timestamp.today().strftime('%Y%m%d')
+        if datasets is None:
+            datasets = MARKET_DATASETS + FUNDAMENTAL_DATASETS
+        
+        self.logger.info(f"开始增量更新至 {end_date}: {list(datasets)}")
+        result = {}
+        
+        # 元数据
+        self.get_trade_calendar(end_date=end_date)
+        stock_list = self.get_stock_list(force_update=True)
+        self.catalog.set('stock_basic', 'updated', end_date, force=True)
+        self.catalog.save()
+        
+        for dataset in datasets:
+            if dataset in MARKET_DATASETS:
+                result[dataset] = self._update_market(dataset, end_date, max_workers)
+            elif dataset in FUNDAMENTAL_DATASETS:
+                codes = ts_codes if ts_codes is not None else stock_list['ts_code'].tolist()
+                result[dataset] = self._update_fundamental(
+                    dataset, codes, end_date, max_workers
+                )
+            else:
+                raise ValueError(f"不支持增量更新的数据集: {dataset}")
+            
+            self.catalog.save()
+            self.coverage.save()
+            self.logger.info(f"{dataset} 增量更新完成: {result[dataset]} 行")
+        
+        return result
+    
     # =========================================================================
     # 基本面数据
     # =========================================================================
@@ -171,9 +716,18 @@ class DataHub:
         ts_code: str = None,
         period: str = None,
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        use_cache: bool = None
     ) -> pd.DataFrame:
-        """获取利润表"""
+        """获取利润表 (start_date/end_date 为公告日区间)"""
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        if use_cache and ts_code is not None:
+            return self._cached_fundamental(
+                'income', ts_code, period, start_date, end_date
+            )
+        
         return self.ts.get_income(
             ts_code=ts_code,
             period=period,
@@ -186,9 +740,18 @@ class DataHub:
         ts_code: str = None,
         period: str = None,
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        use_cache: bool = None
     ) -> pd.DataFrame:
-        """获取资产负债表"""
+        """获取资产负债表 (start_date/end_date 为公告日区间)"""
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        if use_cache and ts_code is not None:
+            return self._cached_fundamental(
+                'balancesheet', ts_code, period, start_date, end_date
+            )
+        
         return self.ts.get_balancesheet(
             ts_code=ts_code,
             period=period,
@@ -201,9 +764,18 @@ class DataHub:
         ts_code: str = None,
         period: str = None,
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        use_cache: bool = None
     ) -> pd.DataFrame:
-        """获取现金流量表"""
+        """获取现金流量表 (start_date/end_date 为公告日区间)"""
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        if use_cache and ts_code is not None:
+            return self._cached_fundamental(
+                'cashflow', ts_code, period, start_date, end_date
+            )
+        
         return self.ts.get_cashflow(
             ts_code=ts_code,
             period=period,
@@ -216,9 +788,18 @@ class DataHub:
         ts_code: str = None,
         period: str = None,
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        use_cache: bool = None
     ) -> pd.DataFrame:
-        """获取财务指标"""
+        """获取财务指标 (start_date/end_date 为公告日区间)"""
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        if use_cache and ts_code is not None:
+            return self._cached_fundamental(
+                'fina_indicator', ts_code, period, start_date, end_date
+            )
+        
         return self.ts.get_fina_indicator(
             ts_code=ts_code,
             period=period,
@@ -229,9 +810,25 @@ class DataHub:
     def get_dividend(
         self, 
         ts_code: str = None,
-        ann_date: str = None
+        ann_date: str = None,
+        use_cache: bool = None
     ) -> pd.DataFrame:
         """获取分红送股"""
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        if use_cache and ts_code is not None:
+            def fetch(start: str, end: str) -> pd.DataFrame:
+                # 分红接口不支持日期区间，拉取后按公告日过滤
+                df = self.ts.get_dividend(ts_code=ts_code)
+                if df is None or df.empty:
+                    return df
+                return df[(df['ann_date'] >= start) & (df['ann_date'] <= end)]
+            
+            return self._read_through(
+                'dividend', ts_code, ann_date, ann_date, fetch, date_col='ann_date'
+            )
+        
         return self.ts.get_dividend(ts_code=ts_code, ann_date=ann_date)
     
     # =========================================================================
@@ -312,9 +909,18 @@ class DataHub:
         ts_code: str = None,
         trade_date: str = None,
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        use_cache: bool = None
     ) -> pd.DataFrame:
         """获取指数日线"""
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        if use_cache and ts_code is not None and trade_date is None:
+            return self._cached_market(
+                'index_daily', ts_code, None, start_date, end_date
+            )
+        
         return self.ts.get_index_daily(
             ts_code=ts_code,
             trade_date=trade_date,
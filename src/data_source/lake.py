@@ -0,0 +1,619 @@
+"""本地 Parquet 数据湖"""
+
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..utils.config import get_data_path
+from ..utils.io import load_parquet, load_parquet_dataset, ensure_dir
+from .catalog import MARKET_CODE
+from .coverage import CoverageIndex, get_coverage_index
+
+
+# 数据集 -> 所属目录分组
+DATASET_GROUPS: Dict[str, str] = {
+    'daily': 'market',
+    'daily_basic': 'market',
+    'adj_factor': 'market',
+    'index_daily': 'index',
+    'adj_price': 'adjusted',
+    'factor_values': 'factors',
+    'income': 'fundamental',
+    'balancesheet': 'fundamental',
+    'cashflow': 'fundamental',
+    'fina_indicator': 'fundamental',
+    'dividend': 'fundamental',
+}
+
+# 数据集 -> 去重主键
+DATASET_KEYS: Dict[str, List[str]] = {
+    'daily': ['ts_code', 'trade_date'],
+    'daily_basic': ['ts_code', 'trade_date'],
+    'adj_factor': ['ts_code', 'trade_date'],
+    'index_daily': ['ts_code', 'trade_date'],
+    'adj_price': ['ts_code', 'trade_date'],
+    'factor_values': ['ts_code', 'trade_date'],
+    'income': ['ts_code', 'end_date', 'ann_date', 'report_type', 'update_flag'],
+    'balancesheet': ['ts_code', 'end_date', 'ann_date', 'report_type', 'update_flag'],
+    'cashflow': ['ts_code', 'end_date', 'ann_date', 'report_type', 'update_flag'],
+    'fina_indicator': ['ts_code', 'end_date', 'ann_date', 'update_flag'],
+    'dividend': ['ts_code', 'end_date', 'ann_date', 'div_proc'],
+}
+
+# 所有数据集主键列的并集 (写入时保持原类型)
+DATASET_KEYS_ALL = sorted({k for keys in DATASET_KEYS.values() for k in keys})
+
+# 数据集 -> 排序日期列
+DATASET_DATE_COLS: Dict[str, str] = {
+    'daily': 'trade_date',
+    'daily_basic': 'trade_date',
+    'adj_factor': 'trade_date',
+    'index_daily': 'trade_date',
+    'adj_price': 'trade_date',
+    'factor_values': 'trade_date',
+    'income': 'ann_date',
+    'balancesheet': 'ann_date',
+    'cashflow': 'ann_date',
+    'fina_indicator': 'ann_date',
+    'dividend': 'ann_date',
+}
+
+
+# 按股票分区文件的行组大小 (约一年交易日)，按日期过滤时可跳过无关年份
+STOCK_ROW_GROUP_SIZE = 244
+
+# 路由估算中打开单个文件的开销 (折算为扫描行数)
+FILE_OPEN_COST = 2000
+
+
+class ParquetLake:
+    """
+    本地 Parquet 数据湖
+
+    目录布局:
+        {root}/{group}/{dataset}/by_stock/{ts_code}.parquet   # 按股票分区 (时间序列)
+        {root}/{group}/{dataset}/by_date/{trade_date}.parquet # 按交易日分区 (截面)
+
+    - 按股票文件按日期排序、按年切分行组，按日期过滤时只读相关行组
+    - 按交易日文件按股票代码排序
+    - query() 只在完整覆盖请求股票与日期的布局中选择扫描量更小的一种，
+      都不完整时合并两种布局；列投影与过滤条件下推到 PyArrow
+
+    布局覆盖范围记录在覆盖区间索引中:
+        (dataset, ts_code)     -> 按股票分区已落地的区间
+        (dataset, MARKET_CODE) -> 按交易日分区已落地全市场截面的区间
+
+    同一文件的写入通过文件级锁串行化，可在多线程下载中安全使用
+    """
+
+    def __init__(
+        self, 
+        root: Optional[Union[str, Path]] = None,
+        coverage: Optional[CoverageIndex] = None
+    ):
+        """
+        Args:
+            root: 数据湖根目录 (默认 data/raw)
+            coverage: 覆盖区间索引 (默认数据湖使用进程共享索引；
+                      自定义根目录且未提供时，两种布局并存则合并读取)
+        """
+        if coverage is None and root is None:
+            coverage = get_coverage_index()
+        self.root = Path(root) if root is not None else get_data_path('raw')
+        self.coverage = coverage
+        self._locks: Dict[Path, threading.Lock] = defaultdict(threading.Lock)
+        self._locks_guard = threading.Lock()
+        self._schemas: Dict[str, Optional[pa.Schema]] = {}
+
+    # =========================================================================
+    # 路径
+    # =========================================================================
+
+    def dataset_dir(self, dataset: str) -> Path:
+        """数据集根目录"""
+        group = DATASET_GROUPS.get(dataset, 'other')
+        return self.root / group / dataset
+
+    def stock_path(self, dataset: str, ts_code: str) -> Path:
+        """按股票分区的文件路径"""
+        return self.dataset_dir(dataset) / 'by_stock' / f'{ts_code}.parquet'
+
+    def date_path(self, dataset: str, trade_date: str) -> Path:
+        """按交易日分区的文件路径"""
+        return self.dataset_dir(dataset) / 'by_date' / f'{trade_date}.parquet'
+
+    def _lock_for(self, path: Path) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks[path]
+
+    # =========================================================================
+    # 数据集 schema
+    # =========================================================================
+
+    def schema_path(self, dataset: str) -> Path:
+        """数据集固定 schema 文件路径"""
+        return self.dataset_dir(dataset) / '_schema.parquet'
+
+    @staticmethod
+    def _normalize_field(field: pa.Field) -> pa.Field:
+        """非主键整数列统一为 float64 (同一列在有缺失值的文件中为浮点)"""
+        if pa.types.is_integer(field.type) and field.name not in DATASET_KEYS_ALL:
+            return pa.field(field.name, pa.float64())
+        return pa.field(field.name, field.type)
+
+    def _infer_schema(self, dataset: str) -> Optional[pa.Schema]:
+        """由已有文件推断 schema (兼容旧数据: 全空列曾写为 string，以其他文件的类型为准)"""
+        directory = self.dataset_dir(dataset)
+        paths = list(directory.glob('by_stock/*.parquet')) + \
+            list(directory.glob('by_date/*.parquet'))
+        types: Dict[str, pa.DataType] = {}
+        for path in paths:
+            for field in pq.read_schema(path):
+                if pa.types.is_null(field.type):
+                    continue
+                current = types.get(field.name)
+                if current is None or pa.types.is_string(current) \
+                        or pa.types.is_large_string(current):
+                    types[field.name] = field.type
+        if not types:
+            return None
+        return pa.schema([
+            self._normalize_field(pa.field(name, dtype)) for name, dtype in types.items()
+        ])
+
+    def _save_schema(self, dataset: str, schema: pa.Schema) -> None:
+        path = self.schema_path(dataset)
+        ensure_dir(path.parent)
+        tmp_path = path.with_name(f'.{path.name}.{threading.get_ident()}.tmp')
+        pq.write_table(schema.empty_table(), tmp_path)
+        os.replace(tmp_path, path)
+
+    def dataset_schema(self, dataset: str) -> Optional[pa.Schema]:
+        """
+        数据集的固定 schema
+
+        首次写入时由数据确定并持久化到 _schema.parquet，之后新增列追加到末尾；
+        写入按该 schema 转换类型，读取按该 schema 构建数据集。
+        没有 schema 文件的旧数据在首次访问时由全部文件推断
+
+        Returns:
+            schema，数据集不存在时为 None
+        """
+        if dataset in self._schemas:
+            return self._schemas[dataset]
+
+        path = self.schema_path(dataset)
+        with self._lock_for(path):
+            if dataset not in self._schemas:
+                if path.exists():
+                    schema = pq.read_schema(path).remove_metadata()
+                else:
+                    schema = self._infer_schema(dataset)
+                    if schema is not None:
+                        self._save_schema(dataset, schema)
+                self._schemas[dataset] = schema
+        return self._schemas[dataset]
+
+    def _register_schema(self, dataset: str, schema: pa.Schema) -> pa.Schema:
+        """把新出现的 (非全空) 列登记到数据集 schema，返回登记后的 schema"""
+        def new_fields(current: pa.Schema) -> List[pa.Field]:
+            return [
+                self._normalize_field(f) for f in schema
+                if f.name not in current.names and not pa.types.is_null(f.type)
+            ]
+
+        current = self.dataset_schema(dataset) or pa.schema([])
+        if not new_fields(current):
+            return current
+
+        path = self.schema_path(dataset)
+        with self._lock_for(path):
+            # 其他进程可能已登记新列，以磁盘上的 schema 为准
+            if path.exists():
+                current = pq.read_schema(path).remove_metadata()
+            current = pa.schema(list(current) + new_fields(current))
+            self._save_schema(dataset, current)
+            self._schemas[dataset] = current
+        return current
+
+    # =========================================================================
+    # 读写
+    # =========================================================================
+
+    def _write(
+        self, 
+        dataset: str,
+        df: pd.DataFrame, 
+        path: Path,
+        row_group_size: Optional[int] = None
+    ) -> None:
+        """
+        先写临时文件再替换，避免读到半写文件
+
+        列类型按数据集 schema 转换，保证各文件同名列类型一致；
+        尚未登记类型的全空列保持 null 类型，读取时按 schema 补齐
+        """
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        schema = self._register_schema(dataset, table.schema)
+        fields = [
+            schema.field(f.name) if f.name in schema.names else f
+            for f in table.schema
+        ]
+        try:
+            table = table.cast(pa.schema(fields))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"{dataset} 写入数据与数据集 schema 不一致: {e}") from e
+
+        ensure_dir(path.parent)
+        tmp_path = path.with_name(f'.{path.name}.{threading.get_ident()}.tmp')
+        pq.write_table(table, tmp_path, row_group_size=row_group_size)
+        os.replace(tmp_path, path)
+
+    def _merge(
+        self,
+        dataset: str,
+        df: pd.DataFrame,
+        path: Path,
+        merge: bool
+    ) -> pd.DataFrame:
+        """与已有文件合并并按主键去重 (新数据优先)"""
+        if merge and path.exists():
+            df = pd.concat([load_parquet(path), df], ignore_index=True)
+
+        keys = [k for k in DATASET_KEYS.get(dataset, []) if k in df.columns]
+        if keys:
+            df = df.drop_duplicates(subset=keys, keep='last')
+
+        date_col = DATASET_DATE_COLS.get(dataset)
+        if date_col in df.columns:
+            df = df.sort_values(date_col, kind='stable')
+        return df.reset_index(drop=True)
+
+    def write_stock(
+        self,
+        dataset: str,
+        ts_code: str,
+        df: pd.DataFrame,
+        merge: bool = True
+    ) -> int:
+        """
+        写入单只股票的数据
+
+        Args:
+            dataset: 数据集名称
+            ts_code: 股票代码
+            df: 数据
+            merge: 是否与已有数据合并
+
+        Returns:
+            写入后的总行数
+        """
+        path = self.stock_path(dataset, ts_code)
+        with self._lock_for(path):
+            df = self._merge(dataset, df, path, merge)
+            self._write(dataset, df, path, row_group_size=STOCK_ROW_GROUP_SIZE)
+        return len(df)
+
+    def write_date(
+        self,
+        dataset: str,
+        trade_date: str,
+        df: pd.DataFrame,
+        merge: bool = False
+    ) -> int:
+        """
+        写入单个交易日的截面数据
+
+        Returns:
+            写入后的总行数
+        """
+        path = self.date_path(dataset, trade_date)
+        with self._lock_for(path):
+            df = self._merge(dataset, df, path, merge)
+            if 'ts_code' in df.columns:
+                df = df.sort_values('ts_code', kind='stable').reset_index(drop=True)
+            self._write(dataset, df, path)
+        return len(df)
+
+    def read_stock(
+        self,
+        dataset: str,
+        ts_code: str,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """读取单只股票的数据 (不存在时返回空表)"""
+        path = self.stock_path(dataset, ts_code)
+        if not path.exists():
+            return pd.DataFrame()
+        return load_parquet(path, columns=columns)
+
+    def read_date(
+        self,
+        dataset: str,
+        trade_date: str,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """读取单个交易日的截面数据 (不存在时返回空表)"""
+        path = self.date_path(dataset, trade_date)
+        if not path.exists():
+            return pd.DataFrame()
+        return load_parquet(path, columns=columns)
+
+    def has_stock(self, dataset: str, ts_code: str) -> bool:
+        """按股票分区文件是否存在"""
+        return self.stock_path(dataset, ts_code).exists()
+
+    def has_date(self, dataset: str, trade_date: str) -> bool:
+        """按交易日分区文件是否存在"""
+        return self.date_path(dataset, trade_date).exists()
+
+    def list_stocks(self, dataset: str) -> List[str]:
+        """已落地的股票代码列表"""
+        directory = self.dataset_dir(dataset) / 'by_stock'
+        if not directory.exists():
+            return []
+        return sorted(p.stem for p in directory.glob('*.parquet'))
+
+    def list_dates(self, dataset: str) -> List[str]:
+        """已落地的交易日列表"""
+        directory = self.dataset_dir(dataset) / 'by_date'
+        if not directory.exists():
+            return []
+        return sorted(p.stem for p in directory.glob('*.parquet'))
+
+    # =========================================================================
+    # 查询 (双布局路由 + 下推)
+    # =========================================================================
+
+    def choose_layout(
+        self,
+        dataset: str,
+        ts_codes: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        选择完整覆盖请求范围、且扫描量更小的布局
+
+        只有覆盖区间索引确认完整覆盖 [start_date, end_date] 的布局参与比较
+        (by_stock 要求每只请求股票均已覆盖，by_date 要求全市场截面已覆盖)，
+        避免只落地了最近几天的按交易日分区截断长区间查询
+
+        估算扫描行数:
+            by_stock ≈ 股票数 × (开文件开销 + 区间内按年取整的行数)
+            by_date  ≈ 交易日数 × (开文件开销 + 全市场股票数)
+
+        Returns:
+            'by_stock' / 'by_date'；两种布局都不完整覆盖时为 'both' (合并读取)；
+            两种布局均不存在时为 None
+        """
+        stocks = self.list_stocks(dataset)
+        dates = self._dates_in_range(dataset, start_date, end_date)
+        has_date_layout = (self.dataset_dir(dataset) / 'by_date').exists()
+
+        if not stocks and not has_date_layout:
+            return None
+        if not stocks:
+            return 'by_date'
+        if not has_date_layout:
+            return 'by_stock'
+
+        codes = list(ts_codes) if ts_codes is not None else stocks
+        covered = self._covering_layouts(dataset, codes, start_date, end_date)
+        if len(covered) < 2:
+            return covered[0] if covered else 'both'
+
+        n_codes = len(codes)
+        n_dates = len(dates)
+        n_universe = max(len(stocks), n_codes)
+
+        years = -(-n_dates // STOCK_ROW_GROUP_SIZE)  # 向上取整
+        cost_stock = n_codes * (FILE_OPEN_COST + max(years, 1) * STOCK_ROW_GROUP_SIZE)
+        cost_date = n_dates * (FILE_OPEN_COST + n_universe)
+        return 'by_stock' if cost_stock <= cost_date else 'by_date'
+
+    def _covering_layouts(
+        self,
+        dataset: str,
+        ts_codes: List[str],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> List[str]:
+        """完整覆盖请求股票与日期的布局 (无覆盖信息时为空)"""
+        if self.coverage is None:
+            return []
+
+        keys = [MARKET_CODE] + ts_codes
+        intervals = [iv for key in keys for iv in self.coverage.get(dataset, key)]
+        if not intervals:
+            return []
+
+        # 未指定的边界按两种布局合计的最早 / 最晚覆盖日期补全
+        start = start_date or min(s for s, _ in intervals)
+        end = end_date or max(e for _, e in intervals)
+        if start > end:
+            return ['by_stock', 'by_date']
+
+        layouts = []
+        if all(self.coverage.is_covered(dataset, c, start, end) for c in ts_codes):
+            layouts.append('by_stock')
+        if self.coverage.is_covered(dataset, MARKET_CODE, start, end):
+            layouts.append('by_date')
+        return layouts
+
+    def _dates_in_range(
+        self,
+        dataset: str,
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> List[str]:
+        dates = self.list_dates(dataset)
+        if start_date is not None:
+            dates = [d for d in dates if d >= start_date]
+        if end_date is not None:
+            dates = [d for d in dates if d <= end_date]
+        return dates
+
+    def query(
+        self,
+        dataset: str,
+        ts_codes: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List] = None,
+        layout: str = 'auto'
+    ) -> pd.DataFrame:
+        """
+        从数据湖读取数据
+
+        Args:
+            dataset: 数据集名称
+            ts_codes: 股票代码列表 (None 为全部)
+            start_date: 开始日期 (含)
+            end_date: 结束日期 (含)
+            columns: 要读取的列 (None 为全部；主键列总会返回)
+            filters: 额外过滤条件 (PyArrow DNF 格式，如 [('pe_ttm', '>', 0)])
+            layout: 'auto' / 'by_stock' / 'by_date' / 'both' (合并两种布局并去重)
+
+        Returns:
+            DataFrame (按日期、股票代码排序)
+        """
+        if layout == 'auto':
+            layout = self.choose_layout(dataset, ts_codes, start_date, end_date)
+        if layout is None:
+            return pd.DataFrame(columns=columns)
+
+        date_col = DATASET_DATE_COLS.get(dataset, 'trade_date')
+
+        if layout == 'both':
+            frames = [
+                self.query(
+                    dataset, ts_codes, start_date, end_date, columns, filters, layout=part
+                )
+                for part in ('by_stock', 'by_date')
+            ]
+            frames = [f for f in frames if not f.empty]
+            if not frames:
+                return pd.DataFrame(columns=columns)
+            df = pd.concat(frames, ignore_index=True)
+            keys = DATASET_KEYS.get(dataset, [])
+            if keys and all(k in df.columns for k in keys):
+                df = df.drop_duplicates(subset=keys, keep='last')
+            sort_cols = [c for c in (date_col, 'ts_code') if c in df.columns]
+            if sort_cols:
+                df = df.sort_values(sort_cols, kind='stable')
+            return df.reset_index(drop=True)
+
+        if layout == 'by_stock':
+            codes = ts_codes if ts_codes is not None else self.list_stocks(dataset)
+            paths = [self.stock_path(dataset, c) for c in codes]
+            paths = [p for p in paths if p.exists()]
+        elif layout == 'by_date':
+            dates = self._dates_in_range(dataset, start_date, end_date)
+            paths = [self.date_path(dataset, d) for d in dates]
+        else:
+            raise ValueError(f"未知的数据布局: {layout}")
+
+        # 组合过滤条件 (AND)
+        conditions = list(filters or [])
+        if start_date is not None:
+            conditions.append((date_col, '>=', start_date))
+        if end_date is not None:
+            conditions.append((date_col, '<=', end_date))
+        if ts_codes is not None and layout == 'by_date':
+            conditions.append(('ts_code', 'in', list(ts_codes)))
+
+        if columns is not None:
+            keys = [k for k in ('ts_code', date_col) if k not in columns]
+            columns = keys + list(columns)
+
+        df = load_parquet_dataset(
+            paths, columns=columns, filters=conditions or None,
+            schema=self.dataset_schema(dataset)
+        )
+
+        sort_cols = [c for c in (date_col, 'ts_code') if c in df.columns]
+        if sort_cols and not df.empty:
+            df = df.sort_values(sort_cols, kind='stable')
+        return df.reset_index(drop=True)
+
+    def sync_layout(
+        self,
+        dataset: str,
+        target: str = 'by_date',
+        batch_size: int = 250,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> int:
+        """
+        由一种布局生成 (或补齐) 另一种布局
+
+        Args:
+            dataset: 数据集名称
+            target: 目标布局 'by_date' (由按股票生成) 或 'by_stock' (由按日期生成)
+            batch_size: 每批处理的交易日数 / 股票数，控制内存占用
+            start_date: 只同步该日期之后的数据 (含，用于增量追加)
+            end_date: 只同步该日期之前的数据 (含)
+
+        Returns:
+            写入的文件数
+        """
+        date_col = DATASET_DATE_COLS.get(dataset, 'trade_date')
+        written = 0
+
+        if target == 'by_date':
+            # 按日期批次扫描按股票文件 (行组下推只读相关年份)
+            stocks = self.list_stocks(dataset)
+            if not stocks:
+                return 0
+            paths = [self.stock_path(dataset, c) for c in stocks]
+            conditions = []
+            if start_date is not None:
+                conditions.append((date_col, '>=', start_date))
+            if end_date is not None:
+                conditions.append((date_col, '<=', end_date))
+            all_dates = load_parquet_dataset(
+                paths, columns=[date_col], filters=conditions or None,
+                schema=self.dataset_schema(dataset)
+            )[date_col]
+            all_dates = sorted(all_dates.dropna().unique())
+            for i in range(0, len(all_dates), batch_size):
+                batch = all_dates[i:i + batch_size]
+                df = self.query(
+                    dataset, start_date=batch[0], end_date=batch[-1],
+                    layout='by_stock'
+                )
+                for trade_date, group in df.groupby(date_col):
+                    self.write_date(dataset, trade_date, group, merge=True)
+                    written += 1
+
+        elif target == 'by_stock':
+            # 按股票批次扫描按日期文件
+            dates = self._dates_in_range(dataset, start_date, end_date)
+            if not dates:
+                return 0
+            paths = [self.date_path(dataset, d) for d in dates]
+            codes = load_parquet_dataset(
+                paths, columns=['ts_code'], schema=self.dataset_schema(dataset)
+            )['ts_code']
+            codes = sorted(codes.dropna().unique())
+            for i in range(0, len(codes), batch_size):
+                batch = codes[i:i + batch_size]
+                df = self.query(
+                    dataset, ts_codes=batch, start_date=start_date, end_date=end_date,
+                    layout='by_date'
+                )
+                for ts_code, group in df.groupby('ts_code'):
+                    self.write_stock(dataset, ts_code, group, merge=True)
+                    written += 1
+        else:
+            raise ValueError(f"未知的数据布局: {target}")
+
+        return written
@@ -0,0 +1,401 @@
+"""日期 × 股票 内存映射面板存储"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import get_data_path
+from ..utils.io import ensure_dir
+from .lake import ParquetLake
+
+
+# 热点字段 -> (数据集, 列名)；adj_close 为后复权收盘价 (见 PriceAdjuster)
+HOT_FIELDS: Dict[str, tuple] = {
+    'adj_close': ('adj_price', 'close'),
+    'pe_ttm': ('daily_basic', 'pe_ttm'),
+    'pb': ('daily_basic', 'pb'),
+    'ps_ttm': ('daily_basic', 'ps_ttm'),
+    'dv_ttm': ('daily_basic', 'dv_ttm'),
+    'total_mv': ('daily_basic', 'total_mv'),
+    'turnover_rate': ('daily_basic', 'turnover_rate'),
+}
+
+PANEL_DTYPE = np.float32
+
+
+class PanelStore:
+    """
+    日期 × 股票 面板存储
+
+    每个字段存为一个行优先 (日期在前) 的连续 float32 文件，所有字段共用同一
+    日期轴与股票轴。读取时通过 np.memmap 只读映射，不复制数据，多个进程
+    打开同一面板时共享操作系统页缓存中的同一份数据
+
+    目录结构:
+        {root}/CURRENT                  当前版本目录名
+        {root}/v{时间戳}/meta.json      字段、形状、数据类型
+        {root}/v{时间戳}/dates.npy      日期轴 (YYYYMMDD)
+        {root}/v{时间戳}/ts_codes.npy   股票轴
+        {root}/v{时间戳}/{field}.f32    面板数据
+
+    - write() 生成新版本后原子切换 CURRENT，已打开旧版本的进程不受影响
+    - append() 在股票轴不变时向现有文件尾部追加新交易日，不重写历史；
+      写入前按元数据截断文件，上次中断追加残留的字节不会导致错位
+    """
+
+    def __init__(
+        self,
+        root: Optional[Union[str, Path]] = None,
+        keep_versions: int = 2
+    ):
+        """
+        Args:
+            root: 存储根目录 (默认 {data_processed}/panels)
+            keep_versions: 保留的历史版本数
+        """
+        if root is None:
+            root = get_data_path('processed') / 'panels'
+        self.root = Path(root)
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._meta: Optional[dict] = None
+        self._dates: Optional[pd.Index] = None
+        self._ts_codes: Optional[pd.Index] = None
+        self._arrays: Dict[str, np.memmap] = {}
+
+    # =========================================================================
+    # 版本与元数据
+    # =========================================================================
+
+    @property
+    def _current_file(self) -> Path:
+        return self.root / 'CURRENT'
+
+    def _current_version(self) -> Optional[str]:
+        if not self._current_file.exists():
+            return None
+        return self._current_file.read_text().strip() or None
+
+    def _open(self) -> Path:
+        """加载当前版本的轴与元数据 (首次访问时)"""
+        with self._lock:
+            if self._version is None:
+                version = self._current_version()
+                if version is None:
+                    raise FileNotFoundError(f"面板存储为空: {self.root}")
+                directory = self.root / version
+                with open(directory / 'meta.json', 'r', encoding='utf-8') as f:
+                    self._meta = json.load(f)
+                self._dates = pd.Index(np.load(directory / 'dates.npy'))
+                self._ts_codes = pd.Index(np.load(directory / 'ts_codes.npy'))
+                self._version = version
+            return self.root / self._version
+
+    def reload(self) -> None:
+        """丢弃已打开的映射，下次访问时切换到最新版本"""
+        with self._lock:
+            self._version = None
+            self._meta = None
+            self._dates = None
+            self._ts_codes = None
+            self._arrays = {}
+
+    def exists(self) -> bool:
+        return self._current_version() is not None
+
+    @property
+    def dates(self) -> pd.Index:
+        """日期轴"""
+        self._open()
+        return self._dates
+
+    @property
+    def ts_codes(self) -> pd.Index:
+        """股票轴"""
+        self._open()
+        return self._ts_codes
+
+    @property
+    def fields(self) -> List[str]:
+        """已存储的字段"""
+        self._open()
+        return list(self._meta['fields'])
+
+    # =========================================================================
+    # 读取
+    # =========================================================================
+
+    def array(self, field: str) -> np.memmap:
+        """
+        只读映射字段面板
+
+        Args:
+            field: 字段名
+
+        Returns:
+            形状 (日期数, 股票数) 的 float32 np.memmap
+        """
+        directory = self._open()
+        if field not in self._meta['fields']:
+            raise KeyError(f"面板中没有字段: {field}")
+        with self._lock:
+            if field not in self._arrays:
+                self._arrays[field] = np.memmap(
+                    directory / f'{field}.f32', dtype=PANEL_DTYPE, mode='r',
+                    shape=(len(self._dates), len(self._ts_codes))
+                )
+            return self._arrays[field]
+
+    def date_slice(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> slice:
+        """日期区间 [start_date, end_date] 对应的行切片"""
+        dates = self.dates.values
+        lo = 0 if start_date is None else int(np.searchsorted(dates, start_date, side='left'))
+        hi = len(dates) if end_date is None else int(np.searchsorted(dates, end_date, side='right'))
+        return slice(lo, hi)
+
+    def frame(
+        self,
+        field: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        ts_codes: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """
+        以 DataFrame 形式读取字段面板
+
+        不指定 ts_codes 时返回基于映射的视图 (日期切片不复制数据)
+
+        Args:
+            field: 字段名
+            start_date: 开始日期
+            end_date: 结束日期
+            ts_codes: 股票代码 (按给定顺序，不存在的股票为 NaN)
+
+        Returns:
+            日期 × 股票 DataFrame
+        """
+        rows = self.date_slice(start_date, end_date)
+        values = self.array(field)[rows]
+        dates = self.dates[rows]
+
+        if ts_codes is None:
+            return pd.DataFrame(values, index=dates, columns=self.ts_codes, copy=False)
+
+        idx = self.ts_codes.get_indexer(pd.Index(ts_codes))
+        result = values[:, np.clip(idx, 0, None)]
+        result[:, idx < 0] = np.nan
+        return pd.DataFrame(result, index=dates, columns=pd.Index(ts_codes))
+
+    # =========================================================================
+    # 写入
+    # =========================================================================
+
+    @staticmethod
+    def _scatter(
+        out: np.ndarray,
+        df: pd.DataFrame,
+        value_col: str,
+        dates: pd.Index,
+        ts_codes: pd.Index
+    ) -> None:
+        """将长表的一列按 (trade_date, ts_code) 写入面板"""
+        rows = dates.get_indexer(df['trade_date'])
+        cols = ts_codes.get_indexer(df['ts_code'])
+        mask = (rows >= 0) & (cols >= 0)
+        values = pd.to_numeric(df[value_col], errors='coerce').to_numpy(dtype=PANEL_DTYPE)
+        out[rows[mask], cols[mask]] = values[mask]
+
+    @staticmethod
+    def _as_long(panel: pd.DataFrame, field: str) -> pd.DataFrame:
+        """宽面板转长表"""
+        long = panel.rename_axis(index='trade_date', columns='ts_code').stack().dropna()
+        return long.rename(field).reset_index()
+
+    def _write_meta(self, directory: Path, fields: List[str], dates, ts_codes) -> None:
+        meta = {
+            'fields': list(fields),
+            'dtype': np.dtype(PANEL_DTYPE).name,
+            'shape': [len(dates), len(ts_codes)],
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        for name, values in (('dates', dates), ('ts_codes', ts_codes)):
+            tmp_path = directory / f'.{name}.tmp.npy'
+            np.save(tmp_path, np.asarray(values, dtype=str))
+            os.replace(tmp_path, directory / f'{name}.npy')
+        tmp_path = directory / '.meta.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, directory / 'meta.json')
+
+    def _switch(self, version: str) -> None:
+        """原子切换当前版本并清理旧版本"""
+        tmp_path = self.root / '.CURRENT.tmp'
+        tmp_path.write_text(version)
+        os.replace(tmp_path, self._current_file)
+
+        versions = sorted(p.name for p in self.root.glob('v*') if p.is_dir())
+        for old in versions[:-self.keep_versions] if self.keep_versions > 0 else []:
+            if old != version:
+                shutil.rmtree(self.root / old, ignore_errors=True)
+        self.reload()
+
+    def write(
+        self,
+        data: Dict[str, pd.DataFrame],
+        dates: Optional[Sequence[str]] = None,
+        ts_codes: Optional[Sequence[str]] = None
+    ) -> Path:
+        """
+        写入新版本面板
+
+        Args:
+            data: 字段 -> 数据，可为 日期 × 股票 宽表，
+                或含 trade_date、ts_code、字段列 的长表
+            dates: 日期轴 (默认所有数据日期的并集)
+            ts_codes: 股票轴 (默认所有数据股票的并集)
+
+        Returns:
+            新版本目录
+        """
+        long_data = {
+            field: df if {'trade_date', 'ts_code'}.issubset(df.columns)
+            else self._as_long(df, field)
+            for field, df in data.items()
+        }
+
+        if dates is None:
+            dates = sorted(set().union(*(set(df['trade_date']) for df in long_data.values())))
+        if ts_codes is None:
+            ts_codes = sorted(set().union(*(set(df['ts_code']) for df in long_data.values())))
+        dates = pd.Index(np.asarray(dates, dtype=str))
+        ts_codes = pd.Index(np.asarray(ts_codes, dtype=str))
+
+        version = f"v{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+        directory = ensure_dir(self.root / version)
+        for field, df in long_data.items():
+            # 直接在磁盘映射上填充，避免内存中再保留一份完整面板
+            mm = np.memmap(
+                directory / f'{field}.f32', dtype=PANEL_DTYPE, mode='w+',
+                shape=(len(dates), len(ts_codes))
+            )
+            mm[:] = np.nan
+            self._scatter(mm, df, field, dates, ts_codes)
+            mm.flush()
+            del mm
+
+        self._write_meta(directory, list(long_data), dates, ts_codes)
+        self._switch(version)
+        return directory
+
+    def append(self, data: Dict[str, pd.DataFrame]) -> int:
+        """
+        追加新交易日 (股票轴不变时原地追加，历史部分不重写)
+
+        Args:
+            data: 字段 -> 新数据 (格式同 write)，需覆盖当前所有字段
+
+        Returns:
+            追加的交易日数
+        """
+        directory = self._open()
+        fields = self.fields
+        missing = [f for f in fields if f not in data]
+        if missing:
+            raise ValueError(f"追加数据缺少字段: {missing}")
+
+        long_data = {
+            field: df if {'trade_date', 'ts_code'}.issubset(df.columns)
+            else self._as_long(df, field)
+            for field, df in data.items() if field in fields
+        }
+        last_date = self.dates[-1] if len(self.dates) else ''
+        new_dates = sorted(
+            d for d in set().union(*(set(df['trade_date']) for df in long_data.values()))
+            if d > last_date
+        )
+        if not new_dates:
+            return 0
+
+        new_codes = set().union(*(set(df['ts_code']) for df in long_data.values()))
+        if not new_codes.issubset(set(self.ts_codes)):
+            # 出现新股票: 股票轴变化，整体重写
+            merged = {
+                f: pd.concat([self._as_long(self.frame(f), f), long_data[f]], ignore_index=True)
+                for f in fields
+            }
+            self.write(merged)
+            return len(new_dates)
+
+        dates_index = pd.Index(np.asarray(new_dates, dtype=str))
+        # 元数据在数据之后写入: 先截断到元数据记录的长度，丢弃上次中断追加残留的字节
+        committed = len(self.dates) * len(self.ts_codes) * np.dtype(PANEL_DTYPE).itemsize
+        for field, df in long_data.items():
+            block = np.full((len(new_dates), len(self.ts_codes)), np.nan, dtype=PANEL_DTYPE)
+            self._scatter(block, df, field, dates_index, self.ts_codes)
+            with open(directory / f'{field}.f32', 'r+b') as f:
+                f.truncate(committed)
+                f.seek(committed)
+                block.tofile(f)
+
+        self._write_meta(
+            directory, fields, self.dates.append(dates_index), self.ts_codes
+        )
+        self.reload()
+        return len(new_dates)
+
+    def build(
+        self,
+        raw_lake: Optional[ParquetLake] = None,
+        processed_lake: Optional[ParquetLake] = None,
+        fields: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Path:
+        """
+        由本地数据湖构建热点字段面板
+
+        Args:
+            raw_lake: 原始数据湖 (daily_basic，默认 data/raw)
+            processed_lake: 处理后数据湖 (adj_price，默认 data/processed)
+            fields: 字段列表 (默认 HOT_FIELDS 全部)
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            新版本目录
+        """
+        raw_lake = raw_lake if raw_lake is not None else ParquetLake()
+        processed_lake = processed_lake if processed_lake is not None \
+            else ParquetLake(get_data_path('processed'))
+        fields = list(fields or HOT_FIELDS)
+
+        # 同一数据集的字段一次读取
+        by_dataset: Dict[str, List[str]] = {}
+        for field in fields:
+            dataset, _ = HOT_FIELDS[field]
+            by_dataset.setdefault(dataset, []).append(field)
+
+        data: Dict[str, pd.DataFrame] = {}
+        for dataset, dataset_fields in by_dataset.items():
+            lake = processed_lake if dataset == 'adj_price' else raw_lake
+            columns = [HOT_FIELDS[f][1] for f in dataset_fields]
+            df = lake.query(
+                dataset, start_date=start_date, end_date=end_date, columns=columns
+            )
+            for field in dataset_fields:
+                data[field] = df[['trade_date', 'ts_code', HOT_FIELDS[field][1]]] \
+                    .rename(columns={HOT_FIELDS[field][1]: field})
+
+        return self.write(data)
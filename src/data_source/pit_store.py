@@ -0,0 +1,194 @@
+"""时点 (Point-in-Time) 财务数据存储"""
+
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ..utils.io import load_parquet
+
+
+# 日期整数编码的进位 (YYYYMMDD < 10^8)
+_DATE_BASE = 10 ** 8
+
+
+def _to_int_dates(values) -> np.ndarray:
+    """将日期 (YYYYMMDD 字符串 / Timestamp / 整数) 转为 int64 YYYYMMDD"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return (
+            values.dt.year * 10000 + values.dt.month * 100 + values.dt.day
+        ).to_numpy(dtype=np.int64)
+    if pd.api.types.is_integer_dtype(values):
+        return values.to_numpy(dtype=np.int64)
+    return pd.to_numeric(values.astype(str).str.replace('-', ''), errors='coerce') \
+        .fillna(-1).to_numpy(dtype=np.int64)
+
+
+class PITStore:
+    """
+    时点财务数据存储
+
+    将财报类数据 (fina_indicator/income/balancesheet/cashflow) 按 (ts_code, ann_date)
+    一次性排序，as_of() 通过 searchsorted 向量化地返回每个 (日期, 股票)
+    在当时已公告的最新一期报告，避免未来函数
+
+    - 同一报告期的更正公告 (ann_date 更晚) 会覆盖原报告
+    - 晚于更新报告期公告的旧报告期更正 (如年报发布后才更正三季报) 不会回退最新报告期
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        date_col: str = 'ann_date',
+        period_col: str = 'end_date',
+        inclusive: bool = False
+    ):
+        """
+        Args:
+            data: 财报数据，需包含 ts_code、date_col、period_col
+            date_col: 公告日列
+            period_col: 报告期列
+            inclusive: 公告当日是否可用 (默认否: 公告多在盘后，次一交易日才可用)
+        """
+        for col in ('ts_code', date_col, period_col):
+            if col not in data.columns:
+                raise ValueError(f"需要 {col} 列")
+
+        self.date_col = date_col
+        self.period_col = period_col
+        self.inclusive = inclusive
+
+        df = data.copy()
+        df['_ann'] = _to_int_dates(df[date_col].values)
+        df['_period'] = _to_int_dates(df[period_col].values)
+        df = df[(df['_ann'] > 0) & (df['_period'] > 0)]
+
+        # 一次排序: (股票, 公告日, 报告期, 更新标志)，同键保留最后一条
+        sort_cols = ['ts_code', '_ann', '_period']
+        if 'update_flag' in df.columns:
+            sort_cols.append('update_flag')
+        df = df.sort_values(sort_cols, kind='stable')
+        df = df.drop_duplicates(subset=['ts_code', '_ann'], keep='last')
+
+        # 剔除旧报告期的迟到更正: 只保留报告期不小于此前已公告最大报告期的行
+        running_max = df.groupby('ts_code', sort=False)['_period'].cummax()
+        df = df[df['_period'] == running_max].reset_index(drop=True)
+
+        self._codes = pd.Index(np.sort(df['ts_code'].unique()))
+        code_idx = self._codes.get_indexer(df['ts_code'])
+        self._row_code = code_idx.astype(np.int64)
+        self._keys = self._row_code * _DATE_BASE + df['_ann'].to_numpy(dtype=np.int64)
+
+        self.data = df.drop(columns=['_ann', '_period'])
+
+    @classmethod
+    def from_parquet(
+        cls,
+        path: Union[str, Path],
+        columns: Optional[List[str]] = None,
+        **kwargs
+    ) -> 'PITStore':
+        """从 parquet 文件构建"""
+        return cls(load_parquet(path, columns=columns), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def ts_codes(self) -> pd.Index:
+        return self._codes
+
+    def locate(
+        self,
+        dates: Sequence,
+        ts_codes: Sequence[str]
+    ) -> np.ndarray:
+        """
+        定位每个 (日期, 股票) 当时最新已公告报告的行号
+
+        Args:
+            dates: 查询日期 (与 ts_codes 等长)
+            ts_codes: 股票代码
+
+        Returns:
+            行号数组，无可用报告时为 -1
+        """
+        q_dates = _to_int_dates(dates)
+        q_codes = self._codes.get_indexer(pd.Index(ts_codes)).astype(np.int64)
+
+        # 公告日 < 查询日 (或 <=)，对应查询键减一后取右侧插入点
+        offset = 0 if self.inclusive else 1
+        q_keys = q_codes * _DATE_BASE + q_dates - offset
+        idx = np.searchsorted(self._keys, q_keys, side='right') - 1
+
+        safe_idx = np.clip(idx, 0, max(len(self._keys) - 1, 0))
+        valid = (
+            (idx >= 0) & (q_codes >= 0) & (q_dates > 0)
+            & (len(self._keys) > 0)
+        )
+        if len(self._keys) > 0:
+            valid &= self._row_code[safe_idx] == q_codes
+        return np.where(valid, idx, -1)
+
+    def as_of(
+        self,
+        dates: Sequence,
+        ts_codes: Sequence[str],
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        逐对查询 (日期, 股票) 的时点财务数据
+
+        Args:
+            dates: 查询日期 (与 ts_codes 等长)
+            ts_codes: 股票代码
+            columns: 返回的列 (默认全部)
+
+        Returns:
+            与输入等长的 DataFrame (RangeIndex)，无可用报告的行为 NaN
+        """
+        idx = self.locate(dates, ts_codes)
+        data = self.data if columns is None else self.data[columns]
+
+        found = idx >= 0
+        result = data.iloc[np.where(found, idx, 0)].reset_index(drop=True)
+        if not found.all():
+            result = result.astype(
+                {c: 'float64' for c in result.columns
+                 if pd.api.types.is_integer_dtype(result[c])
+                 or pd.api.types.is_bool_dtype(result[c])}
+            )
+            result.loc[~found, :] = np.nan
+        return result
+
+    def as_of_panel(
+        self,
+        dates: Sequence,
+        ts_codes: Optional[Sequence[str]] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        查询 日期 × 股票 全组合的时点财务数据
+
+        Args:
+            dates: 查询日期列表
+            ts_codes: 股票代码列表 (默认全部)
+            columns: 返回的列
+
+        Returns:
+            MultiIndex (trade_date, ts_code) 的 DataFrame
+        """
+        if ts_codes is None:
+            ts_codes = self._codes
+        dates = pd.Index(dates)
+        ts_codes = pd.Index(ts_codes)
+
+        flat_dates = np.repeat(dates.values, len(ts_codes))
+        flat_codes = np.tile(ts_codes.values, len(dates))
+        result = self.as_of(flat_dates, flat_codes, columns=columns)
+        result.index = pd.MultiIndex.from_arrays(
+            [flat_dates, flat_codes], names=['trade_date', 'ts_code']
+        )
+        return result
@@ -0,0 +1,159 @@
+"""API 调用限速器"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+# Tushare 超出频率限制时返回的错误信息关键字
+RATE_LIMIT_KEYWORDS = (
+    '每分钟最多访问',
+    '最多访问该接口',
+    '访问频率',
+    '频率超限',
+    'rate limit',
+    'too many requests',
+)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """判断异常是否为接口频率超限错误"""
+    message = str(error).lower()
+    return any(keyword in message for keyword in RATE_LIMIT_KEYWORDS)
+
+
+class RateLimiter:
+    """
+    令牌桶限速器 (线程安全)
+
+    - 令牌以 rate (次/分钟) 的速度补充，桶容量为 burst
+    - 每次调用前 acquire() 取走一个令牌，令牌不足时阻塞等待
+    - AIMD 自适应: 服务端返回频率超限时速率乘性下降，
+      调用成功时速率加性恢复，直至配置上限
+    """
+
+    def __init__(
+        self,
+        rate_limit: float = 200,
+        burst: Optional[int] = None,
+        min_rate: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        increase_step: float = 1.0
+    ):
+        """
+        Args:
+            rate_limit: 每分钟最大请求数 (速率上限)
+            burst: 令牌桶容量 (默认 rate_limit 的 1/20，至少 1)
+            min_rate: AIMD 下降的速率下限 (默认 rate_limit 的 1/10)
+            decrease_factor: 频率超限时的速率乘数
+            increase_step: 每次调用成功后速率增加量 (次/分钟)
+        """
+        if rate_limit <= 0:
+            raise ValueError(f"rate_limit 必须为正数: {rate_limit}")
+
+        self.max_rate = float(rate_limit)
+        self.burst = int(burst) if burst else max(1, int(rate_limit // 20))
+        self.min_rate = float(min_rate) if min_rate else max(1.0, self.max_rate / 10)
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+
+        self._rate = self.max_rate
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.total_calls = 0
+        self.total_throttled = 0
+        self.total_wait = 0.0
+
+    @property
+    def rate(self) -> float:
+        """当前速率 (次/分钟)"""
+        return self._rate
+
+    def _refill(self, now: float) -> None:
+        """按经过时间补充令牌 (需持有锁)"""
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(
+                float(self.burst),
+                self._tokens + elapsed * self._rate / 60.0
+            )
+            self._last_refill = now
+
+    def acquire(self) -> float:
+        """
+        获取一个调用令牌，令牌不足时阻塞
+
+        Returns:
+            本次等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.total_calls += 1
+                    self.total_wait += waited
+                    return waited
+                wait = (1.0 - self._tokens) * 60.0 / self._rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self) -> None:
+        """调用成功: 速率加性恢复"""
+        with self._lock:
+            if self._rate < self.max_rate:
+                self._rate = min(self.max_rate, self._rate + self.increase_step)
+
+    def on_throttle(self) -> None:
+        """频率超限: 速率乘性下降并清空令牌桶"""
+        with self._lock:
+            self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+            self._tokens = 0.0
+            self._last_refill = time.monotonic()
+            self.total_throttled += 1
+
+    def stats(self) -> Dict[str, float]:
+        """限速统计"""
+        with self._lock:
+            return {
+                'rate': self._rate,
+                'max_rate': self.max_rate,
+                'burst': self.burst,
+                'total_calls': self.total_calls,
+                'total_throttled': self.total_throttled,
+                'total_wait': self.total_wait,
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    name: str = 'tushare',
+    rate_limit: float = 200,
+    burst: Optional[int] = None,
+    **kwargs
+) -> RateLimiter:
+    """
+    获取进程级共享限速器 (同名限速器只创建一次)
+
+    Args:
+        name: 限速器名称 (同一 API 账户共用一个名称)
+        rate_limit: 每分钟最大请求数 (仅首次创建时生效)
+        burst: 令牌桶容量 (仅首次创建时生效)
+        **kwargs: 传递给 RateLimiter 的其他参数
+
+    Returns:
+        RateLimiter 实例
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(rate_limit, burst=burst, **kwargs)
+        return _limiters[name]
@@ -2,7 +2,8 @@
 """Tushare Pro API 数据源封装"""
 
 import time
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Tuple
 from functools import wraps
 
 import pandas as pd
@@ -11,26 +12,78 @@ import tushare as ts
 from ..utils.config import load_config
 from ..utils.logger import get_logger
 from .base import DataSourceBase
+from .rate_limiter import get_rate_limiter, is_rate_limit_error
 
 
-def retry_on_error(max_retries: int = 3, delay: float = 1.0):
-    """API 调用重试装饰器"""
+def retry_on_error(max_retries: int = None, delay: float = 1.0):
+    """
+    API 调用重试装饰器
+
+    - 每次调用前从实例的限速器 (self.limiter) 获取令牌
+    - 频率超限错误交由限速器降速，不再额外线性等待
+    - max_retries 为 None 时使用实例配置的 self.max_retries
+    """
     def decorator(func):
         @wraps(func)
-        def wrapper(*args, **kwargs):
+        def wrapper(self, *args, **kwargs):
+            retries = max_retries or getattr(self, 'max_retries', 3)
+            limiter = getattr(self, 'limiter', None)
             last_error = None
-            for attempt in range(max_retries):
+            for attempt in range(retries):
+                if limiter is not None:
+                    limiter.acquire()
                 try:
-                    return func(*args, **kwargs)
+                    result = func(self, *args, **kwargs)
                 except Exception as e:
                     last_error = e
-                    if attempt < max_retries - 1:
+                    if limiter is not None and is_rate_limit_error(e):
+                        limiter.on_throttle()
+                        continue
+                    if attempt < retries - 1:
                         time.sleep(delay * (attempt + 1))
+                else:
+                    if limiter is not None:
+                        limiter.on_success()
+                    return result
             raise last_error
         return wrapper
     return decorator
 
 
+def split_date_range(
+    start_date: str, 
+    end_date: str, 
+    chunk_years: int = 3
+) -> List[Tuple[str, str]]:
+    """
+    将日期范围切分为若干段
+    
+    Args:
+        start_date: 开始日期 (YYYYMMDD)
+        end_date: 结束日期 (YYYYMMDD)
+        chunk_years: 每段年数
+        
+    Returns:
+        [(段开始日期, 段结束日期), ...]
+    """
+    start = datetime.strptime(start_date, '%Y%m%d')
+    end = datetime.strptime(end_date, '%Y%m%d')
+    
+    chunks = []
+    current_start = start
+    while current_start <= end:
+        current_end = min(
+            current_start + timedelta(days=chunk_years * 365),
+            end
+        )
+        chunks.append((
+            current_start.strftime('%Y%m%d'),
+            current_end.strftime('%Y%m%d')
+        ))
+        current_start = current_end + timedelta(days=1)
+    return chunks
+
+
 class TushareSource(DataSourceBase):
     """Tushare Pro API 数据源"""
     
@@ -60,8 +113,14 @@ class TushareSource(DataSourceBase):
         if http_url is None:
             http_url = ts_config.get('http_url')
         
+        # 配置参数
+        self.timeout = ts_config.get('timeout', 30)
+        self.max_retries = ts_config.get('retry', 3)
+        self.rate_limit = ts_config.get('rate_limit', 200)
+        self.rate_burst = ts_config.get('rate_burst')
+        
         # 初始化 API
-        self.pro = ts.pro_api(token)
+        self.pro = ts.pro_api(token, timeout=self.timeout)
         self.pro._DataApi__token = token
         
         # 设置代理服务地址
@@ -69,10 +128,12 @@ class TushareSource(DataSourceBase):
             self.pro._DataApi__http_url = http_url
             self.logger.info(f"使用代理服务: {http_url}")
         
-        # 配置参数
-        self.timeout = ts_config.get('timeout', 30)
-        self.max_retries = ts_config.get('retry', 3)
-        self.rate_limit = ts_config.get('rate_limit', 200)
+        # 进程级共享限速器 (所有实例、所有线程共用同一配额)
+        self.limiter = get_rate_limiter(
+            'tushare',
+            rate_limit=self.rate_limit,
+            burst=self.rate_burst
+        )
         
         self.logger.info("Tushare 数据源初始化完成")
     
@@ -148,53 +209,43 @@ class TushareSource(DataSourceBase):
         )
         return df
     
-    def get_daily_chunked(
+    def get_chunked(
         self, 
+        api: str,
         ts_code: str, 
         start_date: str, 
         end_date: str,
         chunk_years: int = 3
     ) -> pd.DataFrame:
         """
-        分段下载日线行情（代理服务优化版）
+        分段下载单只股票的时间序列数据（代理服务优化版）
         
         将大的日期范围切分为多个小范围请求，避免代理服务超时
         
         Args:
+            api: 接口名称 ('daily', 'daily_basic', 'adj_factor' 等)
             ts_code: 股票代码
             start_date: 开始日期 (YYYYMMDD)
             end_date: 结束日期 (YYYYMMDD)
             chunk_years: 每段年数 (默认3年)
             
         Returns:
-            DataFrame: 合并后的日线数据
+            DataFrame: 合并后的数据
         """
-        from datetime import datetime, timedelta
-        
-        start = datetime.strptime(start_date, '%Y%m%d')
-        end = datetime.strptime(end_date, '%Y%m%d')
-        
+        fetch = getattr(self, f'get_{api}')
         all_data = []
-        current_start = start
         
-        while current_start < end:
-            current_end = min(
-                current_start + timedelta(days=chunk_years * 365),
-                end
-            )
-            
+        for chunk_start, chunk_end in split_date_range(start_date, end_date, chunk_years):
             try:
-                df = self.get_daily(
+                df = fetch(
                     ts_code=ts_code,
-                    start_date=current_start.strftime('%Y%m%d'),
-                    end_date=current_end.strftime('%Y%m%d')
+                    start_date=chunk_start,
+                    end_date=chunk_end
                 )
-                if not df.empty:
+                if df is not None and not df.empty:
                     all_data.append(df)
             except Exception as e:
-                self.logger.warning(f"获取 {ts_code} {current_start.strftime('%Y%m%d')}-{current_end.strftime('%Y%m%d')} 失败: {e}")
-            
-            current_start = current_end + timedelta(days=1)
+                self.logger.warning(f"获取 {api} {ts_code} {chunk_start}-{chunk_end} 失败: {e}")
         
         if all_data:
             return pd.concat(all_data, ignore_index=True).drop_duplicates(
@@ -202,6 +253,27 @@ class TushareSource(DataSourceBase):
             ).sort_values('trade_date', ascending=False)
         return pd.DataFrame()
     
+    def get_daily_chunked(
+        self, 
+        ts_code: str, 
+        start_date: str, 
+        end_date: str,
+        chunk_years: int = 3
+    ) -> pd.DataFrame:
+        """
+        分段下载日线行情（代理服务优化版）
+        
+        Args:
+            ts_code: 股票代码
+            start_date: 开始日期 (YYYYMMDD)
+            end_date: 结束日期 (YYYYMMDD)
+            chunk_years: 每段年数 (默认3年)
+            
+        Returns:
+            DataFrame: 合并后的日线数据
+        """
+        return self.get_chunked('daily', ts_code, start_date, end_date, chunk_years)
+    
     @retry_on_error()
     def get_weekly(
         self, 
@@ -0,0 +1,5 @@
+"""数据下载模块"""
+
+from .bulk_downloader import BulkDownloader, DownloadStats
+
+__all__ = ['BulkDownloader', 'DownloadStats']
@@ -0,0 +1,196 @@
+"""全市场个股历史数据并发下载"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from ..utils.config import load_config
+from ..utils.logger import get_logger
+from ..data_source.lake import ParquetLake
+from ..data_source.coverage import CoverageIndex, get_coverage_index
+from ..data_source.tushare_source import TushareSource, split_date_range
+
+
+@dataclass
+class DownloadStats:
+    """下载统计"""
+    total_stocks: int = 0
+    done_stocks: int = 0
+    rows: int = 0
+    calls: int = 0
+    elapsed: float = 0.0
+    failed: List[Tuple[str, str]] = field(default_factory=list)  # (ts_code, dataset)
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def calls_per_sec(self) -> float:
+        return self.calls / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.done_stocks}/{self.total_stocks} 只股票, "
+            f"{self.rows} 行, {self.calls} 次调用, 耗时 {self.elapsed:.1f}s, "
+            f"{self.rows_per_sec:.0f} 行/s, {self.calls_per_sec:.2f} 次/s, "
+            f"失败 {len(self.failed)}"
+        )
+
+
+class BulkDownloader:
+    """
+    个股历史数据并发下载器
+
+    - 按股票将分段请求分发到有界线程池
+    - 所有线程共用 TushareSource 的进程级限速器，总速率受 rate_limit 约束
+    - 每只股票下载完成即写入本地数据湖 (按股票分区)，不在内存中累积全市场数据
+    """
+
+    DEFAULT_DATASETS = ('daily', 'adj_factor', 'daily_basic')
+
+    def __init__(
+        self,
+        source: Optional[TushareSource] = None,
+        lake: Optional[ParquetLake] = None,
+        coverage: Optional[CoverageIndex] = None,
+        max_workers: Optional[int] = None,
+        chunk_years: int = 3,
+        log_every: int = 100
+    ):
+        """
+        Args:
+            source: Tushare 数据源 (默认新建)
+            lake: 本地数据湖 (默认 data/raw)
+            coverage: 覆盖区间索引 (默认 data/meta/coverage.parquet)
+            max_workers: 线程数 (默认读取 tushare.max_workers，缺省 8)
+            chunk_years: 每次请求覆盖的年数
+            log_every: 每完成多少只股票输出一次进度
+        """
+        self.logger = get_logger('bulk_downloader')
+
+        if max_workers is None:
+            config = load_config()
+            max_workers = config.get('tushare', {}).get('max_workers', 8)
+
+        self.source = source if source is not None else TushareSource()
+        self.lake = lake if lake is not None else ParquetLake()
+        self.coverage = coverage if coverage is not None else get_coverage_index()
+        self.max_workers = max_workers
+        self.chunk_years = chunk_years
+        self.log_every = log_every
+
+        self._stats_lock = threading.Lock()
+
+    def _download_one(
+        self,
+        ts_code: str,
+        dataset: str,
+        chunks: List[Tuple[str, str]]
+    ) -> Tuple[int, int]:
+        """
+        下载单只股票的单个数据集并写入数据湖
+
+        任一分段失败则整只股票不落地，避免留下不完整的历史
+
+        Returns:
+            (行数, 调用次数)
+        """
+        fetch = getattr(self.source, f'get_{dataset}')
+        frames = []
+        for chunk_start, chunk_end in chunks:
+            df = fetch(ts_code=ts_code, start_date=chunk_start, end_date=chunk_end)
+            if df is not None and not df.empty:
+                frames.append(df)
+
+        rows = 0
+        if frames:
+            df = pd.concat(frames, ignore_index=True)
+            self.lake.write_stock(dataset, ts_code, df)
+            rows = len(df)
+
+        # 登记覆盖区间 (今天的数据可能尚未发布，只登记到昨天)
+        yesterday = (pd.Timestamp.today() - pd.Timedelta(days=1)).strftime('%Y%m%d')
+        self.coverage.add(dataset, ts_code, chunks[0][0], min(chunks[-1][1], yesterday))
+        return rows, len(chunks)
+
+    def _download_stock(
+        self,
+        ts_code: str,
+        datasets: Sequence[str],
+        chunks: List[Tuple[str, str]],
+        skip_existing: bool
+    ) -> Dict[str, object]:
+        """下载单只股票的所有数据集"""
+        rows, calls, failed = 0, 0, []
+        for dataset in datasets:
+            if skip_existing and self.lake.has_stock(dataset, ts_code):
+                continue
+            try:
+                n_rows, n_calls = self._download_one(ts_code, dataset, chunks)
+                rows += n_rows
+                calls += n_calls
+            except Exception as e:
+                self.logger.warning(f"下载 {dataset} {ts_code} 失败: {e}")
+                failed.append((ts_code, dataset))
+        return {'rows': rows, 'calls': calls, 'failed': failed}
+
+    def download(
+        self,
+        ts_codes: Sequence[str],
+        start_date: str,
+        end_date: str,
+        datasets: Sequence[str] = DEFAULT_DATASETS,
+        skip_existing: bool = False
+    ) -> DownloadStats:
+        """
+        并发下载股票历史数据
+
+        Args:
+            ts_codes: 股票代码列表
+            start_date: 开始日期 (YYYYMMDD)
+            end_date: 结束日期 (YYYYMMDD)
+            datasets: 数据集 ('daily', 'adj_factor', 'daily_basic')
+            skip_existing: 跳过数据湖中已存在的股票 (断点续传)
+
+        Returns:
+            DownloadStats 下载统计
+        """
+        chunks = split_date_range(start_date, end_date, self.chunk_years)
+        stats = DownloadStats(total_stocks=len(ts_codes))
+
+        self.logger.info(
+            f"开始下载 {len(ts_codes)} 只股票 {list(datasets)} "
+            f"{start_date}-{end_date}, 线程数 {self.max_workers}"
+        )
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._download_stock, ts_code, datasets, chunks, skip_existing
+                ): ts_code
+                for ts_code in ts_codes
+            }
+
+            for future in as_completed(futures):
+                result = future.result()
+                with self._stats_lock:
+                    stats.done_stocks += 1
+                    stats.rows += result['rows']
+                    stats.calls += result['calls']
+                    stats.failed.extend(result['failed'])
+                    stats.elapsed = time.monotonic() - start
+
+                    if stats.done_stocks % self.log_every == 0:
+                        self.coverage.save()
+                        self.logger.info(f"下载进度: {stats.summary()}")
+
+        self.coverage.save()
+        stats.elapsed = time.monotonic() - start
+        self.logger.info(f"下载完成: {stats.summary()}")
+        return stats
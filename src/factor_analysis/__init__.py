@@ -0,0 +1,11 @@
+# src/factor_analysis/__init__.py
+"""因子表现分析模块"""
+
+from .ic_analysis import ICAnalyzer
+from .layer_backtest import LayerBacktester, LayerTestResult
+
+__all__ = [
+    'ICAnalyzer',
+    'LayerBacktester',
+    'LayerTestResult',
+]
@@ -0,0 +1,302 @@
+"""IC / IR 分析"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.logger import get_logger
+from ..factors.kernels import _argsort_rows
+
+
+# 单个分块的目标元素数 (日期数 × 股票数)，控制排序索引等中间数组的内存
+_CHUNK_ELEMENTS = 2_000_000
+
+
+class _SortedPanel:
+    """
+    一个分块内逐行排序后的面板: 排序位置、平坦下标与同值组边界
+
+    用于在任意有效掩码下 O(N) 求名次，而无需为每个 (因子, 周期) 组合重新排序
+    """
+
+    def __init__(self, values: np.ndarray):
+        n_rows, n_cols = values.shape
+        self.values = values
+        self.valid = ~np.isnan(values)
+
+        order = _argsort_rows(values)  # NaN 排在最后
+        offset = (np.arange(n_rows, dtype=np.int64) * n_cols)[:, None]
+        self.flat_order = (order + offset).ravel()
+        # 逆排列: 原始位置 -> 排序位置，名次以 gather 取回原始顺序 (比 scatter 快)
+        self.flat_inverse = np.empty_like(self.flat_order)
+        self.flat_inverse[self.flat_order] = np.arange(self.flat_order.size, dtype=np.int64)
+
+        sorted_values = values.ravel()[self.flat_order].reshape(n_rows, n_cols)
+        same = sorted_values[:, 1:] == sorted_values[:, :-1]
+        self.has_ties = bool(same.any())
+        if self.has_ties:
+            positions = np.broadcast_to(np.arange(n_cols, dtype=np.int64), (n_rows, n_cols))
+            group_start = np.ones((n_rows, n_cols), dtype=bool)
+            group_start[:, 1:] = ~same
+            group_end = np.ones((n_rows, n_cols), dtype=bool)
+            group_end[:, :-1] = ~same
+            first = np.maximum.accumulate(np.where(group_start, positions, 0), axis=1)
+            last = np.flip(np.minimum.accumulate(
+                np.flip(np.where(group_end, positions, n_cols), axis=1), axis=1
+            ), axis=1)
+            # 同值组之前一位 (组首为行首时指向哑元 -1 列) 与组尾的平坦下标
+            self.flat_before = (first + offset + offset // n_cols).ravel()
+            self.flat_last = (last + 1 + offset + offset // n_cols).ravel()
+
+    def ranks(self, mask: np.ndarray) -> np.ndarray:
+        """
+        仅在 mask 为 True 的样本中计算逐行平均名次 (从 1 开始)，其余为 0
+
+        Args:
+            mask: 与面板同形状的有效掩码 (须为 self.valid 的子集)
+
+        Returns:
+            原始顺序下的名次
+        """
+        n_rows, n_cols = mask.shape
+        sorted_mask = mask.ravel()[self.flat_order]
+
+        if self.has_ties:
+            # 每行前置一个 0 列，同值组平均名次 = (组前计数 + 组尾计数 + 1) / 2
+            padded = np.zeros((n_rows, n_cols + 1))
+            np.cumsum(sorted_mask.reshape(n_rows, n_cols), axis=1, out=padded[:, 1:])
+            padded = padded.ravel()
+            avg = padded[self.flat_before]
+            avg += padded[self.flat_last]
+            avg += 1
+            avg *= 0.5
+        else:
+            avg = np.cumsum(
+                sorted_mask.reshape(n_rows, n_cols), axis=1, dtype=np.float64
+            ).ravel()
+
+        avg *= sorted_mask
+        return avg[self.flat_inverse].reshape(n_rows, n_cols)
+
+
+def _demean_rows(values: np.ndarray) -> np.ndarray:
+    """逐行减去有效值均值 (相关系数对平移不变，降低大数值内积的精度损失)"""
+    count = np.maximum((~np.isnan(values)).sum(axis=1), 1)
+    return values - (np.nansum(values, axis=1) / count)[:, None]
+
+
+def _row_corr(
+    x: np.ndarray,
+    y: np.ndarray,
+    count: np.ndarray,
+    min_count: int
+) -> np.ndarray:
+    """
+    逐行 Pearson 相关系数 (无效位置已置 0)
+
+    Args:
+        x, y: 日期 × 股票 数组，联合有效掩码之外为 0
+        count: 每行联合有效样本数
+
+    Returns:
+        每行相关系数，样本不足或方差为 0 时为 NaN
+    """
+    n = count.astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sx, sy = x.sum(axis=1), y.sum(axis=1)
+        cov = np.einsum('ij,ij->i', x, y) - sx * sy / n
+        var_x = np.einsum('ij,ij->i', x, x) - sx * sx / n
+        var_y = np.einsum('ij,ij->i', y, y) - sy * sy / n
+        ic = cov / np.sqrt(var_x * var_y)
+    return np.where((count >= min_count) & (var_x > 0) & (var_y > 0), ic, np.nan)
+
+
+class ICAnalyzer:
+    """
+    信息系数 (IC) 分析: 多因子 × 多预测周期的截面相关系数批量计算
+
+    - 输入为 日期 × 股票 因子面板与各周期的前瞻收益面板，共用股票轴
+    - Rank IC 为每个交易日在 (因子, 收益) 均有效的股票上计算的 Spearman 相关系数
+      (平均名次处理并列)，与逐日 dropna 后 corr(method='spearman') 一致
+    - 每个分块内因子、收益各排序一次，任意组合的联合掩码下名次由排序位置上的
+      累计计数直接得到，逐行 Pearson 相关由内积求出，不对 (因子, 周期) 组合逐一排序
+    - 按日期分块处理，内存占用与因子数、周期数无关
+    """
+
+    def __init__(self, min_count: int = 30, chunk_size: Optional[int] = None):
+        """
+        Args:
+            min_count: 单期最少有效股票数，不足时 IC 为 NaN
+            chunk_size: 每块日期数 (默认按约 200 万元素自动确定)
+        """
+        self.logger = get_logger('ic_analysis')
+        self.min_count = min_count
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def forward_returns(
+        close: pd.DataFrame,
+        horizons: Sequence[int] = (1, 5, 10, 20, 60),
+        lag: int = 0
+    ) -> Dict[int, pd.DataFrame]:
+        """
+        由复权收盘价面板计算前瞻收益
+
+        Args:
+            close: 日期 × 股票 复权收盘价
+            horizons: 预测周期 (交易日)
+            lag: 建仓滞后天数 (1 表示 t 日信号、t+1 日收盘建仓)
+
+        Returns:
+            周期 -> 面板，t 日的值为 close[t+lag+h] / close[t+lag] - 1，未来不足时为 NaN
+        """
+        values = close.to_numpy(dtype=float)
+        n_rows = len(values)
+        result = {}
+        for h in horizons:
+            fwd = np.full_like(values, np.nan)
+            span = n_rows - lag - h
+            if span > 0:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    fwd[:span] = values[lag + h:lag + h + span] / values[lag:lag + span] - 1
+            result[h] = pd.DataFrame(fwd, index=close.index, columns=close.columns)
+        return result
+
+    def _chunks(self, n_rows: int, n_cols: int) -> List[Tuple[int, int]]:
+        size = self.chunk_size or max(_CHUNK_ELEMENTS // max(n_cols, 1), 1)
+        return [(lo, min(lo + size, n_rows)) for lo in range(0, n_rows, size)]
+
+    def calculate_ic_series(
+        self,
+        factors: Dict[str, pd.DataFrame],
+        returns: Dict[int, pd.DataFrame],
+        method: str = 'spearman',
+        dates: Optional[Sequence] = None
+    ) -> pd.DataFrame:
+        """
+        计算 IC 时间序列
+
+        Args:
+            factors: 因子名 -> 日期 × 股票 面板
+            returns: 周期 -> 前瞻收益面板 (按第一个因子面板的日期、股票轴对齐)
+            method: 'spearman' (Rank IC) 或 'pearson'
+            dates: 只在这些日期计算 (如调仓日；默认全部日期)
+
+        Returns:
+            DataFrame: 索引为日期，列为 (factor, horizon) 的 MultiIndex
+        """
+        if method not in ('spearman', 'pearson'):
+            raise ValueError(f"未知方法: {method}")
+        if not factors or not returns:
+            raise ValueError("因子与收益面板不能为空")
+
+        first = next(iter(factors.values()))
+        index = first.index if dates is None else pd.Index(dates)
+        columns = first.columns
+
+        def to_array(panel: pd.DataFrame) -> np.ndarray:
+            # 轴已对齐的 float64 面板直接取底层数组，不复制
+            if not (panel.index.equals(index) and panel.columns.equals(columns)):
+                panel = panel.reindex(index=index, columns=columns)
+            return panel.to_numpy(dtype=np.float64, copy=False)
+
+        factor_names, horizons = list(factors), list(returns)
+        n_rows, n_cols = len(index), len(columns)
+        result = np.full((n_rows, len(factor_names), len(horizons)), np.nan)
+
+        factor_arrays = {name: to_array(panel) for name, panel in factors.items()}
+        return_arrays = {h: to_array(panel) for h, panel in returns.items()}
+
+        for lo, hi in self._chunks(n_rows, n_cols):
+            if method == 'spearman':
+                ret_panels = [_SortedPanel(return_arrays[h][lo:hi]) for h in horizons]
+            else:
+                ret_panels = [_demean_rows(return_arrays[h][lo:hi]) for h in horizons]
+
+            for i, name in enumerate(factor_names):
+                x = factor_arrays[name][lo:hi]
+                if method == 'spearman':
+                    fac = _SortedPanel(x)
+                    x_valid = fac.valid
+                else:
+                    x = _demean_rows(x)
+                    x_valid = ~np.isnan(x)
+
+                for j, ret in enumerate(ret_panels):
+                    if method == 'spearman':
+                        mask = x_valid & ret.valid
+                        rx, ry = fac.ranks(mask), ret.ranks(mask)
+                    else:
+                        mask = x_valid & ~np.isnan(ret)
+                        rx, ry = np.where(mask, x, 0.0), np.where(mask, ret, 0.0)
+                    result[lo:hi, i, j] = _row_corr(rx, ry, mask.sum(axis=1), self.min_count)
+
+        self.logger.info(
+            f"IC 计算完成: {len(factor_names)} 个因子 × {len(horizons)} 个周期 × {n_rows} 期"
+        )
+        return pd.DataFrame(
+            result.reshape(n_rows, -1),
+            index=index,
+            columns=pd.MultiIndex.from_product([factor_names, horizons], names=['factor', 'horizon'])
+        )
+
+    @staticmethod
+    def calculate_ir(ic_series: pd.Series) -> float:
+        """
+        IR = mean(IC) / std(IC)
+
+        IR > 0.5: 优秀因子
+        0.3 < IR < 0.5: 良好因子
+        IR < 0.3: 一般因子
+        """
+        return ic_series.mean() / ic_series.std()
+
+    @staticmethod
+    def summarize(ic: pd.DataFrame) -> pd.DataFrame:
+        """
+        IC 统计汇总
+
+        逐日计算的长周期 IC 序列相邻期收益区间重叠，t 值偏高；
+        需要独立样本时可用 calculate_ic_series(dates=...) 只在不重叠的调仓日计算
+
+        Args:
+            ic: calculate_ic_series 的结果
+
+        Returns:
+            DataFrame: 每个 (factor, horizon) 一行，列为
+                ic_mean, ic_std, ir, t_stat, positive_ratio, abs_gt_002, n_periods
+        """
+        values = ic.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        n = valid.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.nansum(values, axis=0) / n
+            std = np.sqrt(np.nansum((values - mean) ** 2, axis=0) / (n - 1))
+            ir = mean / std
+            summary = pd.DataFrame({
+                'ic_mean': mean,
+                'ic_std': std,
+                'ir': ir,
+                't_stat': ir * np.sqrt(n),
+                'positive_ratio': (values > 0).sum(axis=0) / n,
+                'abs_gt_002': (np.abs(values) > 0.02).sum(axis=0) / n,
+                'n_periods': n,
+            }, index=ic.columns)
+        return summary
+
+    def analyze(
+        self,
+        factors: Dict[str, pd.DataFrame],
+        returns: Dict[int, pd.DataFrame],
+        method: str = 'spearman',
+        dates: Optional[Sequence] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        计算 IC 序列及其汇总
+
+        Returns:
+            (IC 时间序列, 汇总表)
+        """
+        ic = self.calculate_ic_series(factors, returns, method, dates)
+        return ic, self.summarize(ic)
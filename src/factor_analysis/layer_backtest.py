@@ -0,0 +1,264 @@
+"""因子分层回测"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..utils.logger import get_logger
+from ..factors.kernels import _argsort_rows, _rank_rows
+
+
+# 单个因子分块的权重数组元素上限 (调仓期数 × 股票数 × 因子数 × 层数)
+_WEIGHT_ELEMENTS = 32_000_000
+
+
+@dataclass
+class LayerTestResult:
+    """分层回测结果"""
+    returns: pd.DataFrame        # 日收益: 日期 × (factor, layer)
+    nav: pd.DataFrame            # 净值: 日期 × (factor, layer)，首个调仓日为 1
+    long_short: pd.DataFrame     # 多空日收益 (最高层 - 最低层): 日期 × factor
+    period_returns: pd.DataFrame  # 各持有期收益: 调仓日 × (factor, layer)
+    layer_annual_return: pd.DataFrame  # 各层年化收益: factor × layer
+    summary: pd.DataFrame        # 多空与单调性统计: 每个因子一行
+
+
+class LayerBacktester:
+    """
+    因子分层回测: 多因子一次计算
+
+    - 每个调仓日按因子值将有效股票等分为 n_layers 层 (第 1 层因子值最小)，
+      排序位置由逐行排序一次得到，层号 = 位置 × 层数 // 有效股票数 (同值按列顺序拆分)
+    - 调仓日收盘等权买入，持有至下一调仓日 (期间权重随价格漂移，停牌日收益按 0 计)
+    - 各层净值由 持有期内个股相对调仓日的累计净值 × 层权重矩阵 的批量矩阵乘法得到，
+      不逐日、逐股票循环
+    - 因子按块处理，权重数组大小不超过 _WEIGHT_ELEMENTS，内存与因子总数无关
+    """
+
+    def __init__(
+        self,
+        n_layers: int = 5,
+        holding_period: int = 20,
+        periods_per_year: int = 252,
+        factor_chunk: Optional[int] = None
+    ):
+        """
+        Args:
+            n_layers: 分层数
+            holding_period: 持有期 (交易日)，未指定调仓日时每隔该天数调仓
+            periods_per_year: 年化用的每年交易日数
+            factor_chunk: 每块因子数 (默认按权重数组上限自动确定)
+        """
+        if n_layers < 2:
+            raise ValueError(f"分层数至少为 2: {n_layers}")
+        self.logger = get_logger('layer_backtest')
+        self.n_layers = n_layers
+        self.holding_period = holding_period
+        self.periods_per_year = periods_per_year
+        self.factor_chunk = factor_chunk
+
+    def _rebalance_positions(
+        self,
+        index: pd.Index,
+        rebalance_dates: Optional[Sequence]
+    ) -> np.ndarray:
+        """调仓日在日期轴上的位置 (去掉最后一天，其后无持有期)"""
+        if rebalance_dates is None:
+            positions = np.arange(0, len(index), self.holding_period)
+        else:
+            positions = index.get_indexer(pd.Index(rebalance_dates))
+            if (positions < 0).any():
+                missing = list(pd.Index(rebalance_dates)[positions < 0][:5])
+                raise ValueError(f"调仓日不在收益面板日期中: {missing}")
+            positions = np.unique(positions)
+        return positions[positions < len(index) - 1]
+
+    def _assign_layers(self, values: np.ndarray) -> np.ndarray:
+        """
+        调仓日截面分层
+
+        Args:
+            values: 调仓期 × 股票 因子值 (不可选的股票为 NaN)
+
+        Returns:
+            同形状的层号 (0 为因子值最小的一层)，无效为 -1
+        """
+        n_rows, n_cols = values.shape
+        order = _argsort_rows(values)
+        position = np.empty_like(order)
+        np.put_along_axis(
+            position, order, np.broadcast_to(np.arange(n_cols), (n_rows, n_cols)), axis=1
+        )
+        count = (~np.isnan(values)).sum(axis=1, keepdims=True)
+        layers = position * self.n_layers // np.maximum(count, 1)
+        return np.where(position < count, layers, -1)
+
+    def run(
+        self,
+        factors: Dict[str, pd.DataFrame],
+        returns: pd.DataFrame,
+        rebalance_dates: Optional[Sequence] = None,
+        universe: Optional[pd.DataFrame] = None
+    ) -> LayerTestResult:
+        """
+        分层回测
+
+        Args:
+            factors: 因子名 -> 日期 × 股票 面板 (按 returns 的轴对齐，须为时点数据)
+            returns: 日期 × 股票 日收益率 (t 日收盘相对 t-1 日收盘)
+            rebalance_dates: 调仓日 (默认从首日起每 holding_period 个交易日)
+            universe: 日期 × 股票 可交易标记 (如剔除停牌、涨停)，调仓日为 False 的股票不入选
+
+        Returns:
+            LayerTestResult
+        """
+        if not factors:
+            raise ValueError("因子面板不能为空")
+        dates, codes = returns.index, returns.columns
+        n_days, n_stocks, n_layers = len(dates), len(codes), self.n_layers
+
+        starts = self._rebalance_positions(dates, rebalance_dates)
+        if not len(starts):
+            raise ValueError("没有可用的调仓日")
+        ends = np.append(starts[1:], n_days - 1)
+        n_periods = len(starts)
+        span = int((ends - starts).max()) + 1
+
+        # 个股累计净值 (缺失收益按 0 计)，每个持有期内相对调仓日归一
+        ret = returns.to_numpy(dtype=np.float64)
+        cum = np.cumprod(1 + np.nan_to_num(ret, nan=0.0), axis=0)
+        base = cum[starts]
+        tradable = base > 0
+        if universe is not None:
+            tradable &= universe.reindex(
+                index=dates[starts], columns=codes, fill_value=False
+            ).to_numpy(dtype=bool)
+
+        # 持有期块: 调仓期 × 期内第 k 天 × 股票，不足 span 天的尾部补 0
+        day = starts[:, None] + np.arange(span)
+        in_period = day <= ends[:, None]
+        growth = np.zeros((n_periods, span, n_stocks))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            growth[in_period] = cum[day[in_period]] / np.repeat(
+                base, in_period.sum(axis=1), axis=0
+            )
+        growth[~np.isfinite(growth)] = 0.0
+
+        names = list(factors)
+        chunk = self.factor_chunk or max(
+            _WEIGHT_ELEMENTS // max(n_periods * n_stocks * n_layers, 1), 1
+        )
+        daily = np.full((n_days, len(names) * n_layers), np.nan)
+        period_ret = np.full((n_periods, len(names) * n_layers), np.nan)
+
+        for lo in range(0, len(names), chunk):
+            block = names[lo:lo + chunk]
+            weights = np.zeros((n_periods, n_stocks, len(block) * n_layers))
+            for i, name in enumerate(block):
+                panel = factors[name]
+                if not (panel.index.equals(dates) and panel.columns.equals(codes)):
+                    panel = panel.reindex(index=dates, columns=codes)
+                values = panel.to_numpy(dtype=np.float64)[starts]
+                layers = self._assign_layers(np.where(tradable, values, np.nan))
+
+                # 层内等权: 每只入选股票的权重为 1 / 该层股票数
+                onehot = layers[:, :, None] == np.arange(n_layers)
+                counts = onehot.sum(axis=1, keepdims=True)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    weights[:, :, i * n_layers:(i + 1) * n_layers] = onehot / counts
+
+            # 各层净值: (期数, 天, 股票) @ (期数, 股票, 层) -> (期数, 天, 层)
+            value = np.nan_to_num(np.matmul(growth, np.nan_to_num(weights)))
+            value[:, 0][value[:, 0] == 0] = np.nan  # 空层
+            with np.errstate(invalid='ignore', divide='ignore'):
+                step = value[:, 1:] / value[:, :-1] - 1
+
+            cols = slice(lo * n_layers, (lo + len(block)) * n_layers)
+            held = in_period[:, 1:]
+            daily[day[:, 1:][held], cols] = step[held]
+            period_ret[:, cols] = value[np.arange(n_periods), ends - starts] - 1
+
+        self.logger.info(
+            f"分层回测完成: {len(names)} 个因子 × {n_layers} 层, {n_periods} 个调仓期"
+        )
+        return self._build_result(names, dates, starts, daily, period_ret)
+
+    def _build_result(
+        self,
+        names: List[str],
+        dates: pd.Index,
+        starts: np.ndarray,
+        daily: np.ndarray,
+        period_ret: np.ndarray
+    ) -> LayerTestResult:
+        """由日收益与持有期收益汇总净值、多空与单调性"""
+        n_layers, n_factors = self.n_layers, len(names)
+        columns = pd.MultiIndex.from_product(
+            [names, range(1, n_layers + 1)], names=['factor', 'layer']
+        )
+
+        first = starts[0]
+        nav = np.full_like(daily, np.nan)
+        nav[first:] = np.cumprod(1 + np.nan_to_num(daily[first:], nan=0.0), axis=0)
+
+        by_layer = daily.reshape(len(dates), n_factors, n_layers)
+        long_short = by_layer[:, :, -1] - by_layer[:, :, 0]
+
+        n_days = len(dates) - 1 - first
+        years = n_days / self.periods_per_year
+        annual = (nav[-1] ** (1 / years) - 1).reshape(n_factors, n_layers)
+
+        ls = np.nan_to_num(long_short[first + 1:], nan=0.0)
+        ls_nav = np.cumprod(1 + ls, axis=0)
+        drawdown = 1 - ls_nav / np.maximum.accumulate(ls_nav, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sharpe = ls.mean(axis=0) / ls.std(axis=0, ddof=1) * np.sqrt(self.periods_per_year)
+
+        # 单调性: 层号与层收益的 Spearman 相关 (+1 表示因子值越大收益越高)
+        layer_rank = np.arange(1, n_layers + 1, dtype=np.float64)
+        layer_rank -= layer_rank.mean()
+
+        def monotonicity(values: np.ndarray) -> np.ndarray:
+            ranks = _rank_rows(values, pct=False)
+            ranks -= ranks.mean(axis=1, keepdims=True)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return ranks @ layer_rank / np.sqrt(
+                    (ranks * ranks).sum(axis=1) * (layer_rank * layer_rank).sum()
+                )
+
+        by_period = period_ret.reshape(-1, n_layers)
+        complete = ~np.isnan(by_period).any(axis=1)
+        period_mono = np.full(len(by_period), np.nan)
+        period_mono[complete] = monotonicity(by_period[complete])
+        period_mono = period_mono.reshape(len(starts), n_factors)
+
+        by_factor = period_ret.reshape(len(starts), n_factors, n_layers)
+        spread = by_factor[:, :, -1] - by_factor[:, :, 0]
+        n_spread = (~np.isnan(spread)).sum(axis=0)
+        n_mono = (~np.isnan(period_mono)).sum(axis=0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            summary = pd.DataFrame({
+                'long_short_annual_return': ls_nav[-1] ** (1 / years) - 1,
+                'long_short_sharpe': sharpe,
+                'long_short_max_drawdown': drawdown.max(axis=0),
+                'long_short_win_rate': (spread > 0).sum(axis=0) / n_spread,
+                'monotonicity': monotonicity(annual),
+                'period_monotonicity': np.nansum(period_mono, axis=0) / n_mono,
+            }, index=pd.Index(names, name='factor'))
+
+        return LayerTestResult(
+            returns=pd.DataFrame(daily, index=dates, columns=columns),
+            nav=pd.DataFrame(nav, index=dates, columns=columns),
+            long_short=pd.DataFrame(
+                long_short, index=dates, columns=pd.Index(names, name='factor')
+            ),
+            period_returns=pd.DataFrame(period_ret, index=dates[starts], columns=columns),
+            layer_annual_return=pd.DataFrame(
+                annual, index=pd.Index(names, name='factor'),
+                columns=pd.Index(range(1, n_layers + 1), name='layer')
+            ),
+            summary=summary,
+        )
@@ -4,15 +4,24 @@
 from .valuation import ValuationFactors
 from .quality import QualityFactors
 from .growth import GrowthFactors
-from .momentum import MomentumFactors
+from .momentum import MomentumFactors, MomentumEngine
 from .dividend import DividendFactors
 from .pipeline import FactorPipeline
+from .store import FactorStore
+from .dag import FactorGraph, FactorNode, build_default_graph
+from .parallel import ShardedRunner
 
 __all__ = [
     'ValuationFactors',
     'QualityFactors', 
     'GrowthFactors',
     'MomentumFactors',
+    'MomentumEngine',
     'DividendFactors',
     'FactorPipeline',
+    'FactorStore',
+    'FactorGraph',
+    'FactorNode',
+    'build_default_graph',
+    'ShardedRunner',
 ]
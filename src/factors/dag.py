@@ -0,0 +1,304 @@
+"""因子依赖图与按需执行"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+from ..utils.logger import get_logger
+from .momentum import MomentumEngine
+
+
+@dataclass
+class FactorNode:
+    """
+    因子节点
+
+    func(*inputs, **params) 返回 输出名 -> 结果 的字典，只有一个输出时也可直接返回结果
+    """
+    name: str
+    func: Callable
+    inputs: List[str]
+    outputs: List[str]
+    window: int = 0  # 自身所需的回看交易日数
+    cross_sectional: bool = False  # 是否跨股票计算 (不能按股票分片)
+    params: dict = field(default_factory=dict)
+
+
+class FactorGraph:
+    """
+    因子依赖图
+
+    - 节点声明输入 (原始字段或其他节点的输出)、输出与回看窗口
+    - run() 只解析所请求因子的最小子图，按拓扑层级执行；
+      同一层的节点互不依赖，用线程池并发 (numpy / pandas 运算大多释放 GIL)
+    - 一次执行中每个中间结果 (对数价格、日收益率等) 只计算一次，由下游节点共享
+    - 截面节点 (cross_sectional=True) 依赖同一交易日的全部股票，其余节点按股票独立
+    """
+
+    def __init__(self):
+        self.logger = get_logger('factor_graph')
+        self.nodes: Dict[str, FactorNode] = {}
+        self._producers: Dict[str, str] = {}  # 输出名 -> 节点名
+
+    def register(
+        self,
+        name: str,
+        func: Callable,
+        inputs: List[str],
+        outputs: Optional[List[str]] = None,
+        window: int = 0,
+        cross_sectional: bool = False,
+        **params
+    ) -> FactorNode:
+        """
+        注册节点
+
+        Args:
+            name: 节点名
+            func: 计算函数 func(*inputs, **params)
+            inputs: 输入名
+            outputs: 输出名 (默认与节点名相同)
+            window: 所需回看交易日数
+            cross_sectional: 是否跨股票计算
+            **params: 传给 func 的额外参数
+
+        Returns:
+            注册的节点
+        """
+        outputs = list(outputs or [name])
+        for output in outputs:
+            producer = self._producers.get(output)
+            if producer is not None and producer != name:
+                raise ValueError(f"输出 {output} 已由节点 {producer} 提供")
+
+        node = FactorNode(name, func, list(inputs), outputs, window, cross_sectional, params)
+        self.nodes[name] = node
+        for output in outputs:
+            self._producers[output] = name
+        return node
+
+    @property
+    def outputs(self) -> List[str]:
+        """全部可计算的输出"""
+        return sorted(self._producers)
+
+    def resolve(
+        self,
+        targets: Iterable[str],
+        available: Optional[Iterable[str]] = None
+    ) -> List[FactorNode]:
+        """
+        解析计算 targets 所需的最小节点集合
+
+        Args:
+            targets: 需要的输出
+            available: 已提供的输入；为 None 时未注册的名称均视为原始输入
+
+        Returns:
+            拓扑排序后的节点列表
+        """
+        available = None if available is None else set(available)
+        ordered: List[FactorNode] = []
+        visiting: Set[str] = set()
+        done: Set[str] = set()
+
+        def visit(output: str) -> None:
+            if available is not None and output in available:
+                return
+            if output not in self._producers:
+                if available is None:
+                    return
+                raise KeyError(f"缺少输入: {output}")
+            name = self._producers[output]
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"因子依赖存在环: {name}")
+            visiting.add(name)
+            for dep in self.nodes[name].inputs:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            ordered.append(self.nodes[name])
+
+        for target in targets:
+            visit(target)
+        return ordered
+
+    def required_inputs(self, targets: Iterable[str]) -> Set[str]:
+        """计算 targets 所需的原始输入 (没有节点产出的名称)"""
+        targets = list(targets)
+        needed = {t for t in targets if t not in self._producers}
+        for node in self.resolve(targets):
+            needed.update(dep for dep in node.inputs if dep not in self._producers)
+        return needed
+
+    def lookback(self, targets: Iterable[str]) -> int:
+        """targets 所需的预热交易日数 (依赖链上窗口之和的最大值)"""
+        memo: Dict[str, int] = {}
+
+        def depth(output: str) -> int:
+            if output not in self._producers:
+                return 0
+            if output not in memo:
+                node = self.nodes[self._producers[output]]
+                memo[output] = node.window + max((depth(d) for d in node.inputs), default=0)
+            return memo[output]
+
+        return max((depth(t) for t in targets), default=0)
+
+    @staticmethod
+    def levels(nodes: List[FactorNode]) -> List[List[FactorNode]]:
+        """将拓扑序节点分层，同层节点互不依赖"""
+        producers = {out: node.name for node in nodes for out in node.outputs}
+        level_of: Dict[str, int] = {}
+        result: List[List[FactorNode]] = []
+        for node in nodes:
+            level = max(
+                (level_of[producers[d]] + 1 for d in node.inputs if d in producers),
+                default=0
+            )
+            level_of[node.name] = level
+            if level == len(result):
+                result.append([])
+            result[level].append(node)
+        return result
+
+    def run(
+        self,
+        targets: List[str],
+        data: Dict[str, object],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, object]:
+        """
+        计算所请求的因子
+
+        Args:
+            targets: 需要的输出
+            data: 原始输入 名称 -> 面板 (或序列、标量)
+            max_workers: 同层并发线程数 (1 为串行，None 为线程池默认值)
+
+        Returns:
+            输出名 -> 结果 (只包含 targets)
+        """
+        memo: Dict[str, object] = dict(data)
+        nodes = self.resolve(targets, available=memo.keys())
+        self.logger.info(f"计算 {len(targets)} 个因子，执行 {len(nodes)} 个节点")
+
+        def execute(node: FactorNode) -> Dict[str, object]:
+            out = node.func(*[memo[dep] for dep in node.inputs], **node.params)
+            return out if isinstance(out, dict) else {node.outputs[0]: out}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for level in self.levels(nodes):
+                if len(level) == 1 or max_workers == 1:
+                    results = [execute(node) for node in level]
+                else:
+                    results = list(executor.map(execute, level))
+                for out in results:
+                    memo.update(out)
+
+        return {t: memo[t] for t in targets}
+
+
+# =============================================================================
+# 默认因子图
+# =============================================================================
+
+
+def _identity(panel: pd.DataFrame) -> pd.DataFrame:
+    return panel
+
+
+def build_default_graph(pipeline) -> FactorGraph:
+    """
+    由 FactorPipeline 的因子计算器构建默认因子图 (因子名与 calculate_panel 一致)
+
+    原始输入均为 日期 × 股票 面板:
+        - 行情: pe_ttm, pb, ps_ttm, dv_ttm, dv_ratio, close (建议为复权价)
+        - 时点对齐后的基本面: roe, roa, grossprofit_margin, debt_to_assets,
+          q_sales_yoy, q_profit_yoy, basic_eps_yoy
+        - CAPM 另需 market_returns (以 trade_date 为索引) 与 risk_free
+
+    Args:
+        pipeline: FactorPipeline 实例
+
+    Returns:
+        FactorGraph
+    """
+    graph = FactorGraph()
+    valuation = pipeline.valuation
+    momentum = pipeline.momentum
+    quality = pipeline.quality
+
+    # 共享中间量
+    graph.register('log_price', MomentumEngine.log_price, ['close'])
+    graph.register('traded', lambda close: close.notna(), ['close'])
+    graph.register(
+        'returns', lambda close: close / close.shift(1) - 1, ['close'], window=1
+    )
+
+    # 估值
+    graph.register('factor_pe_ttm', _identity, ['pe_ttm'])
+    graph.register('factor_pb', _identity, ['pb'])
+    graph.register('factor_ps_ttm', _identity, ['ps_ttm'])
+    graph.register(
+        'factor_pe_percentile',
+        partial(valuation.calc_percentile_panel, window=valuation.pe_window),
+        ['pe_ttm'], window=valuation.pe_window
+    )
+    graph.register(
+        'factor_pb_percentile',
+        partial(valuation.calc_percentile_panel, window=valuation.pb_window),
+        ['pb'], window=valuation.pb_window
+    )
+
+    # 动量: 每个周期一个节点，共用对数价格
+    engine = MomentumEngine(
+        windows=momentum.windows,
+        skip=pipeline.config.get('momentum', {}).get('skip_window', 0)
+    )
+
+    def window_return(log_price, traded, window):
+        values = MomentumEngine.window_return(
+            log_price.to_numpy(), traded.to_numpy(), window, engine.skip
+        )
+        return pd.DataFrame(values, index=log_price.index, columns=log_price.columns)
+
+    def momentum_score(*returns):
+        score = MomentumEngine.momentum_score([r.to_numpy() for r in returns])
+        return pd.DataFrame(score, index=returns[0].index, columns=returns[0].columns)
+
+    names = engine.factor_names()
+    for name, w in zip(names, engine.windows):
+        graph.register(
+            name, partial(window_return, window=w), ['log_price', 'traded'], window=w
+        )
+    if names:
+        graph.register(
+            'factor_momentum_score', momentum_score, names, cross_sectional=True
+        )
+
+    graph.register(
+        'capm', momentum.calc_capm_panel, ['returns', 'market_returns', 'risk_free'],
+        outputs=['factor_alpha', 'factor_beta', 'factor_resid_vol'], window=252
+    )
+
+    # 股息
+    graph.register('factor_dv_ttm', _identity, ['dv_ttm'])
+    graph.register('factor_dv_ratio', _identity, ['dv_ratio'])
+
+    # 质量、成长 (逐元素，输入为时点对齐后的基本面面板)
+    graph.register('factor_roe', _identity, ['roe'])
+    graph.register('factor_roa', _identity, ['roa'])
+    graph.register('factor_gross_margin', _identity, ['grossprofit_margin'])
+    graph.register('factor_debt_ratio', _identity, ['debt_to_assets'])
+    graph.register('factor_debt_score', quality.calc_debt_ratio_score, ['debt_to_assets'])
+    graph.register('factor_revenue_yoy', _identity, ['q_sales_yoy'])
+    graph.register('factor_profit_yoy', _identity, ['q_profit_yoy'])
+    graph.register('factor_eps_yoy', _identity, ['basic_eps_yoy'])
+
+    return graph
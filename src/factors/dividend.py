@@ -1,7 +1,7 @@
 # src/factors/dividend.py
 """股息因子计算"""
 
-from typing import Optional
+from typing import Dict, Optional
 import pandas as pd
 import numpy as np
 
@@ -41,7 +41,10 @@ class DividendFactors:
         """
         计算股息增长率
         
-        CAGR of DPS over N years
+        CAGR of DPS over N years: 以 dps_history 最近 years 个值的首尾计算
+        (首尾相隔 years - 1 年，但按 years 年开方)。
+        与 calc_dividend_growth_panel 口径不同: 面板版本取 t 与 t - years，
+        相隔完整 years 年；[1, 1.1, 1.21, 1.331] 上本函数为 6.56%，面板为 10.0%
         """
         if len(dps_history) < years:
             return np.nan
@@ -98,3 +101,162 @@ class DividendFactors:
             result['factor_dv_ratio'] = df['dv_ratio']
         
         return result
+    
+    def calc_panel(self, panels: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """面板模式: 在 日期 × 股票 面板上计算股息因子"""
+        result = {}
+        
+        if 'dv_ttm' in panels:
+            result['factor_dv_ttm'] = panels['dv_ttm']
+        
+        if 'dv_ratio' in panels:
+            result['factor_dv_ratio'] = panels['dv_ratio']
+        
+        return result
+    
+    # =========================================================================
+    # 分红历史 (财年 × 股票 面板)
+    # =========================================================================
+    
+    def build_dps_panel(
+        self,
+        events: pd.DataFrame,
+        dps_col: str = 'cash_div_tax',
+        implemented_only: bool = True,
+        list_dates: Optional[pd.Series] = None
+    ) -> pd.DataFrame:
+        """
+        由全市场分红事件 (DataHub.get_dividend / 数据湖 dividend) 构建年度每股股息面板
+        
+        - 只统计已实施 (div_proc == '实施') 的方案，同一方案的重复记录去重
+        - 按分红所属财年 (end_date 年份，含中期分红) 一次 groupby 求和
+        - 股票首次出现分红记录 (或上市) 的财年之后，无分红的年份记为 0，之前为 NaN
+        
+        Args:
+            events: 分红事件长表 (ts_code, end_date, div_proc, dps_col, ...)
+            dps_col: 每股股息列 (默认税前 cash_div_tax)
+            implemented_only: 是否只统计已实施方案
+            list_dates: 上市日期 (以 ts_code 为索引)，提供时从上市年份起计为覆盖
+            
+        Returns:
+            财年 × 股票 的每股股息面板
+        """
+        df = events[events['end_date'].notna()]
+        df = df.assign(
+            year=pd.to_numeric(df['end_date'].astype(str).str[:4], errors='coerce').to_numpy()
+        )
+        df = df[df['year'].notna()].astype({'year': int})
+        
+        # 覆盖起点: 首次出现分红记录 (含未实施、不分配的方案) 或上市的财年
+        first_year = df.groupby('ts_code')['year'].min()
+        if list_dates is not None:
+            list_year = pd.to_numeric(list_dates.astype(str).str[:4], errors='coerce')
+            first_year = pd.concat([first_year, list_year], axis=1).min(axis=1).dropna()
+        
+        if implemented_only and 'div_proc' in df.columns:
+            df = df[df['div_proc'] == '实施']
+        df = df.drop_duplicates(
+            subset=[c for c in ('ts_code', 'end_date', 'ex_date', dps_col) if c in df.columns]
+        )
+        df = df.assign(dps=pd.to_numeric(df[dps_col], errors='coerce').fillna(0.0))
+        panel = df.groupby(['year', 'ts_code'])['dps'].sum().unstack('ts_code')
+        
+        if first_year.empty:
+            return panel
+        # 没有已实施方案时 (只有预案等) 覆盖期内全部记为 0
+        last_year = first_year.max() if df.empty else max(df['year'].max(), first_year.max())
+        years = pd.Index(
+            np.arange(int(first_year.min()), int(last_year) + 1), name='year'
+        )
+        panel = panel.reindex(index=years, columns=first_year.index)
+        
+        # 覆盖期内无分红记为 0
+        covered = years.to_numpy()[:, None] >= first_year.to_numpy()[None, :]
+        values = np.where(covered, np.nan_to_num(panel.to_numpy(dtype=float), nan=0.0), np.nan)
+        return pd.DataFrame(values, index=years, columns=panel.columns)
+    
+    def calc_dividend_growth_panel(
+        self,
+        dps_panel: pd.DataFrame,
+        years: int = 3
+    ) -> pd.DataFrame:
+        """
+        股息复合增长率 (%): (DPS[t] / DPS[t - years])^(1 / years) - 1
+        
+        起点与终点相隔完整 years 年 (真实的 years 年 CAGR)，与标量版本
+        calc_dividend_growth (取最近 years 个值的首尾，只相隔 years - 1 年) 口径不同。
+        起点或终点不为正时为 NaN
+        """
+        start = dps_panel.shift(years).to_numpy()
+        end = dps_panel.to_numpy()
+        ok = (start > 0) & (end > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            growth = (np.power(end / start, 1.0 / years) - 1) * 100
+        return pd.DataFrame(
+            np.where(ok, growth, np.nan), index=dps_panel.index, columns=dps_panel.columns
+        )
+    
+    def calc_dividend_consistency_panel(
+        self,
+        dps_panel: pd.DataFrame,
+        years: int = 5
+    ) -> pd.DataFrame:
+        """
+        分红一致性 (%): 截至每个财年的最近 years 年中有分红的年数占比
+        
+        与 calc_dividend_consistency 的口径一致 (覆盖期前的年份计为未分红)，未覆盖的财年为 NaN
+        """
+        paid = (dps_panel > 0).astype(float)
+        ratio = paid.rolling(years, min_periods=1).sum() / years * 100
+        return ratio.where(dps_panel.notna())
+    
+    def calc_history_panel(
+        self,
+        events: pd.DataFrame,
+        eps_panel: Optional[pd.DataFrame] = None,
+        growth_years: int = 3,
+        consistency_years: int = 5,
+        **kwargs
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        由分红事件计算全市场分红历史因子
+        
+        Args:
+            events: 分红事件长表
+            eps_panel: 财年 × 股票 的年度 EPS (计算分红比例)
+            growth_years: 股息增长率年数
+            consistency_years: 分红一致性年数
+            **kwargs: 传给 build_dps_panel 的参数
+            
+        Returns:
+            因子名 -> 财年 × 股票 面板
+        """
+        dps = self.build_dps_panel(events, **kwargs)
+        result = {
+            'factor_dps': dps,
+            'factor_div_growth': self.calc_dividend_growth_panel(dps, growth_years),
+            'factor_div_consistency': self.calc_dividend_consistency_panel(dps, consistency_years),
+        }
+        if eps_panel is not None:
+            eps = eps_panel.reindex(index=dps.index, columns=dps.columns)
+            result['factor_payout_ratio'] = self.calc_payout_ratio(dps, eps)
+        return result
+    
+    @staticmethod
+    def annual_eps_panel(
+        statements: pd.DataFrame,
+        eps_col: str = 'basic_eps'
+    ) -> pd.DataFrame:
+        """
+        由利润表 (或财报宽表) 的年报 EPS 构建 财年 × 股票 面板
+        
+        Args:
+            statements: 长表 (ts_code, end_date, eps_col)，每个 (ts_code, end_date) 一行
+            eps_col: EPS 列
+        """
+        end_date = statements['end_date'].astype(str).str.replace('-', '', regex=False)
+        is_annual = end_date.str[4:8].eq('1231').to_numpy()
+        annual = statements[is_annual].assign(
+            year=pd.to_numeric(end_date[is_annual].str[:4]).to_numpy()
+        )
+        return annual.groupby(['year', 'ts_code'])[eps_col].last().unstack('ts_code')
@@ -1,10 +1,12 @@
 # src/factors/growth.py
 """成长因子计算"""
 
-from typing import Optional
+from typing import Optional, Union
 import pandas as pd
 import numpy as np
 
+from ..preprocessing.statements import StatementEngine
+
 
 class GrowthFactors:
     """成长因子计算器"""
@@ -13,34 +15,97 @@ class GrowthFactors:
         self.config = config or {}
         self.eps_years = self.config.get('eps_growth_years', 3)
     
-    def calc_revenue_yoy(self, df: pd.DataFrame) -> pd.Series:
-        """计算营收同比增速"""
+    PROFIT_COLS = ('net_profit', 'n_income_attr_p')
+    
+    @staticmethod
+    def _statements(df: pd.DataFrame, field: str) -> StatementEngine:
+        """由财报长表构建单字段的报表引擎"""
+        if not {'ts_code', 'end_date'} <= set(df.columns):
+            raise ValueError("需要 ts_code、end_date 列 (按报告期精确匹配上年同期)")
+        return StatementEngine(df, fields=[field], report_type=None)
+    
+    def _statement_yoy(self, df: pd.DataFrame, field: str, basis: str) -> pd.Series:
+        """
+        按 (ts_code, end_date) 计算同比并对齐回 df 的行
+        
+        两条路径的公式相同，均与 pct_change 一致: (本期 / 上年同期 - 1) × 100，
+        分母带符号 (上年亏损时符号翻转)，上年同期为 0 时为 ±inf。
+        缺少 ts_code/end_date 列时按行 pct_change(4) 计算
+        (单只股票按季度连续排列的年初至今累计值)
+        """
+        if not {'ts_code', 'end_date'} <= set(df.columns):
+            if basis != 'ytd':
+                raise ValueError(
+                    f"basis='{basis}' 需要 ts_code、end_date 列 (按报告期精确匹配上年同期)"
+                )
+            return df[field].pct_change(4) * 100
+        
+        engine = self._statements(df, field)
+        values = engine.align(
+            engine.yoy(field, basis, abs_base=False), df['ts_code'], df['end_date']
+        )
+        return pd.Series(values, index=df.index)
+    
+    def calc_revenue_yoy(self, df: pd.DataFrame, basis: str = 'ytd') -> pd.Series:
+        """
+        计算营收同比增速
+        
+        默认口径与公式均与旧版一致 (年初至今累计值同比，分母带符号)；带 ts_code、end_date 列时
+        按报告期精确匹配上年同期，缺失的季度不会错位。
+        只有 revenue 列时按行 pct_change(4) 计算 (旧行为)
+        
+        Args:
+            df: 利润表长表 (ts_code, end_date, [ann_date], revenue)，revenue 为年初至今累计值
+            basis: 'ytd' 年初至今, 'q' 单季度, 'ttm' 滚动四季度 (后两者需要 ts_code、end_date)
+            
+        Returns:
+            与 df 同索引的同比增速 (%)，上年同期缺失时为 NaN
+        """
         if 'revenue' not in df.columns:
             raise ValueError("需要 revenue 列")
         
-        # 假设数据按季度排列
-        return df['revenue'].pct_change(4) * 100  # 同比
+        return self._statement_yoy(df, 'revenue', basis)
     
-    def calc_profit_yoy(self, df: pd.DataFrame) -> pd.Series:
-        """计算净利润同比增速"""
-        if 'net_profit' not in df.columns:
-            raise ValueError("需要 net_profit 列")
+    def calc_profit_yoy(self, df: pd.DataFrame, basis: str = 'ytd') -> pd.Series:
+        """计算净利润同比增速 (net_profit 或 n_income_attr_p 列，参数与口径同 calc_revenue_yoy)"""
+        col = next((c for c in self.PROFIT_COLS if c in df.columns), None)
+        if col is None:
+            raise ValueError("需要 net_profit 或 n_income_attr_p 列")
         
-        return df['net_profit'].pct_change(4) * 100
+        return self._statement_yoy(df, col, basis)
     
     def calc_eps_cagr(
         self, 
-        eps_history: pd.Series,
-        years: int = None
-    ) -> float:
+        eps_history: Union[pd.Series, pd.DataFrame],
+        years: int = None,
+        col: str = 'basic_eps'
+    ) -> Union[float, pd.Series]:
         """
         计算 EPS 复合年化增长率
         
         CAGR = (End/Start)^(1/n) - 1
+        
+        Args:
+            eps_history: 单只股票按季度排列的 EPS 序列，
+                或利润表长表 (ts_code, end_date, [ann_date], col)，col 为年初至今累计 EPS
+            years: 年数
+            col: 长表中的 EPS 列
+            
+        Returns:
+            序列输入返回最近一期的 CAGR (%)；长表输入返回与其同索引的 CAGR (%)，
+            由 TTM EPS 与 years 年前同一报告期精确匹配计算
         """
         if years is None:
             years = self.eps_years
         
+        if isinstance(eps_history, pd.DataFrame):
+            engine = self._statements(eps_history, col)
+            values = engine.align(
+                engine.cagr(col, years, basis='ttm'),
+                eps_history['ts_code'], eps_history['end_date']
+            )
+            return pd.Series(values, index=eps_history.index)
+        
         # 取 years 年前的值和当前值
         periods = years * 4  # 季度
         if len(eps_history) < periods:
@@ -0,0 +1,572 @@
+"""因子计算向量化内核"""
+
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+ArrayLike = Union[np.ndarray, pd.Series, pd.DataFrame]
+
+
+def _column_ranks(values: np.ndarray) -> np.ndarray:
+    """
+    逐列计算最小名次 (并列取最小，从 1 开始)，NaN 为 0
+
+    同值同名次，因此 "名次小于 r" 等价于 "数值严格小于"
+    """
+    # 转置为按列连续后沿行排序 (同值同名次，无需稳定排序)
+    cols_major = np.ascontiguousarray(values.T)
+    n_cols, n_rows = cols_major.shape
+    order = np.argsort(cols_major, axis=1)  # NaN 排在最后
+    sorted_values = np.take_along_axis(cols_major, order, axis=1)
+
+    positions = np.arange(n_rows, dtype=np.int64)[None, :]
+    group_start = np.ones_like(sorted_values, dtype=bool)
+    group_start[:, 1:] = sorted_values[:, 1:] != sorted_values[:, :-1]
+    min_rank = np.maximum.accumulate(np.where(group_start, positions, 0), axis=1) + 1
+    min_rank[np.isnan(sorted_values)] = 0
+
+    ranks = np.empty((n_cols, n_rows), dtype=np.int64)
+    np.put_along_axis(ranks, order, min_rank, axis=1)
+    ranks = np.ascontiguousarray(ranks.T)
+    return ranks
+
+
+def rolling_percentile_rank(
+    values: ArrayLike,
+    window: int,
+    min_periods: int = 100,
+    min_count: int = 10
+) -> ArrayLike:
+    """
+    滚动历史分位数: 窗口内早于当日且严格小于当日值的样本占比
+
+    与 rolling(window, min_periods).apply(lambda x: (x[-1] > x[:-1]).sum() / (len(x) - 1))
+    结果一致 (分母为窗口行数减一，含缺失值)，但当日值缺失时返回 NaN。
+
+    每列维护一棵按名次索引的树状数组 (Fenwick tree)，逐日插入新值、移出过期值并
+    查询前缀计数；所有列在同一次 numpy 运算中并行推进，复杂度 O(T·log T) 次向量运算
+
+    Args:
+        values: 单序列 (Series / 1 维数组) 或 日期 × 股票 面板 (DataFrame / 2 维数组)
+        window: 滚动窗口长度 (行数)
+        min_periods: 窗口内 (含当日) 最少有效值个数
+        min_count: 窗口最少行数
+
+    Returns:
+        与输入同形状、同类型的分位数 (0-1)
+    """
+    if isinstance(values, pd.DataFrame):
+        result = rolling_percentile_rank(values.to_numpy(dtype=float), window, min_periods, min_count)
+        return pd.DataFrame(result, index=values.index, columns=values.columns)
+    if isinstance(values, pd.Series):
+        result = rolling_percentile_rank(values.to_numpy(dtype=float), window, min_periods, min_count)
+        return pd.Series(result, index=values.index, name=values.name)
+
+    arr = np.asarray(values, dtype=float)
+    if arr.ndim == 1:
+        return rolling_percentile_rank(arr[:, None], window, min_periods, min_count)[:, 0]
+
+    n_rows, n_cols = arr.shape
+    result = np.full((n_rows, n_cols), np.nan)
+    if n_rows == 0 or n_cols == 0:
+        return result
+
+    ranks = _column_ranks(arr)
+
+    # 每列占 size + 1 个槽位: 0 号槽恒为 0 (前缀查询终点)，末尾为哑槽 (吸收越界更新)
+    size = n_rows + 1
+    dummy = size
+    slots = np.arange(size + 1, dtype=np.int64)
+    step_up = np.minimum(slots + (slots & -slots), dummy)
+    step_up[dummy] = dummy
+    step_down = slots - (slots & -slots)
+    n_steps = int(size).bit_length()
+
+    # 计数不超过窗口长度，int16/int32 足够，缩小树以提高缓存命中
+    dtype = np.int16 if window < np.iinfo(np.int16).max else np.int32
+    tree = np.zeros(n_cols * (size + 1), dtype=dtype)
+    base = np.arange(n_cols, dtype=np.int64) * (size + 1)
+
+    def update(rank: np.ndarray, delta: np.ndarray) -> None:
+        # 插入与移出合并为一次 add.at (同列两条路径可能经过同一槽位)
+        idx = np.where(rank > 0, rank, dummy)
+        offset = np.tile(base, len(idx) // n_cols)
+        for _ in range(n_steps):
+            np.add.at(tree, offset + idx, delta)
+            idx = step_up[idx]
+
+    def prefix(rank: np.ndarray) -> np.ndarray:
+        total = np.zeros(n_cols, dtype=np.int64)
+        idx = np.maximum(rank, 0)
+        for _ in range(n_steps):
+            total += tree[base + idx]
+            idx = step_down[idx]
+        return total
+
+    # 窗口内 (含当日) 有效值个数
+    valid = ~np.isnan(arr)
+    csum = np.cumsum(valid, axis=0)
+    lagged = np.zeros_like(csum)
+    lagged[window:] = csum[:-window]
+    count = csum - lagged
+
+    ones = np.ones(n_cols, dtype=dtype)
+    for t in range(n_rows):
+        # 窗口右移: 插入前一日，移出 t - window 日
+        if t >= window:
+            update(np.concatenate([ranks[t - 1], ranks[t - window]]), np.concatenate([ones, -ones]))
+        elif t >= 1:
+            update(ranks[t - 1], ones)
+
+        length = min(t + 1, window)
+        if length >= max(min_count, 2):
+            less = prefix(ranks[t] - 1)
+            ok = valid[t] & (count[t] >= min_periods)
+            result[t, ok] = less[ok] / (length - 1)
+
+    return result
+
+
+# =============================================================================
+# 截面 (按日期) 处理内核: 输入 日期 × 股票 二维数组，沿股票轴逐行计算
+# =============================================================================
+
+
+def _as_2d(values: ArrayLike) -> np.ndarray:
+    arr = np.array(values, dtype=float)  # 复制，后续原地修改
+    return arr[None, :] if arr.ndim == 1 else arr
+
+
+def _wrap(result: np.ndarray, values: ArrayLike) -> ArrayLike:
+    """按输入类型包装结果"""
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(result, index=values.index, columns=values.columns)
+    if isinstance(values, pd.Series):
+        return pd.Series(result[0], index=values.index, name=values.name)
+    return result[0] if np.ndim(values) == 1 else result
+
+
+def _row_quantile(sorted_arr: np.ndarray, count: np.ndarray, q: float) -> np.ndarray:
+    """
+    已排序 (NaN 在尾部) 数组的逐行分位数，线性插值 (与 pandas quantile 一致)
+
+    Args:
+        sorted_arr: 逐行升序排列的数组
+        count: 每行有效值个数
+        q: 分位点 (0-1)
+
+    Returns:
+        每行的分位数，无有效值时为 NaN
+    """
+    pos = (np.maximum(count, 1) - 1) * q
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(count - 1, 0))
+    frac = pos - lo
+    lo_val = np.take_along_axis(sorted_arr, lo[:, None], axis=1)[:, 0]
+    hi_val = np.take_along_axis(sorted_arr, hi[:, None], axis=1)[:, 0]
+    return np.where(count > 0, lo_val + (hi_val - lo_val) * frac, np.nan)
+
+
+def _winsorize_quantile_inplace(arr: np.ndarray, lower: float, upper: float) -> None:
+    sorted_arr = np.sort(arr, axis=1)
+    count = (~np.isnan(arr)).sum(axis=1)
+    lo = _row_quantile(sorted_arr, count, lower)
+    hi = _row_quantile(sorted_arr, count, upper)
+    np.clip(arr, lo[:, None], hi[:, None], out=arr)
+
+
+def _winsorize_mad_inplace(arr: np.ndarray, n_mad: float) -> None:
+    count = (~np.isnan(arr)).sum(axis=1)
+    median = _row_quantile(np.sort(arr, axis=1), count, 0.5)
+    deviation = np.abs(arr - median[:, None])
+    mad = _row_quantile(np.sort(deviation, axis=1), count, 0.5) * 1.4826
+    np.clip(arr, (median - n_mad * mad)[:, None], (median + n_mad * mad)[:, None], out=arr)
+
+
+def _zscore_inplace(arr: np.ndarray, ddof: int = 1) -> None:
+    valid = ~np.isnan(arr)
+    count = valid.sum(axis=1)
+    mean = np.where(count > 0, np.nansum(arr, axis=1) / np.maximum(count, 1), np.nan)
+    arr -= mean[:, None]
+    sq = np.nansum(arr * arr, axis=1)
+    std = np.sqrt(np.where(count > ddof, sq / np.maximum(count - ddof, 1), np.nan))
+    std[std == 0] = np.nan
+    arr /= std[:, None]
+
+
+def _minmax_inplace(arr: np.ndarray) -> None:
+    has_value = (~np.isnan(arr)).any(axis=1)
+    safe = np.where(has_value[:, None], arr, 0.0)
+    low = np.where(has_value, np.nanmin(safe, axis=1), np.nan)
+    high = np.where(has_value, np.nanmax(safe, axis=1), np.nan)
+    span = high - low
+    span[span == 0] = np.nan
+    arr -= low[:, None]
+    arr /= span[:, None]
+
+
+def _rank_rows(arr: np.ndarray, pct: bool = True) -> np.ndarray:
+    """逐行平均名次 (并列取平均，从 1 开始)，NaN 保持 NaN"""
+    n_rows, n_cols = arr.shape
+    order = np.argsort(arr, axis=1)
+    sorted_arr = np.take_along_axis(arr, order, axis=1)
+    count = (~np.isnan(arr)).sum(axis=1)
+
+    positions = np.broadcast_to(np.arange(n_cols, dtype=np.int64), (n_rows, n_cols))
+    group_start = np.ones((n_rows, n_cols), dtype=bool)
+    group_start[:, 1:] = sorted_arr[:, 1:] != sorted_arr[:, :-1]
+    group_end = np.ones((n_rows, n_cols), dtype=bool)
+    group_end[:, :-1] = group_start[:, 1:]
+
+    first = np.maximum.accumulate(np.where(group_start, positions, 0), axis=1)
+    last = np.flip(
+        np.minimum.accumulate(np.flip(np.where(group_end, positions, n_cols), axis=1), axis=1),
+        axis=1
+    )
+    avg_rank = (first + last) / 2.0 + 1.0
+    avg_rank[np.isnan(sorted_arr)] = np.nan
+    if pct:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_rank /= count[:, None]
+
+    ranks = np.empty((n_rows, n_cols))
+    np.put_along_axis(ranks, order, avg_rank, axis=1)
+    return ranks
+
+
+def _argsort_rows(arr: np.ndarray) -> np.ndarray:
+    """
+    逐行升序排序位置 (NaN 在尾部)，与 np.argsort(arr, axis=1) 的排序结果一致
+
+    浮点数按位转换为保序的 int64 键，低位替换为列号后直接 np.sort，
+    比 argsort 快数倍；截去低位导致的极少数乱序行回退到 argsort
+    """
+    n_rows, n_cols = arr.shape
+    if n_cols <= 1:
+        return np.zeros((n_rows, n_cols), dtype=np.int64)
+    arr = np.ascontiguousarray(arr, dtype=np.float64)
+    bits = (n_cols - 1).bit_length()
+
+    key = arr.view(np.int64)
+    # 负数翻转除符号位外的各位，使整数顺序与浮点顺序一致
+    key = np.where(key < 0, key ^ np.int64(0x7FFFFFFFFFFFFFFF), key)
+    key[np.isnan(arr)] = np.iinfo(np.int64).max
+    key = (key >> bits << bits) | np.arange(n_cols, dtype=np.int64)
+    key.sort(axis=1)
+    order = key & np.int64((1 << bits) - 1)
+
+    sorted_arr = np.take_along_axis(arr, order, axis=1)
+    bad = (sorted_arr[:, 1:] < sorted_arr[:, :-1]).any(axis=1)
+    if bad.any():
+        order[bad] = np.argsort(arr[bad], axis=1)
+    return order
+
+
+def cs_winsorize(
+    values: ArrayLike,
+    lower: float = 0.01,
+    upper: float = 0.99
+) -> ArrayLike:
+    """
+    截面分位数去极值: 每个日期 (行) 按当日分位数截断
+
+    Args:
+        values: 日期 × 股票 数组 / DataFrame (一维输入视为单个截面)
+        lower: 下分位数
+        upper: 上分位数
+    """
+    arr = _as_2d(values)
+    _winsorize_quantile_inplace(arr, lower, upper)
+    return _wrap(arr, values)
+
+
+def cs_winsorize_mad(values: ArrayLike, n_mad: float = 3.0) -> ArrayLike:
+    """
+    截面 MAD 去极值: 截断到 中位数 ± n_mad × 1.4826 × MAD
+
+    Args:
+        values: 日期 × 股票 数组 / DataFrame
+        n_mad: MAD 倍数
+    """
+    arr = _as_2d(values)
+    _winsorize_mad_inplace(arr, n_mad)
+    return _wrap(arr, values)
+
+
+def cs_zscore(values: ArrayLike, ddof: int = 1) -> ArrayLike:
+    """截面 z-score 标准化 (忽略 NaN)"""
+    arr = _as_2d(values)
+    _zscore_inplace(arr, ddof)
+    return _wrap(arr, values)
+
+
+def cs_rank(values: ArrayLike, pct: bool = True) -> ArrayLike:
+    """截面排名 (平均名次，pct=True 时为分位 0-1]"""
+    return _wrap(_rank_rows(_as_2d(values), pct), values)
+
+
+def cs_standardize(
+    values: ArrayLike,
+    winsorize: Optional[str] = 'quantile',
+    normalize: Optional[str] = 'zscore',
+    lower: float = 0.01,
+    upper: float = 0.99,
+    n_mad: float = 3.0
+) -> ArrayLike:
+    """
+    融合的截面预处理: 在同一份数组副本上依次去极值、标准化
+
+    Args:
+        values: 日期 × 股票 数组 / DataFrame
+        winsorize: 'quantile' / 'mad' / None
+        normalize: 'zscore' / 'rank' / 'minmax' / None
+        lower: 分位数去极值下限
+        upper: 分位数去极值上限
+        n_mad: MAD 倍数
+
+    Returns:
+        与输入同形状、同类型的结果
+    """
+    arr = _as_2d(values)
+
+    if winsorize == 'quantile':
+        _winsorize_quantile_inplace(arr, lower, upper)
+    elif winsorize == 'mad':
+        _winsorize_mad_inplace(arr, n_mad)
+    elif winsorize is not None:
+        raise ValueError(f"未知的去极值方法: {winsorize}")
+
+    if normalize == 'zscore':
+        _zscore_inplace(arr)
+    elif normalize == 'rank':
+        arr = _rank_rows(arr, pct=True)
+    elif normalize == 'minmax':
+        _minmax_inplace(arr)
+    elif normalize is not None:
+        raise ValueError(f"未知的标准化方法: {normalize}")
+
+    return _wrap(arr, values)
+
+
+def cs_neutralize(
+    values: np.ndarray,
+    groups: Optional[np.ndarray] = None,
+    exposures: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    截面中性化: 对每个日期做 y ~ 行业哑变量 + 数值暴露 的回归并返回残差
+
+    行业哑变量通过组内去均值消去 (Frisch-Waugh-Lovell)，数值暴露的系数由
+    每个日期的 P × P 正规方程批量求解，全部日期在同一组 numpy 运算中完成
+
+    Args:
+        values: 因子数组 (T, N) 或 (F, T, N)
+        groups: 行业编码 (T, N) 整数数组，-1 为缺失；None 时只去截面均值
+        exposures: 数值暴露 (P, T, N)，如对数市值；None 时只做行业中性化
+
+    Returns:
+        与 values 同形状的残差，任一输入缺失的位置为 NaN
+    """
+    y_all = np.asarray(values, dtype=float)
+    squeeze = y_all.ndim == 2
+    if squeeze:
+        y_all = y_all[None]
+    _, n_dates, n_stocks = y_all.shape
+
+    if groups is None:
+        keys = np.broadcast_to(np.arange(n_dates, dtype=np.int64)[:, None], (n_dates, n_stocks))
+        n_keys = n_dates
+        base_valid = np.ones((n_dates, n_stocks), dtype=bool)
+    else:
+        groups = np.asarray(groups, dtype=np.int64)
+        n_groups = int(groups.max()) + 1 if groups.size and groups.max() >= 0 else 1
+        keys = np.arange(n_dates, dtype=np.int64)[:, None] * n_groups + np.maximum(groups, 0)
+        n_keys = n_dates * n_groups
+        base_valid = groups >= 0
+
+    if exposures is not None:
+        exposures = np.asarray(exposures, dtype=float)
+        if exposures.ndim == 2:
+            exposures = exposures[None]
+        base_valid = base_valid & ~np.isnan(exposures).any(axis=0)
+
+    flat_keys = keys.ravel()
+
+    def demean(x: np.ndarray, valid: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """组内去均值 (只用有效样本)，无效位置置 0"""
+        x = np.where(valid, x, 0.0)
+        sums = np.bincount(flat_keys, weights=x.ravel(), minlength=n_keys)
+        x -= (sums / np.maximum(counts, 1))[keys]
+        x[~valid] = 0.0
+        return x
+
+    result = np.full_like(y_all, np.nan)
+    for f in range(len(y_all)):
+        y = y_all[f]
+        valid = base_valid & ~np.isnan(y)
+        counts = np.bincount(flat_keys, weights=valid.ravel(), minlength=n_keys)
+        y_tilde = demean(y, valid, counts)
+
+        if exposures is not None:
+            z = np.stack([demean(e, valid, counts) for e in exposures])  # (P, T, N)
+            a = np.einsum('ptn,qtn->tpq', z, z)
+            b = np.einsum('ptn,tn->tp', z, y_tilde)
+            beta = np.einsum('tpq,tq->tp', np.linalg.pinv(a), b)
+            y_tilde -= np.einsum('ptn,tp->tn', z, beta)
+
+        y_tilde[~valid] = np.nan
+        result[f] = y_tilde
+
+    return result[0] if squeeze else result
+
+
+# =============================================================================
+# 滚动回归内核
+# =============================================================================
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """沿时间轴 (axis=0) 的滚动求和 (前缀和相减)"""
+    csum = np.cumsum(values, axis=0)
+    result = csum.copy()
+    result[window:] -= csum[:-window]
+    return result
+
+
+def rolling_capm(
+    stock_returns: np.ndarray,
+    market_returns: np.ndarray,
+    risk_free: Union[float, np.ndarray] = 0.0,
+    window: int = 252,
+    min_periods: Optional[int] = None,
+    periods_per_year: int = 252,
+    chunk_size: int = 1024
+) -> dict:
+    """
+    滚动 CAPM 回归: (r_i - rf) = alpha + beta × (r_m - rf) + e
+
+    由 x、y、x²、xy、y² 的滚动和一次得到所有股票、所有日期的回归结果，
+    每个窗口 (含当日在内的最近 window 行) 只用 x、y 均有效的样本
+
+    Args:
+        stock_returns: 日收益率 (T, N) (小数)
+        market_returns: 基准日收益率 (T,)
+        risk_free: 无风险日收益率，标量或 (T,)
+        window: 回归窗口
+        min_periods: 最少有效样本数 (默认 window // 2)
+        periods_per_year: 年化周期数
+        chunk_size: 按股票分块计算以限制内存
+
+    Returns:
+        {'alpha': 年化 alpha, 'beta': beta, 'resid_vol': 年化残差波动率}，均为 (T, N)
+    """
+    y_all = np.asarray(stock_returns, dtype=float)
+    if y_all.ndim == 1:
+        y_all = y_all[:, None]
+    n_dates, n_stocks = y_all.shape
+    if min_periods is None:
+        min_periods = window // 2
+    min_periods = max(min_periods, 3)
+
+    rf = np.broadcast_to(np.asarray(risk_free, dtype=float), (n_dates,))
+    x = np.asarray(market_returns, dtype=float) - rf
+    x_valid = ~np.isnan(x)
+
+    out = {
+        'alpha': np.full((n_dates, n_stocks), np.nan),
+        'beta': np.full((n_dates, n_stocks), np.nan),
+        'resid_vol': np.full((n_dates, n_stocks), np.nan),
+    }
+
+    for start in range(0, n_stocks, chunk_size):
+        cols = slice(start, min(start + chunk_size, n_stocks))
+        y = y_all[:, cols] - rf[:, None]
+        valid = ~np.isnan(y) & x_valid[:, None]
+
+        # 先减去全样本均值再累加，降低前缀和相减的精度损失 (协方差对平移不变)
+        x_full = np.where(valid, x[:, None], 0.0)
+        y_full = np.where(valid, y, 0.0)
+        count = np.maximum(valid.sum(axis=0), 1)
+        x_center = x_full.sum(axis=0) / count
+        y_center = y_full.sum(axis=0) / count
+        xc = np.where(valid, x_full - x_center, 0.0)
+        yc = np.where(valid, y_full - y_center, 0.0)
+        del x_full, y_full
+
+        n = _rolling_sum(valid.astype(float), window)
+        sx = _rolling_sum(xc, window)
+        sy = _rolling_sum(yc, window)
+        sxx = _rolling_sum(xc * xc, window)
+        sxy = _rolling_sum(xc * yc, window)
+        syy = _rolling_sum(yc * yc, window)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mx = sx / n
+            my = sy / n
+            var_x = sxx / n - mx * mx
+            var_y = syy / n - my * my
+            cov = sxy / n - mx * my
+            beta = cov / var_x
+            alpha = (my + y_center) - beta * (mx + x_center)
+            resid_var = np.maximum(var_y - beta * cov, 0.0) * n / (n - 2)
+
+        ok = (n >= min_periods) & (var_x > 0)
+        out['beta'][:, cols] = np.where(ok, beta, np.nan)
+        out['alpha'][:, cols] = np.where(ok, alpha * periods_per_year, np.nan)
+        out['resid_vol'][:, cols] = np.where(ok, np.sqrt(resid_var * periods_per_year), np.nan)
+
+    return out
+
+
+def rolling_slope(
+    values: ArrayLike,
+    window: int,
+    min_periods: Optional[int] = None
+) -> ArrayLike:
+    """
+    滚动线性趋势: 窗口内 (含当期在内的最近 window 行) 有效值对期序号的 OLS 斜率
+
+    与逐窗口 np.polyfit(x[mask], y[mask], 1)[0] 一致，但由 x、y、x²、xy 的滚动和
+    一次得到所有股票、所有日期的结果
+
+    Args:
+        values: 单序列 (Series / 1 维数组) 或 日期 × 股票 面板 (DataFrame / 2 维数组)
+        window: 窗口长度 (行数)
+        min_periods: 窗口内最少有效值个数 (默认为窗口的一半且不少于 3)
+
+    Returns:
+        与输入同形状、同类型的斜率 (每期变化量)
+    """
+    if isinstance(values, pd.DataFrame):
+        result = rolling_slope(values.to_numpy(dtype=float), window, min_periods)
+        return pd.DataFrame(result, index=values.index, columns=values.columns)
+    if isinstance(values, pd.Series):
+        result = rolling_slope(values.to_numpy(dtype=float), window, min_periods)
+        return pd.Series(result, index=values.index, name=values.name)
+
+    y = np.asarray(values, dtype=float)
+    if y.ndim == 1:
+        return rolling_slope(y[:, None], window, min_periods)[:, 0]
+    if min_periods is None:
+        min_periods = (window + 1) // 2
+    min_periods = max(min_periods, 3)
+
+    valid = ~np.isnan(y)
+    # 期序号与 y 均先居中再累加，降低前缀和相减的精度损失 (斜率对平移不变)
+    x = np.arange(len(y), dtype=float)[:, None] - (len(y) - 1) / 2
+    xc = np.where(valid, x, 0.0)
+    count = np.maximum(valid.sum(axis=0), 1)
+    yc = np.where(valid, y - np.nansum(y, axis=0) / count, 0.0)
+
+    n = _rolling_sum(valid.astype(float), window)
+    sx = _rolling_sum(xc, window)
+    sy = _rolling_sum(yc, window)
+    sxx = _rolling_sum(xc * xc, window)
+    sxy = _rolling_sum(xc * yc, window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var_x = sxx - sx * sx / n
+        slope = (sxy - sx * sy / n) / var_x
+    return np.where((n >= min_periods) & (var_x > 1e-12), slope, np.nan)
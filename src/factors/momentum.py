@@ -1,10 +1,13 @@
 # src/factors/momentum.py
 """动量因子计算"""
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 import pandas as pd
 import numpy as np
 
+from ..utils.logger import get_logger
+from .kernels import cs_rank, rolling_capm
+
 
 class MomentumFactors:
     """动量因子计算器"""
@@ -70,6 +73,89 @@ class MomentumFactors:
         rs = (stock_ret - bench_ret) / bench_ret.abs().clip(lower=0.01)
         return rs
     
+    @staticmethod
+    def shibor_daily_rate(
+        shibor: pd.DataFrame,
+        dates: Optional[pd.Index] = None,
+        tenor: str = '3m',
+        periods_per_year: int = 252
+    ) -> pd.Series:
+        """
+        将 SHIBOR (年化 %) 转为无风险日收益率
+        
+        Args:
+            shibor: get_shibor 返回的数据 (date, on, 1w, ..., 1y)
+            dates: 需要对齐的交易日 (缺失日期沿用最近一次报价)
+            tenor: 期限列
+            periods_per_year: 年化周期数
+            
+        Returns:
+            以日期为索引的日收益率 (小数)
+        """
+        rate = shibor.set_index('date')[tenor].astype(float).sort_index()
+        rate = rate[~rate.index.duplicated(keep='last')] / 100 / periods_per_year
+        if dates is not None:
+            rate = rate.reindex(rate.index.union(dates)).ffill().reindex(dates)
+        return rate
+    
+    @staticmethod
+    def benchmark_returns(
+        index_daily: pd.DataFrame,
+        dates: Optional[pd.Index] = None
+    ) -> pd.Series:
+        """
+        由 get_index_daily 计算基准日收益率
+        
+        Args:
+            index_daily: 指数日线 (trade_date, close)
+            dates: 需要对齐的交易日
+            
+        Returns:
+            以 trade_date 为索引的日收益率 (小数)
+        """
+        close = index_daily.drop_duplicates('trade_date', keep='last') \
+            .set_index('trade_date')['close'].astype(float).sort_index()
+        returns = close.pct_change()
+        if dates is not None:
+            returns = returns.reindex(dates)
+        return returns
+    
+    def calc_capm_panel(
+        self,
+        returns: pd.DataFrame,
+        market_returns: pd.Series,
+        risk_free: Union[float, pd.Series] = 0.03,
+        window: int = 252,
+        min_periods: int = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        面板模式: 全部股票、全部日期的滚动 CAPM alpha / beta / 残差波动率
+        
+        Args:
+            returns: 日期 × 股票 日收益率 (小数)
+            market_returns: 基准日收益率 (按日期对齐)
+            risk_free: 年化无风险利率 (标量)，或无风险日收益率序列 (见 shibor_daily_rate)
+            window: 回归窗口 (含当日)
+            min_periods: 最少有效样本数 (默认 window // 2)
+            
+        Returns:
+            {'factor_alpha', 'factor_beta', 'factor_resid_vol'} -> 日期 × 股票 面板
+        """
+        market = market_returns.reindex(returns.index).to_numpy(dtype=float)
+        if isinstance(risk_free, pd.Series):
+            rf = risk_free.reindex(returns.index).ffill().fillna(0).to_numpy(dtype=float)
+        else:
+            rf = risk_free / 252
+        
+        out = rolling_capm(
+            returns.to_numpy(dtype=float), market, rf,
+            window=window, min_periods=min_periods
+        )
+        return {
+            f'factor_{name}': pd.DataFrame(values, index=returns.index, columns=returns.columns)
+            for name, values in out.items()
+        }
+    
     def calc_alpha(
         self, 
         stock_returns: pd.Series,
@@ -80,34 +166,16 @@ class MomentumFactors:
         """
         计算历史 Alpha
         
-        使用简单的 CAPM 模型
+        使用简单的 CAPM 模型，每个日期使用此前 window 个交易日 (不含当日) 回归
         """
-        # 超额收益
-        excess_stock = stock_returns - risk_free_rate / 252
-        excess_market = market_returns - risk_free_rate / 252
-        
-        def rolling_alpha(idx):
-            if idx < window:
-                return np.nan
-            
-            y = excess_stock.iloc[idx-window:idx]
-            x = excess_market.iloc[idx-window:idx]
-            
-            # 简单线性回归
-            if len(x) < window // 2:
-                return np.nan
-            
-            cov = np.cov(x, y)[0, 1]
-            var = np.var(x)
-            if var == 0:
-                return np.nan
-            
-            beta = cov / var
-            alpha = y.mean() - beta * x.mean()
-            return alpha * 252  # 年化
-        
-        alphas = [rolling_alpha(i) for i in range(len(stock_returns))]
-        return pd.Series(alphas, index=stock_returns.index)
+        out = rolling_capm(
+            stock_returns.to_numpy(dtype=float),
+            market_returns.to_numpy(dtype=float),
+            risk_free_rate / 252,
+            window=window, min_periods=window
+        )
+        alpha = pd.Series(out['alpha'][:, 0], index=stock_returns.index)
+        return alpha.shift(1)
     
     def calc_all(
         self, 
@@ -130,3 +198,198 @@ class MomentumFactors:
         result['factor_momentum_score'] = self.calc_momentum_score(close)
         
         return result
+    
+    def calc_panel(self, close: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        面板模式: 在 日期 × 股票 收盘价面板上计算动量因子
+        
+        收益率按列 (股票) 计算，不会跨股票；综合得分为每个交易日
+        各周期收益率截面分位数的平均 (见 MomentumEngine)。
+        配置 skip_window > 0 时收益率因子改名为 factor_ret_{n}m_skip{skip_window}，
+        不大于 skip_window 的周期不计算 (记录警告)
+        
+        Args:
+            close: 日期 × 股票 收盘价面板 (建议使用复权价格)
+            
+        Returns:
+            因子名 -> 日期 × 股票 面板
+        """
+        engine = MomentumEngine(
+            windows=self.windows, skip=self.config.get('skip_window', 0)
+        )
+        return engine.fit(close)
+
+
+class MomentumEngine:
+    """
+    截面动量引擎 (日期 × 股票 复权收盘价面板)
+
+    - 对数价格只计算一次，各周期收益率均为两行对数价格之差:
+      ret_w[t] = exp(L[t - skip] - L[t - w]) - 1
+    - skip > 0 时剔除最近 skip 个交易日 (短期反转)
+    - 每个交易日对各周期收益率做截面排名，综合得分为排名均值
+    - 保留最近 max(windows) 行对数价格作为状态，append() 只计算新交易日
+    """
+
+    def __init__(
+        self,
+        windows: List[int] = (21, 63, 126, 252),
+        skip: int = 0
+    ):
+        """
+        Args:
+            windows: 收益率周期 (交易日)
+            skip: 剔除最近的交易日数 (0 为不剔除)。skip > 0 时因子名带 _skip{skip}
+                后缀 (如 factor_ret_1m_skip21)，不大于 skip 的周期不计算
+        """
+        self.windows = [w for w in windows if w > skip]
+        dropped = [w for w in windows if w <= skip]
+        if dropped:
+            get_logger('momentum').warning(
+                f"动量周期 {dropped} 不大于 skip_window={skip}，对应因子不计算"
+            )
+        self.skip = skip
+        self._state: Optional[pd.DataFrame] = None  # 最近 max(windows) 行对数价格
+
+    def factor_names(self) -> List[str]:
+        """因子名 (与 MomentumFactors 保持一致，剔除近期时带 _skip 后缀)"""
+        suffix = f'_skip{self.skip}' if self.skip else ''
+        return [f'factor_ret_{w // 21}m{suffix}' for w in self.windows]
+
+    @staticmethod
+    def log_price(close: pd.DataFrame) -> pd.DataFrame:
+        """对数价格，停牌日沿用最近价格"""
+        values = close.to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_price = np.log(np.where(values > 0, values, np.nan))
+        return pd.DataFrame(log_price, index=close.index, columns=close.columns).ffill()
+
+    @staticmethod
+    def window_return(
+        log_price: np.ndarray,
+        traded: np.ndarray,
+        window: int,
+        skip: int = 0,
+        start: int = 0
+    ) -> np.ndarray:
+        """
+        由对数价格计算区间收益率 (百分比): exp(L[t - skip] - L[t - window]) - 1
+
+        Args:
+            log_price: 对数价格 (T, N)，已前向填充
+            traded: 当日是否有价格 (T, N)，无价格的日期结果为 NaN
+            window: 收益率周期
+            skip: 剔除最近的交易日数
+            start: 首个输出行
+
+        Returns:
+            (T - start, N) 数组
+        """
+        rows = np.arange(start, len(log_price))
+        ret = np.full((len(rows), log_price.shape[1]), np.nan)
+        ok = rows >= window
+        with np.errstate(invalid='ignore', over='ignore'):
+            ret[ok] = np.expm1(log_price[rows[ok] - skip] - log_price[rows[ok] - window]) * 100
+        ret[~traded[start:]] = np.nan
+        return ret
+
+    @staticmethod
+    def momentum_score(returns: List[np.ndarray]) -> np.ndarray:
+        """
+        综合动量得分: 各周期收益率截面排名的均值 (忽略缺失)
+
+        Args:
+            returns: 各周期收益率 (T, N) 数组
+
+        Returns:
+            (T, N) 数组
+        """
+        stacked = np.stack([cs_rank(ret) for ret in returns])
+        count = (~np.isnan(stacked)).sum(axis=0)
+        total = np.nansum(stacked, axis=0)
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+    def _compute(
+        self,
+        log_price: np.ndarray,
+        traded: np.ndarray,
+        start: int
+    ) -> Dict[str, np.ndarray]:
+        """
+        计算第 start 行及之后的因子
+
+        Args:
+            log_price: 对数价格 (T, N)，已前向填充
+            traded: 当日是否有价格 (T, N)
+            start: 首个输出行
+
+        Returns:
+            因子名 -> (T - start, N) 数组
+        """
+        result = {
+            name: self.window_return(log_price, traded, w, self.skip, start)
+            for name, w in zip(self.factor_names(), self.windows)
+        }
+        if result:
+            result['factor_momentum_score'] = self.momentum_score(list(result.values()))
+        return result
+
+    def _keep_state(self, log_price: pd.DataFrame) -> None:
+        keep = max(self.windows) if self.windows else 1
+        self._state = log_price.iloc[-keep:]
+
+    def fit(self, close: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        计算全部历史的动量因子
+
+        Args:
+            close: 日期 × 股票 复权收盘价面板 (按日期升序)
+
+        Returns:
+            因子名 -> 日期 × 股票 面板
+        """
+        close = close.sort_index()
+        log_price = self.log_price(close)
+        traded = close.notna().to_numpy()
+        result = self._compute(log_price.to_numpy(), traded, 0)
+        self._keep_state(log_price)
+        return {
+            name: pd.DataFrame(values, index=close.index, columns=close.columns)
+            for name, values in result.items()
+        }
+
+    def append(self, close: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        追加新交易日，只计算新增行
+
+        Args:
+            close: 新交易日的 日期 × 股票 复权收盘价 (日期需晚于已处理的数据)
+
+        Returns:
+            因子名 -> 新交易日的 日期 × 股票 面板
+        """
+        if self._state is None:
+            return self.fit(close)
+
+        close = close.sort_index()
+        if len(self._state) and close.index[0] <= self._state.index[-1]:
+            raise ValueError("追加数据的日期需晚于已处理的最后一个交易日")
+
+        codes = self._state.columns.union(close.columns)
+        state = self._state.reindex(columns=codes)
+        close = close.reindex(columns=codes)
+
+        # 新行的对数价格在状态尾部基础上前向填充
+        new_log = self.log_price(close)
+        combined = pd.concat([state, new_log]).ffill()
+        traded = np.vstack([
+            np.ones(state.shape, dtype=bool), close.notna().to_numpy()
+        ])
+
+        result = self._compute(combined.to_numpy(), traded, len(state))
+        # 状态行数不足最大窗口时 (fit 数据过短)，对应周期在新行上为 NaN，与 fit 一致
+        self._keep_state(combined)
+        return {
+            name: pd.DataFrame(values, index=close.index, columns=codes)
+            for name, values in result.items()
+        }
@@ -0,0 +1,206 @@
+"""按股票分片的多进程因子计算"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.logger import get_logger
+from .dag import FactorGraph
+
+
+# 共享内存数组描述: (共享内存名, 形状)，数据类型固定为 float64
+ArraySpec = Tuple[str, Tuple[int, int]]
+
+
+def _attach(spec: ArraySpec) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """按描述连接共享内存数组"""
+    name, shape = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _run_shard(
+    config: dict,
+    inputs: Dict[str, ArraySpec],
+    outputs: Dict[str, ArraySpec],
+    extras: Dict[str, object],
+    dates: pd.Index,
+    codes: pd.Index,
+    lo: int,
+    hi: int
+) -> int:
+    """
+    子进程: 计算股票 [lo, hi) 上的因子并写入共享输出数组
+
+    Returns:
+        处理的股票数
+    """
+    from .pipeline import FactorPipeline
+
+    data = dict(extras)
+    for name, spec in inputs.items():
+        shm, array = _attach(spec)
+        # 复制为连续的分片，随即释放对共享内存的引用
+        data[name] = pd.DataFrame(
+            np.array(array[:, lo:hi]), index=dates, columns=codes[lo:hi]
+        )
+        del array
+        shm.close()
+
+    graph = FactorPipeline(config).graph
+    result = graph.run(list(outputs), data, max_workers=1)
+
+    for name, spec in outputs.items():
+        shm, array = _attach(spec)
+        array[:, lo:hi] = result[name].to_numpy(dtype=np.float64)
+        del array
+        shm.close()
+    return hi - lo
+
+
+class ShardedRunner:
+    """
+    按股票轴分片的多进程执行器
+
+    - 输入面板复制到共享内存一次，子进程按名称连接后只读取自己的列区间，
+      不序列化大面板
+    - 各子进程把结果写入共享输出数组的对应列，主进程直接读取
+    - 截面节点 (cross_sectional) 依赖全部股票，在主进程汇总分片结果后计算
+    """
+
+    def __init__(self, pipeline, n_workers: Optional[int] = None):
+        """
+        Args:
+            pipeline: FactorPipeline 实例 (子进程按其配置重建同一因子图)
+            n_workers: 进程数 (默认 CPU 核数)
+        """
+        self.logger = get_logger('sharded_runner')
+        self.graph: FactorGraph = pipeline.graph
+        self.config = pipeline.config
+        self.n_workers = n_workers or os.cpu_count() or 1
+
+    def partition(
+        self,
+        targets: List[str],
+        available: List[str]
+    ) -> List[str]:
+        """
+        需要在子进程中按股票分片计算的输出
+
+        包括: 不依赖截面节点的目标因子，以及截面节点所需的非截面输入
+
+        Args:
+            targets: 需要的输出
+            available: 已提供的原始输入
+
+        Returns:
+            分片计算的输出名
+        """
+        nodes = self.graph.resolve(targets, available=available)
+        produced_by = {out: node for node in nodes for out in node.outputs}
+
+        # 截面节点及其下游都只能在主进程计算
+        central = set()
+        for node in nodes:
+            if node.cross_sectional or any(
+                d in produced_by and produced_by[d].name in central for d in node.inputs
+            ):
+                central.add(node.name)
+
+        sharded = []
+        for node in nodes:
+            if node.name not in central:
+                continue
+            sharded.extend(
+                d for d in node.inputs
+                if d in produced_by and produced_by[d].name not in central
+            )
+        sharded.extend(
+            t for t in targets if t in produced_by and produced_by[t].name not in central
+        )
+        return list(dict.fromkeys(sharded))
+
+    def run(
+        self,
+        targets: List[str],
+        panels: Dict[str, pd.DataFrame],
+        extras: Optional[Dict[str, object]] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        计算所请求的因子
+
+        Args:
+            targets: 需要的输出
+            panels: 原始输入面板 (日期 × 股票，共用同一日期轴与股票轴)
+            extras: 其他非面板输入 (如 market_returns、risk_free)，原样传给各子进程
+
+        Returns:
+            输出名 -> 日期 × 股票 面板
+        """
+        extras = dict(extras or {})
+        first = next(iter(panels.values()))
+        dates, codes = first.index, first.columns
+        shape = (len(dates), len(codes))
+
+        sharded = self.partition(targets, list(panels) + list(extras))
+        bounds = np.linspace(0, len(codes), min(self.n_workers, len(codes)) + 1).astype(int)
+        self.logger.info(
+            f"分片计算 {len(sharded)} 个输出: {len(codes)} 只股票 × {len(dates)} 个交易日, "
+            f"{len(bounds) - 1} 个进程"
+        )
+
+        blocks: List[shared_memory.SharedMemory] = []
+
+        def allocate(values: Optional[np.ndarray] = None) -> ArraySpec:
+            shm = shared_memory.SharedMemory(create=True, size=max(shape[0] * shape[1] * 8, 1))
+            blocks.append(shm)
+            array = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            if values is None:
+                array.fill(np.nan)
+            else:
+                array[:] = values
+            del array
+            return shm.name, shape
+
+        try:
+            needed = self.graph.required_inputs(sharded)
+            inputs = {
+                name: allocate(panel.to_numpy(dtype=np.float64))
+                for name, panel in panels.items() if name in needed
+            }
+            outputs = {name: allocate() for name in sharded}
+
+            if len(bounds) > 2:
+                with ProcessPoolExecutor(max_workers=len(bounds) - 1) as executor:
+                    futures = [
+                        executor.submit(
+                            _run_shard, self.config, inputs, outputs, extras,
+                            dates, codes, lo, hi
+                        )
+                        for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+                    ]
+                    for future in futures:
+                        future.result()
+            elif sharded:
+                _run_shard(self.config, inputs, outputs, extras, dates, codes, 0, len(codes))
+
+            result: Dict[str, object] = {}
+            for name, spec in outputs.items():
+                shm, array = _attach(spec)
+                result[name] = pd.DataFrame(array.copy(), index=dates, columns=codes)
+                del array
+                shm.close()
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+        remaining = [t for t in targets if t not in result]
+        if remaining:
+            data = {**panels, **extras, **result}
+            result.update(self.graph.run(remaining, data, max_workers=1))
+        return {t: result[t] for t in targets}
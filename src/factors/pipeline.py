@@ -2,15 +2,21 @@
 """因子计算流水线"""
 
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 
 from ..utils.config import load_config
 from ..utils.logger import get_logger
+from ..data_source.pit_store import PITStore
 from .valuation import ValuationFactors
 from .quality import QualityFactors
 from .growth import GrowthFactors
 from .momentum import MomentumFactors
 from .dividend import DividendFactors
+from .kernels import cs_neutralize, cs_standardize
+from .store import FactorStore
+from .dag import FactorGraph, build_default_graph
+from .parallel import ShardedRunner
 
 
 class FactorPipeline:
@@ -37,6 +43,7 @@ class FactorPipeline:
         self.growth = GrowthFactors(config.get('growth', {}))
         self.momentum = MomentumFactors(config.get('momentum', {}))
         self.dividend = DividendFactors(config.get('dividend', {}))
+        self._graph: Optional[FactorGraph] = None
         
         self.logger.info("因子流水线初始化完成")
     
@@ -51,6 +58,8 @@ class FactorPipeline:
         Args:
             market_data: 市场数据 (daily_basic)
             fundamental_data: 基本面数据 (fina_indicator)
+                若两者均带 ts_code/trade_date 与 ts_code/ann_date 列，
+                先按公告日时点对齐到市场数据的每一行
             
         Returns:
             包含所有因子的 DataFrame
@@ -77,6 +86,12 @@ class FactorPipeline:
         
         # 基本面因子 (如果有数据)
         if fundamental_data is not None and not fundamental_data.empty:
+            if self._can_align(market_data, fundamental_data):
+                self.logger.info("按公告日时点对齐基本面数据...")
+                fundamental_data = self.align_fundamentals(
+                    market_data, fundamental_data
+                )
+            
             self.logger.info("计算质量因子...")
             quality_factors = self.quality.calc_all(fundamental_data)
             results.append(quality_factors)
@@ -94,6 +109,415 @@ class FactorPipeline:
         self.logger.info(f"因子计算完成，共 {len(all_factors.columns)} 个因子")
         return all_factors
     
+    # =========================================================================
+    # 面板模式
+    # =========================================================================
+    
+    PANEL_FIELDS = ['pe_ttm', 'pb', 'ps_ttm', 'dv_ttm', 'dv_ratio']
+    
+    @staticmethod
+    def to_panels(
+        data: pd.DataFrame,
+        fields: List[str]
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        长表 (trade_date, ts_code, 字段...) 转为 日期 × 股票 面板
+        
+        Args:
+            data: 长表数据，每个 (trade_date, ts_code) 至多一行
+            fields: 需要转换的字段
+            
+        Returns:
+            字段名 -> 日期 × 股票 面板 (缺失为 NaN)
+        """
+        dates = pd.Index(np.sort(data['trade_date'].unique()), name='trade_date')
+        codes = pd.Index(np.sort(data['ts_code'].unique()), name='ts_code')
+        rows = dates.get_indexer(data['trade_date'])
+        cols = codes.get_indexer(data['ts_code'])
+        
+        panels = {}
+        for field in fields:
+            values = np.full((len(dates), len(codes)), np.nan)
+            values[rows, cols] = pd.to_numeric(data[field], errors='coerce').to_numpy(dtype=float)
+            panels[field] = pd.DataFrame(values, index=dates, columns=codes)
+        return panels
+    
+    @staticmethod
+    def from_panels(
+        panels: Dict[str, pd.DataFrame],
+        index: pd.MultiIndex
+    ) -> pd.DataFrame:
+        """
+        从 日期 × 股票 面板中按 (trade_date, ts_code) 取回长表
+        
+        Args:
+            panels: 因子名 -> 面板 (共用同一日期轴与股票轴)
+            index: 需要返回的 (trade_date, ts_code) 组合
+            
+        Returns:
+            以 index 为索引的因子 DataFrame
+        """
+        result = pd.DataFrame(index=index)
+        if not panels:
+            return result
+        
+        first = next(iter(panels.values()))
+        rows = first.index.get_indexer(index.get_level_values('trade_date'))
+        cols = first.columns.get_indexer(index.get_level_values('ts_code'))
+        found = (rows >= 0) & (cols >= 0)
+        
+        for name, panel in panels.items():
+            values = np.full(len(index), np.nan)
+            values[found] = panel.to_numpy(dtype=float)[rows[found], cols[found]]
+            result[name] = values
+        return result
+    
+    def calculate_panel(
+        self,
+        market_data: pd.DataFrame,
+        fundamental_data: pd.DataFrame = None,
+        close_col: str = 'close',
+        market_returns: pd.Series = None,
+        risk_free=0.03
+    ) -> pd.DataFrame:
+        """
+        面板模式计算全市场因子
+        
+        - 时间序列因子 (收益率、历史分位数) 在 日期 × 股票 矩阵上按列计算，不跨股票
+        - 截面变换 (动量得分的分位数) 按交易日计算
+        - 基本面因子按公告日时点对齐后逐行计算
+        - momentum.skip_window > 0 时动量收益率因子带 _skip{n} 后缀
+          (如 factor_ret_1m → factor_ret_1m_skip21)，周期不大于 skip_window 的因子
+          不输出并记录警告；下游按因子名取列时需使用改名后的名称
+        
+        Args:
+            market_data: 长表市场数据 (ts_code, trade_date, pe_ttm, pb, close...)，
+                可包含任意多只股票
+            fundamental_data: 基本面数据 (ts_code, ann_date, end_date, ...)
+            close_col: 计算动量所用的价格列 (建议为复权收盘价)
+            market_returns: 基准日收益率 (以 trade_date 为索引，见
+                MomentumFactors.benchmark_returns)；提供时计算滚动 CAPM 因子
+            risk_free: 年化无风险利率，或无风险日收益率序列 (见
+                MomentumFactors.shibor_daily_rate)
+            
+        Returns:
+            MultiIndex (trade_date, ts_code) 的因子 DataFrame
+        """
+        self.logger.info("开始计算因子 (面板模式)...")
+        
+        market_data = market_data.drop_duplicates(
+            subset=['trade_date', 'ts_code'], keep='last'
+        )
+        fields = [f for f in self.PANEL_FIELDS if f in market_data.columns]
+        if close_col in market_data.columns:
+            fields.append(close_col)
+        panels = self.to_panels(market_data, fields)
+        
+        factor_panels: Dict[str, pd.DataFrame] = {}
+        
+        self.logger.info("计算估值因子...")
+        factor_panels.update(self.valuation.calc_panel(panels))
+        
+        if close_col in panels:
+            self.logger.info("计算动量因子...")
+            factor_panels.update(self.momentum.calc_panel(panels[close_col]))
+            
+            if market_returns is not None:
+                self.logger.info("计算 CAPM 因子...")
+                close = panels[close_col]
+                factor_panels.update(self.momentum.calc_capm_panel(
+                    close / close.shift(1) - 1, market_returns, risk_free
+                ))
+        
+        self.logger.info("计算股息因子...")
+        factor_panels.update(self.dividend.calc_panel(panels))
+        
+        index = pd.MultiIndex.from_arrays(
+            [market_data['trade_date'].to_numpy(), market_data['ts_code'].to_numpy()],
+            names=['trade_date', 'ts_code']
+        )
+        all_factors = self.from_panels(factor_panels, index)
+        
+        if fundamental_data is not None and not fundamental_data.empty:
+            if not self._can_align(market_data, fundamental_data):
+                raise ValueError("面板模式的基本面数据需要 ts_code、ann_date、end_date 列")
+            
+            self.logger.info("按公告日时点对齐基本面数据...")
+            aligned = self.align_fundamentals(market_data, fundamental_data)
+            aligned.index = index
+            
+            self.logger.info("计算质量因子...")
+            quality_factors = self.quality.calc_all(aligned)
+            
+            self.logger.info("计算成长因子...")
+            growth_factors = self.growth.calc_all(aligned)
+            
+            all_factors = pd.concat([all_factors, quality_factors, growth_factors], axis=1)
+        
+        all_factors = all_factors.sort_index()
+        self.logger.info(
+            f"因子计算完成，共 {len(all_factors.columns)} 个因子, "
+            f"{all_factors.index.get_level_values('ts_code').nunique()} 只股票"
+        )
+        return all_factors
+    
+    @property
+    def graph(self) -> FactorGraph:
+        """默认因子依赖图 (见 build_default_graph)"""
+        if self._graph is None:
+            self._graph = build_default_graph(self)
+        return self._graph
+    
+    def _graph_inputs(
+        self,
+        market_data: pd.DataFrame,
+        needed: set,
+        fundamental_data: pd.DataFrame = None,
+        close_col: str = 'close',
+        market_returns: pd.Series = None,
+        risk_free=0.03
+    ) -> Dict[str, object]:
+        """
+        构建因子图的原始输入: 只转换 needed 中的字段
+        
+        Returns:
+            输入名 -> 日期 × 股票 面板 (market_returns、risk_free 原样保留)
+        """
+        market_cols = {
+            name: (close_col if name == 'close' else name) for name in needed
+            if (close_col if name == 'close' else name) in market_data.columns
+        }
+        panels = self.to_panels(market_data, list(market_cols.values()))
+        data: Dict[str, object] = {name: panels[col] for name, col in market_cols.items()}
+        
+        fundamental_fields = [
+            name for name in needed - set(data)
+            if fundamental_data is not None and name in fundamental_data.columns
+        ]
+        if fundamental_fields:
+            if not self._can_align(market_data, fundamental_data):
+                raise ValueError("基本面数据需要 ts_code、ann_date、end_date 列")
+            aligned = self.align_fundamentals(
+                market_data,
+                fundamental_data[['ts_code', 'ann_date', 'end_date'] + fundamental_fields]
+            )
+            aligned[['trade_date', 'ts_code']] = market_data[['trade_date', 'ts_code']]
+            data.update(self.to_panels(aligned, fundamental_fields))
+        
+        if market_returns is not None:
+            data['market_returns'] = market_returns
+        data['risk_free'] = risk_free
+        
+        missing = needed - set(data)
+        if missing:
+            raise ValueError(f"缺少因子计算所需的输入: {sorted(missing)}")
+        return data
+    
+    def calculate_selected(
+        self,
+        market_data: pd.DataFrame,
+        factors: List[str],
+        fundamental_data: pd.DataFrame = None,
+        close_col: str = 'close',
+        market_returns: pd.Series = None,
+        risk_free=0.03,
+        max_workers: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        按需计算指定因子
+        
+        只转换所需的原始字段、只执行所需的因子节点 (最小子图)，
+        共享的中间量 (对数价格、日收益率) 只计算一次，互不依赖的节点并发执行。
+        因子名与 calculate_panel 一致 (含 skip_window 带来的 _skip{n} 后缀)
+        
+        Args:
+            market_data: 长表市场数据 (ts_code, trade_date, ...)
+            factors: 需要的因子名
+            fundamental_data: 基本面数据 (ts_code, ann_date, end_date, ...)
+            close_col: 动量、CAPM 所用的价格列
+            market_returns: 基准日收益率 (计算 CAPM 因子时需要)
+            risk_free: 年化无风险利率或无风险日收益率序列
+            max_workers: 并发线程数 (1 为串行)
+            
+        Returns:
+            MultiIndex (trade_date, ts_code) 的因子 DataFrame (列顺序与 factors 一致)
+        """
+        market_data = market_data.drop_duplicates(
+            subset=['trade_date', 'ts_code'], keep='last'
+        )
+        data = self._graph_inputs(
+            market_data, self.graph.required_inputs(factors), fundamental_data,
+            close_col, market_returns, risk_free
+        )
+        result = self.graph.run(factors, data, max_workers=max_workers)
+        return self._to_long(result, market_data)[list(factors)]
+    
+    def calculate_sharded(
+        self,
+        market_data: pd.DataFrame,
+        factors: List[str],
+        fundamental_data: pd.DataFrame = None,
+        close_col: str = 'close',
+        market_returns: pd.Series = None,
+        risk_free=0.03,
+        n_workers: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        多进程按股票分片计算指定因子
+        
+        输入面板经共享内存传给子进程，每个进程计算一段股票的时间序列因子并写入共享输出数组；
+        截面因子 (如动量综合得分) 在主进程汇总后计算。结果与 calculate_selected 一致
+        
+        Args:
+            market_data: 长表市场数据 (ts_code, trade_date, ...)
+            factors: 需要的因子名
+            fundamental_data: 基本面数据 (ts_code, ann_date, end_date, ...)
+            close_col: 动量、CAPM 所用的价格列
+            market_returns: 基准日收益率 (计算 CAPM 因子时需要)
+            risk_free: 年化无风险利率或无风险日收益率序列
+            n_workers: 进程数 (默认 CPU 核数)
+            
+        Returns:
+            MultiIndex (trade_date, ts_code) 的因子 DataFrame (列顺序与 factors 一致)
+        """
+        market_data = market_data.drop_duplicates(
+            subset=['trade_date', 'ts_code'], keep='last'
+        )
+        data = self._graph_inputs(
+            market_data, self.graph.required_inputs(factors), fundamental_data,
+            close_col, market_returns, risk_free
+        )
+        extras = {
+            name: data.pop(name) for name in ('market_returns', 'risk_free') if name in data
+        }
+        result = ShardedRunner(self, n_workers).run(factors, data, extras)
+        return self._to_long(result, market_data)[list(factors)]
+    
+    def _to_long(
+        self,
+        panels: Dict[str, pd.DataFrame],
+        market_data: pd.DataFrame
+    ) -> pd.DataFrame:
+        """按 market_data 的 (trade_date, ts_code) 取回长表并排序"""
+        index = pd.MultiIndex.from_arrays(
+            [market_data['trade_date'].to_numpy(), market_data['ts_code'].to_numpy()],
+            names=['trade_date', 'ts_code']
+        )
+        return self.from_panels(panels, index).sort_index()
+    
+    def required_lookback(self, capm_window: int = 252) -> int:
+        """
+        增量计算所需的预热交易日数 (最长滚动窗口)
+        
+        Args:
+            capm_window: CAPM 回归窗口 (计算 CAPM 因子时)
+        """
+        windows = [
+            self.valuation.pe_window,
+            self.valuation.pb_window,
+            max(self.momentum.windows, default=0) + self.config.get('momentum', {}).get('skip_window', 0),
+            capm_window + 1,
+        ]
+        return max(windows)
+    
+    def calculate_incremental(
+        self,
+        market_data: pd.DataFrame,
+        store: FactorStore,
+        fundamental_data: pd.DataFrame = None,
+        **kwargs
+    ) -> pd.DataFrame:
+        """
+        增量计算: 只计算因子存储中尚未包含的交易日
+        
+        从 market_data 中截取 待计算首日之前 required_lookback() 个交易日起的数据作为预热，
+        用面板模式计算后只保留待计算日期并写入存储
+        
+        Args:
+            market_data: 长表市场数据 (需覆盖预热区间，多余的历史会被忽略)
+            store: 因子存储 (其配置哈希应与本流水线配置一致)
+            fundamental_data: 基本面数据
+            **kwargs: 传给 calculate_panel 的其他参数
+            
+        Returns:
+            新计算的因子 (MultiIndex (trade_date, ts_code))
+        """
+        dates = sorted(market_data['trade_date'].unique())
+        pending = store.pending_dates(dates)
+        if not pending:
+            self.logger.info("因子存储已是最新")
+            return pd.DataFrame()
+        
+        first = dates.index(pending[0])
+        warmup_start = dates[max(first - self.required_lookback(), 0)]
+        window = market_data[market_data['trade_date'] >= warmup_start]
+        self.logger.info(
+            f"增量计算 {len(pending)} 个交易日 ({pending[0]} - {pending[-1]}), "
+            f"预热起点 {warmup_start}"
+        )
+        
+        factors = self.calculate_panel(window, fundamental_data, **kwargs)
+        factors = factors[factors.index.get_level_values('trade_date') >= pending[0]]
+        store.write(factors)
+        return factors
+    
+    @staticmethod
+    def _can_align(
+        market_data: pd.DataFrame, 
+        fundamental_data: pd.DataFrame
+    ) -> bool:
+        """两份数据是否具备时点对齐所需的键列"""
+        return (
+            {'ts_code', 'trade_date'} <= set(market_data.columns)
+            and {'ts_code', 'ann_date', 'end_date'} <= set(fundamental_data.columns)
+        )
+    
+    def align_fundamentals(
+        self, 
+        market_data: pd.DataFrame,
+        fundamental_data: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        将基本面数据按公告日时点对齐到市场数据
+        
+        每个 (trade_date, ts_code) 取当时已公告的最新一期报告
+        
+        Returns:
+            与 market_data 同索引的基本面 DataFrame
+        """
+        store = PITStore(fundamental_data)
+        aligned = store.as_of(market_data['trade_date'], market_data['ts_code'])
+        aligned.index = market_data.index
+        return aligned
+    
+    @staticmethod
+    def _apply_cross_section(factors: pd.DataFrame, func) -> pd.DataFrame:
+        """
+        对每个因子按截面应用二维内核
+
+        MultiIndex (trade_date, ts_code) 的因子转为 日期 × 股票 数组逐日期处理；
+        普通 DataFrame 视为单个截面 (与逐列处理等价)
+        """
+        if not (
+            isinstance(factors.index, pd.MultiIndex)
+            and {'trade_date', 'ts_code'} <= set(factors.index.names)
+        ):
+            return factors.apply(lambda col: pd.Series(func(col.to_numpy(dtype=float)), index=col.index))
+
+        index = factors.index
+        date_level = index.names.index('trade_date')
+        code_level = index.names.index('ts_code')
+        rows = index.codes[date_level]
+        cols = index.codes[code_level]
+        shape = (len(index.levels[date_level]), len(index.levels[code_level]))
+
+        result = pd.DataFrame(index=index)
+        for name in factors.columns:
+            panel = np.full(shape, np.nan)
+            panel[rows, cols] = factors[name].to_numpy(dtype=float)
+            result[name] = func(panel)[rows, cols]
+        return result
+    
     def normalize_factors(
         self, 
         factors: pd.DataFrame,
@@ -102,6 +526,8 @@ class FactorPipeline:
         """
         因子标准化
         
+        MultiIndex (trade_date, ts_code) 的因子按交易日截面标准化
+        
         Args:
             factors: 因子数据
             method: 标准化方法 ('zscore', 'rank', 'minmax')
@@ -109,35 +535,195 @@ class FactorPipeline:
         Returns:
             标准化后的因子
         """
-        if method == 'zscore':
-            return (factors - factors.mean()) / factors.std()
-        elif method == 'rank':
-            return factors.rank(pct=True)
-        elif method == 'minmax':
-            return (factors - factors.min()) / (factors.max() - factors.min())
-        else:
+        if method not in ('zscore', 'rank', 'minmax'):
             raise ValueError(f"未知的标准化方法: {method}")
+        
+        return self._apply_cross_section(
+            factors, lambda arr: cs_standardize(arr, winsorize=None, normalize=method)
+        )
     
     def winsorize_factors(
         self, 
         factors: pd.DataFrame,
         lower: float = 0.01,
-        upper: float = 0.99
+        upper: float = 0.99,
+        method: str = 'quantile',
+        n_mad: float = 3.0
     ) -> pd.DataFrame:
         """
         因子去极值
         
+        MultiIndex (trade_date, ts_code) 的因子按交易日截面去极值
+        
         Args:
             factors: 因子数据
             lower: 下分位数
             upper: 上分位数
+            method: 'quantile' 分位数截断 / 'mad' 中位数绝对偏差截断
+            n_mad: MAD 倍数
             
         Returns:
             去极值后的因子
         """
-        def winsorize_col(col):
-            lower_val = col.quantile(lower)
-            upper_val = col.quantile(upper)
-            return col.clip(lower=lower_val, upper=upper_val)
+        if method not in ('quantile', 'mad'):
+            raise ValueError(f"未知的去极值方法: {method}")
+        
+        return self._apply_cross_section(
+            factors,
+            lambda arr: cs_standardize(
+                arr, winsorize=method, normalize=None,
+                lower=lower, upper=upper, n_mad=n_mad
+            )
+        )
+    
+    def standardize_factors(
+        self, 
+        factors: pd.DataFrame,
+        winsorize: Optional[str] = 'quantile',
+        normalize: Optional[str] = 'zscore',
+        **kwargs
+    ) -> pd.DataFrame:
+        """
+        去极值 + 标准化 (每个因子一次截面处理)
+        
+        Args:
+            factors: 因子数据
+            winsorize: 'quantile' / 'mad' / None
+            normalize: 'zscore' / 'rank' / 'minmax' / None
+            **kwargs: lower / upper / n_mad
+            
+        Returns:
+            处理后的因子
+        """
+        return self._apply_cross_section(
+            factors,
+            lambda arr: cs_standardize(arr, winsorize=winsorize, normalize=normalize, **kwargs)
+        )
+    
+    # =========================================================================
+    # 中性化
+    # =========================================================================
+    
+    @staticmethod
+    def build_industry_panel(
+        members: pd.DataFrame,
+        dates: List[str],
+        ts_codes: List[str]
+    ) -> pd.DataFrame:
+        """
+        由申万行业成分 (get_sw_members) 构建随时间变化的行业标签面板
+        
+        Args:
+            members: 成分股数据 (index_code, con_code, in_date, out_date)
+            dates: 日期轴 (YYYYMMDD)
+            ts_codes: 股票轴
+            
+        Returns:
+            日期 × 股票 行业代码面板 (未归属为 None)
+        """
+        dates = pd.Index(dates)
+        codes = pd.Index(ts_codes)
+        labels = np.full((len(dates), len(codes)), None, dtype=object)
+        
+        col_idx = codes.get_indexer(members['con_code'])
+        in_dates = members['in_date'].fillna('00000000').astype(str).to_numpy()
+        out_dates = members['out_date'].fillna('99999999').astype(str).to_numpy()
+        starts = np.searchsorted(dates.values, in_dates, side='left')
+        ends = np.searchsorted(dates.values, out_dates, side='right')
+        
+        # 按纳入日期先后写入，后纳入的行业覆盖先前的归属
+        order = np.argsort(in_dates, kind='stable')
+        industry = members['index_code'].to_numpy()
+        for i in order:
+            if col_idx[i] >= 0 and starts[i] < ends[i]:
+                labels[starts[i]:ends[i], col_idx[i]] = industry[i]
+        
+        return pd.DataFrame(labels, index=dates, columns=codes)
+    
+    @staticmethod
+    def _to_matrix(
+        data,
+        dates: pd.Index,
+        codes: pd.Index
+    ) -> pd.DataFrame:
+        """将宽表 / MultiIndex 序列 / 股票映射 对齐为 日期 × 股票 矩阵"""
+        if isinstance(data, dict):
+            data = pd.Series(data)
+        if isinstance(data, pd.Series):
+            if isinstance(data.index, pd.MultiIndex):
+                data = data.unstack('ts_code')
+            else:
+                # 静态映射: ts_code -> 值
+                row = data.reindex(codes).to_numpy()
+                return pd.DataFrame(
+                    np.tile(row, (len(dates), 1)), index=dates, columns=codes
+                )
+        return data.reindex(index=dates, columns=codes)
+    
+    def neutralize(
+        self,
+        panel,
+        industry_map=None,
+        log_mv=None,
+        exposures: Optional[Dict[str, pd.DataFrame]] = None
+    ):
+        """
+        因子行业、市值中性化
+        
+        每个交易日做截面回归 factor ~ 行业哑变量 + log_mv (+ 其他暴露)，取残差。
+        所有日期通过行业组内去均值与批量正规方程一次求解
+        
+        Args:
+            panel: 日期 × 股票 因子面板，或 MultiIndex (trade_date, ts_code) 的多因子 DataFrame，
+                或 因子名 -> 面板 的字典
+            industry_map: 行业归属，ts_code -> 行业 的映射 (Series / dict)，
+                或 日期 × 股票 的行业标签面板 (见 build_industry_panel)
+            log_mv: 对数总市值，日期 × 股票 面板或 MultiIndex 序列
+            exposures: 其他数值暴露 名称 -> 面板
+            
+        Returns:
+            与 panel 同结构的残差因子
+        """
+        # 统一为 因子名 -> 日期 × 股票 面板
+        long_index = None
+        if isinstance(panel, dict):
+            panels = panel
+        elif isinstance(panel.index, pd.MultiIndex):
+            long_index = panel.index
+            panels = {name: panel[name].unstack('ts_code') for name in panel.columns}
+        else:
+            panels = {None: panel}
+        
+        first = next(iter(panels.values()))
+        dates = first.index
+        codes = first.columns
+        
+        groups = None
+        if industry_map is not None:
+            labels = self._to_matrix(industry_map, dates, codes)
+            codes_flat, _ = pd.factorize(labels.to_numpy().ravel(), use_na_sentinel=True)
+            groups = codes_flat.reshape(labels.shape)
+        
+        numeric = []
+        if log_mv is not None:
+            numeric.append(self._to_matrix(log_mv, dates, codes).to_numpy(dtype=float))
+        for exposure in (exposures or {}).values():
+            numeric.append(self._to_matrix(exposure, dates, codes).to_numpy(dtype=float))
+        numeric = np.stack(numeric) if numeric else None
+        
+        # 逐因子求解 (设计矩阵共用)，避免同时持有全部因子的副本
+        result = {}
+        for name, factor in panels.items():
+            if not (factor.index.equals(dates) and factor.columns.equals(codes)):
+                factor = factor.reindex(index=dates, columns=codes)
+            values = factor.to_numpy(dtype=float)
+            result[name] = pd.DataFrame(
+                cs_neutralize(values, groups=groups, exposures=numeric),
+                index=dates, columns=codes
+            )
         
-        return factors.apply(winsorize_col)
+        if isinstance(panel, dict):
+            return result
+        if long_index is not None:
+            return self.from_panels(result, long_index)
+        return result[None]
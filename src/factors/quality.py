@@ -5,6 +5,8 @@ from typing import Optional
 import pandas as pd
 import numpy as np
 
+from .kernels import rolling_slope
+
 
 class QualityFactors:
     """质量因子计算器"""
@@ -13,66 +15,75 @@ class QualityFactors:
         self.config = config or {}
         self.roe_years = self.config.get('roe_stability_years', 5)
     
+    def _roe_rolling(
+        self,
+        roe_history: pd.DataFrame,
+        years: Optional[int],
+        min_periods: int
+    ):
+        if years is None:
+            years = self.roe_years
+        window = years * 4  # 季报
+        return roe_history.rolling(window, min_periods=min_periods)
+    
     def calc_roe_stability(
         self, 
         roe_history: pd.DataFrame,
-        years: int = None
-    ) -> pd.Series:
+        years: int = None,
+        min_periods: int = None
+    ) -> pd.DataFrame:
         """
         计算 ROE 稳定性
         
-        过去 N 年 ROE 的标准差，越低越稳定
+        过去 N 年 ROE 的标准差，越低越稳定。按季度滚动计算全部历史，
+        默认参数下最后一行与旧版 tail(N 年).std() 相同 (至少 2 期有效值)
         
         Args:
-            roe_history: 历史 ROE 数据 (行=时间, 列=股票)
+            roe_history: 历史 ROE 数据 (行=报告期, 列=股票)
             years: 计算年数
+            min_periods: 窗口内最少有效报告期数 (默认 2)
             
         Returns:
-            ROE 标准差 (越低越好)
+            与 roe_history 同形状的 ROE 标准差 (越低越好)
         """
-        if years is None:
-            years = self.roe_years
-        
-        # 取最近 N 年数据
-        recent = roe_history.tail(years * 4)  # 季报
-        return recent.std()
+        if min_periods is None:
+            min_periods = 2
+        return self._roe_rolling(roe_history, years, min_periods).std()
     
     def calc_roe_mean(
         self, 
         roe_history: pd.DataFrame,
-        years: int = None
-    ) -> pd.Series:
-        """计算平均 ROE"""
-        if years is None:
-            years = self.roe_years
+        years: int = None,
+        min_periods: int = None
+    ) -> pd.DataFrame:
+        """
+        计算平均 ROE (过去 N 年滚动均值，参数同 calc_roe_stability)
         
-        recent = roe_history.tail(years * 4)
-        return recent.mean()
+        min_periods 默认 1，最后一行与旧版 tail(N 年).mean() 相同
+        """
+        if min_periods is None:
+            min_periods = 1
+        return self._roe_rolling(roe_history, years, min_periods).mean()
     
     def calc_gross_margin_trend(
         self, 
         gross_margin_history: pd.DataFrame,
         periods: int = 8
-    ) -> pd.Series:
+    ) -> pd.DataFrame:
         """
         计算毛利率变化趋势
         
-        使用线性回归斜率
-        """
-        recent = gross_margin_history.tail(periods)
-        
-        def trend_slope(series):
-            if series.isna().sum() > len(series) / 2:
-                return np.nan
-            x = np.arange(len(series))
-            y = series.values
-            mask = ~np.isnan(y)
-            if mask.sum() < 3:
-                return np.nan
-            slope = np.polyfit(x[mask], y[mask], 1)[0]
-            return slope
+        最近 periods 期毛利率对期序号的线性回归斜率，按期滚动计算全部历史；
+        窗口内有效值不足一半 (或少于 3 期) 时为 NaN
         
-        return recent.apply(trend_slope)
+        Args:
+            gross_margin_history: 历史毛利率 (行=报告期, 列=股票)
+            periods: 回归期数
+            
+        Returns:
+            与 gross_margin_history 同形状的斜率
+        """
+        return rolling_slope(gross_margin_history, periods)
     
     def calc_debt_ratio_score(
         self, 
@@ -97,20 +108,25 @@ class QualityFactors:
         
         流动比率越高越好 (但过高可能表示资金利用效率低)
         最优区间: 1.5 - 3.0
+        
+        Args:
+            current_ratio: 流动比率 (Series 或 日期 × 股票 面板)
         """
-        def score_func(x):
-            if pd.isna(x):
-                return np.nan
-            if x < 1.0:
-                return max(0, x * 50)  # 0-50
-            elif x <= 2.0:
-                return 50 + (x - 1.0) * 50  # 50-100
-            elif x <= 3.0:
-                return 100  # 最优
-            else:
-                return max(50, 100 - (x - 3.0) * 10)  # 逐渐降低
+        x = np.asarray(current_ratio, dtype=float)
+        score = np.select(
+            [np.isnan(x), x < 1.0, x <= 2.0, x <= 3.0],
+            [
+                np.nan,
+                np.maximum(0, x * 50),        # 0-50
+                50 + (x - 1.0) * 50,          # 50-100
+                100.0,                        # 最优
+            ],
+            default=np.maximum(50, 100 - (x - 3.0) * 10)  # 逐渐降低
+        )
         
-        return current_ratio.apply(score_func)
+        if isinstance(current_ratio, pd.DataFrame):
+            return pd.DataFrame(score, index=current_ratio.index, columns=current_ratio.columns)
+        return pd.Series(score, index=current_ratio.index, name=current_ratio.name)
     
     def calc_all(self, df: pd.DataFrame) -> pd.DataFrame:
         """计算所有质量因子"""
@@ -0,0 +1,148 @@
+"""增量因子存储"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from ..utils.config import get_data_path
+from ..utils.io import ensure_dir
+from ..utils.logger import get_logger
+from ..data_source.lake import ParquetLake
+
+
+class FactorStore:
+    """
+    按配置哈希隔离的增量因子存储
+
+    存储键 = hash(factors 配置, 输入数据版本)。配置或数据版本一变即落到新的目录，
+    旧结果不会与新口径混用；键不变时只需计算尚未存储的交易日
+
+    目录结构:
+        {root}/{key}/meta.json                                  配置、数据版本、最新日期
+        {root}/{key}/factors/factor_values/by_date/{date}.parquet  按交易日分区的因子值
+    """
+
+    DATASET = 'factor_values'
+
+    def __init__(
+        self,
+        config: dict,
+        data_versions: Optional[Dict[str, str]] = None,
+        root: Optional[Union[str, Path]] = None
+    ):
+        """
+        Args:
+            config: factors 配置段
+            data_versions: 输入数据版本 (如 {'adj_price': 复权状态版本})，
+                历史数据被修订时应变化；新增交易日不应改变版本
+            root: 存储根目录 (默认 {data_processed}/factors/store)
+        """
+        self.logger = get_logger('factor_store')
+        self.config = config
+        self.data_versions = dict(data_versions or {})
+        self.key = self.make_key(config, self.data_versions)
+
+        if root is None:
+            root = get_data_path('processed') / 'factors' / 'store'
+        self.root = Path(root) / self.key
+        self.lake = ParquetLake(self.root)
+        self.meta_path = self.root / 'meta.json'
+        self._meta = self._load_meta()
+
+    @staticmethod
+    def make_key(
+        config: dict,
+        data_versions: Optional[Dict[str, str]] = None
+    ) -> str:
+        """配置与数据版本的稳定哈希"""
+        payload = json.dumps(
+            {'config': config, 'data_versions': data_versions or {}},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    def _load_meta(self) -> dict:
+        if self.meta_path.exists():
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {
+            'key': self.key,
+            'config': self.config,
+            'data_versions': self.data_versions,
+            'last_date': None,
+        }
+
+    def _save_meta(self) -> None:
+        ensure_dir(self.root)
+        self._meta['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        tmp_path = self.root / '.meta.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, self.meta_path)
+
+    @property
+    def last_date(self) -> Optional[str]:
+        """已存储的最新交易日"""
+        return self._meta.get('last_date')
+
+    def stored_dates(self) -> List[str]:
+        """已存储的交易日"""
+        return self.lake.list_dates(self.DATASET)
+
+    def pending_dates(self, dates: List[str]) -> List[str]:
+        """给定交易日中尚未存储的部分 (晚于最新存储日期)"""
+        last = self.last_date
+        return sorted(d for d in set(dates) if last is None or d > last)
+
+    def write(self, factors: pd.DataFrame) -> int:
+        """
+        写入因子 (按交易日覆盖)
+
+        Args:
+            factors: MultiIndex (trade_date, ts_code) 的因子 DataFrame
+
+        Returns:
+            写入的交易日数
+        """
+        if factors.empty:
+            return 0
+
+        df = factors.reset_index()
+        for trade_date, group in df.groupby('trade_date', sort=True):
+            self.lake.write_date(self.DATASET, trade_date, group, merge=False)
+
+        last = df['trade_date'].max()
+        if self.last_date is None or last > self.last_date:
+            self._meta['last_date'] = last
+        self._meta['columns'] = list(factors.columns)
+        self._save_meta()
+
+        n_dates = df['trade_date'].nunique()
+        self.logger.info(f"因子存储 {self.key}: 写入 {n_dates} 个交易日")
+        return n_dates
+
+    def load(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        ts_codes: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        读取已存储的因子
+
+        Returns:
+            MultiIndex (trade_date, ts_code) 的因子 DataFrame
+        """
+        df = self.lake.query(
+            self.DATASET, ts_codes=ts_codes, start_date=start_date,
+            end_date=end_date, columns=columns, layout='by_date'
+        )
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+        return df.set_index(['trade_date', 'ts_code']).sort_index()
@@ -1,9 +1,10 @@
 # src/factors/valuation.py
 """估值因子计算"""
 
-from typing import Optional
+from typing import Dict
 import pandas as pd
-import numpy as np
+
+from .kernels import rolling_percentile_rank
 
 
 class ValuationFactors:
@@ -38,16 +39,7 @@ class ValuationFactors:
         if window is None:
             window = self.pe_window
         
-        pe = df['pe_ttm']
-        
-        def percentile_rank(x):
-            if len(x) < 10:
-                return np.nan
-            return (x.values[-1] > x.values[:-1]).sum() / (len(x) - 1)
-        
-        return pe.rolling(window=window, min_periods=100).apply(
-            percentile_rank, raw=False
-        )
+        return rolling_percentile_rank(df['pe_ttm'], window, min_periods=100)
     
     def calc_pb_percentile(
         self, 
@@ -58,16 +50,27 @@ class ValuationFactors:
         if window is None:
             window = self.pb_window
         
-        pb = df['pb']
+        return rolling_percentile_rank(df['pb'], window, min_periods=100)
+    
+    def calc_percentile_panel(
+        self, 
+        panel: pd.DataFrame, 
+        window: int = None
+    ) -> pd.DataFrame:
+        """
+        计算 日期 × 股票 面板的历史分位数 (全市场一次完成)
         
-        def percentile_rank(x):
-            if len(x) < 10:
-                return np.nan
-            return (x.values[-1] > x.values[:-1]).sum() / (len(x) - 1)
+        Args:
+            panel: 日期 × 股票 的估值面板 (如 pe_ttm、pb)
+            window: 滚动窗口 (默认 pe_percentile_window)
+            
+        Returns:
+            同形状的分位数面板 (0-1)
+        """
+        if window is None:
+            window = self.pe_window
         
-        return pb.rolling(window=window, min_periods=100).apply(
-            percentile_rank, raw=False
-        )
+        return rolling_percentile_rank(panel, window, min_periods=100)
     
     def calc_pb_roe_score(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -118,3 +121,32 @@ class ValuationFactors:
             result['factor_ps_ttm'] = df['ps_ttm']
         
         return result
+    
+    def calc_panel(self, panels: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        面板模式: 在 日期 × 股票 面板上计算估值因子
+        
+        Args:
+            panels: 字段名 -> 日期 × 股票 面板 (pe_ttm、pb、ps_ttm)
+            
+        Returns:
+            因子名 -> 日期 × 股票 面板
+        """
+        result = {}
+        
+        if 'pe_ttm' in panels:
+            result['factor_pe_ttm'] = panels['pe_ttm']
+            result['factor_pe_percentile'] = self.calc_percentile_panel(
+                panels['pe_ttm'], self.pe_window
+            )
+        
+        if 'pb' in panels:
+            result['factor_pb'] = panels['pb']
+            result['factor_pb_percentile'] = self.calc_percentile_panel(
+                panels['pb'], self.pb_window
+            )
+        
+        if 'ps_ttm' in panels:
+            result['factor_ps_ttm'] = panels['ps_ttm']
+        
+        return result
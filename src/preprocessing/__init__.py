@@ -0,0 +1,7 @@
+"""数据预处理模块"""
+
+from .adjuster import PriceAdjuster
+from .statements import StatementEngine, dedup_reports
+from .fundamentals import FundamentalsBuilder
+
+__all__ = ['PriceAdjuster', 'StatementEngine', 'dedup_reports', 'FundamentalsBuilder']
@@ -0,0 +1,362 @@
+"""复权处理"""
+
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from ..utils.config import get_data_path
+from ..utils.logger import get_logger
+from ..utils.io import load_parquet, save_parquet, ensure_dir
+from ..data_source.lake import ParquetLake
+
+
+class PriceAdjuster:
+    """
+    向量化复权计算与复权价格缓存
+
+    - adjust(): 一次 merge + 分组前向填充，对全部股票同时计算前/后复权价格
+    - 缓存只保存后复权价格 (历史值不随新的除权事件变化)，
+      前复权价格在读取时由 后复权 / 最新复权因子 得到
+    - refresh(): 新交易日只追加新行 (hfq = 价格 × 当日复权因子)；
+      仅当已缓存区间内的复权因子被修正，或股票首次出现时才整段重建
+
+    缓存布局: {data_processed}/adjusted/adj_price/by_stock/{ts_code}.parquet
+    状态文件: {data_processed}/adjusted/adj_state.parquet
+        (ts_code, last_trade_date, last_adj_factor)
+    """
+
+    PRICE_COLS = ('open', 'high', 'low', 'close', 'pre_close')
+    DATASET = 'adj_price'
+
+    def __init__(
+        self,
+        lake: Optional[ParquetLake] = None,
+        cache: Optional[ParquetLake] = None
+    ):
+        """
+        Args:
+            lake: 原始数据湖 (读取 daily 与 adj_factor，默认 data/raw)
+            cache: 复权价格缓存 (默认 data/processed)
+        """
+        self.logger = get_logger('adjuster')
+        self.lake = lake if lake is not None else ParquetLake()
+        self.cache = cache if cache is not None else ParquetLake(get_data_path('processed'))
+        self.state_path = self.cache.root / 'adjusted' / 'adj_state.parquet'
+        self._state: Optional[pd.DataFrame] = None
+
+    # =========================================================================
+    # 向量化复权
+    # =========================================================================
+
+    def adjust(
+        self,
+        daily: pd.DataFrame,
+        adj_factor: pd.DataFrame,
+        how: str = 'hfq',
+        price_cols: Sequence[str] = PRICE_COLS
+    ) -> pd.DataFrame:
+        """
+        计算复权价格 (全部股票一次完成)
+
+        Args:
+            daily: 日线行情 (ts_code, trade_date, open, high, low, close, ...)
+            adj_factor: 复权因子 (ts_code, trade_date, adj_factor)
+            how: 'hfq' 后复权 / 'qfq' 前复权
+            price_cols: 需要复权的价格列
+
+        Returns:
+            按 (ts_code, trade_date) 排序的 DataFrame，价格列替换为复权价格，
+            并附带 adj_factor 列
+        """
+        if how not in ('hfq', 'qfq'):
+            raise ValueError(f"未知的复权方式: {how}")
+
+        factors = adj_factor[['ts_code', 'trade_date', 'adj_factor']]
+        df = daily.drop(columns=['adj_factor'], errors='ignore').merge(
+            factors, on=['ts_code', 'trade_date'], how='left'
+        )
+        df = df.sort_values(['ts_code', 'trade_date'], kind='stable').reset_index(drop=True)
+
+        # 缺失的复权因子: 先沿用前值，上市初期缺失则用首个有效值
+        grouped = df.groupby('ts_code', sort=False)['adj_factor']
+        df['adj_factor'] = grouped.ffill()
+        df['adj_factor'] = df['adj_factor'].fillna(
+            df.groupby('ts_code', sort=False)['adj_factor'].bfill()
+        )
+
+        cols = [c for c in price_cols if c in df.columns]
+        multiplier = df['adj_factor']
+        if how == 'qfq':
+            latest = factors.sort_values('trade_date', kind='stable') \
+                .groupby('ts_code')['adj_factor'].last()
+            multiplier = multiplier / df['ts_code'].map(latest)
+
+        df[cols] = df[cols].mul(multiplier, axis=0)
+        return df
+
+    @staticmethod
+    def to_panel(
+        df: pd.DataFrame,
+        field: str = 'close'
+    ) -> pd.DataFrame:
+        """长表转 日期 × 股票 面板"""
+        return df.pivot(index='trade_date', columns='ts_code', values=field).sort_index()
+
+    # =========================================================================
+    # 缓存
+    # =========================================================================
+
+    @property
+    def state(self) -> pd.DataFrame:
+        """缓存状态: 每只股票已复权到的最新交易日与最新复权因子"""
+        if self._state is None:
+            if self.state_path.exists():
+                self._state = load_parquet(self.state_path).set_index('ts_code')
+            else:
+                self._state = pd.DataFrame(
+                    columns=['last_trade_date', 'last_adj_factor'],
+                    index=pd.Index([], name='ts_code')
+                )
+        return self._state
+
+    def _save_state(self) -> None:
+        ensure_dir(self.state_path.parent)
+        tmp_path = self.state_path.with_name(f'.{self.state_path.name}.tmp')
+        save_parquet(self.state.reset_index(), tmp_path, index=False)
+        os.replace(tmp_path, self.state_path)
+
+    def _rebuild_stocks(self, ts_codes: List[str]) -> int:
+        """重算指定股票的后复权价格并覆盖缓存"""
+        daily = self.lake.query('daily', ts_codes=ts_codes)
+        factors = self.lake.query('adj_factor', ts_codes=ts_codes)
+        if daily.empty or factors.empty:
+            return 0
+
+        adjusted = self.adjust(daily, factors, how='hfq')
+        keep = ['ts_code', 'trade_date', 'adj_factor'] + [
+            c for c in self.PRICE_COLS if c in adjusted.columns
+        ]
+
+        for ts_code, group in adjusted[keep].groupby('ts_code', sort=False):
+            self.cache.write_stock(self.DATASET, ts_code, group, merge=False)
+
+        last = factors.sort_values('trade_date', kind='stable').groupby('ts_code').last()
+        updates = pd.DataFrame({
+            'last_trade_date': last['trade_date'],
+            'last_adj_factor': last['adj_factor'],
+        })
+        state = self.state
+        self._state = pd.concat([state[~state.index.isin(updates.index)], updates])
+        self._state.index.name = 'ts_code'
+        return len(adjusted)
+
+    def build(
+        self,
+        ts_codes: Optional[List[str]] = None,
+        batch_size: int = 500
+    ) -> int:
+        """
+        全量构建复权价格缓存
+
+        Args:
+            ts_codes: 股票范围 (默认原始数据湖中的全部股票)
+            batch_size: 每批处理的股票数
+
+        Returns:
+            写入的行数
+        """
+        if ts_codes is None:
+            ts_codes = self.lake.list_stocks('adj_factor')
+
+        rows = 0
+        for i in range(0, len(ts_codes), batch_size):
+            rows += self._rebuild_stocks(list(ts_codes[i:i + batch_size]))
+            self.logger.info(f"复权缓存构建进度: {min(i + batch_size, len(ts_codes))}/{len(ts_codes)}")
+
+        self._save_state()
+        return rows
+
+    def _classify(
+        self,
+        adj_factor: Optional[pd.DataFrame] = None
+    ) -> Tuple[List[str], pd.DataFrame]:
+        """
+        把新到达的复权因子分为 需要整段重建的股票 与 只需追加的新交易日行
+
+        Returns:
+            (重建股票代码, 追加行 (ts_code, trade_date, adj_factor))
+        """
+        state = self.state
+        if adj_factor is None:
+            since = state['last_trade_date'].min() if not state.empty else None
+            adj_factor = self.lake.query(
+                'adj_factor', start_date=since, columns=['adj_factor']
+            )
+        empty = pd.DataFrame(columns=['ts_code', 'trade_date', 'adj_factor'])
+        if adj_factor.empty:
+            return [], empty
+
+        merged = adj_factor[['ts_code', 'trade_date', 'adj_factor']].merge(
+            state, left_on='ts_code', right_index=True, how='left'
+        )
+        unknown = merged['last_trade_date'].isna()
+        is_new = ~unknown & (merged['trade_date'] > merged['last_trade_date'])
+        overlap = merged[~unknown & ~is_new]
+
+        # 已缓存区间内的复权因子与缓存不一致 (除权修正) 的股票需要重建
+        changed = []
+        if not overlap.empty:
+            cached = self.cache.query(
+                self.DATASET, ts_codes=sorted(overlap['ts_code'].unique()),
+                start_date=overlap['trade_date'].min(), columns=['adj_factor']
+            )
+            if not cached.empty:
+                check = overlap[['ts_code', 'trade_date', 'adj_factor']].merge(
+                    cached[['ts_code', 'trade_date', 'adj_factor']],
+                    on=['ts_code', 'trade_date'], suffixes=('', '_cached')
+                )
+                differs = (check['adj_factor'] != check['adj_factor_cached']) & ~(
+                    check['adj_factor'].isna() & check['adj_factor_cached'].isna()
+                )
+                changed = check.loc[differs, 'ts_code'].unique().tolist()
+
+        rebuild = sorted(set(merged.loc[unknown, 'ts_code']) | set(changed))
+        append = merged.loc[is_new & ~merged['ts_code'].isin(rebuild),
+                            ['ts_code', 'trade_date', 'adj_factor']]
+        return rebuild, append.reset_index(drop=True)
+
+    def affected_stocks(
+        self,
+        adj_factor: Optional[pd.DataFrame] = None
+    ) -> List[str]:
+        """
+        找出需要刷新缓存的股票
+
+        Args:
+            adj_factor: 新到达的复权因子行 (默认从原始数据湖读取
+                缓存最早水位之后的全部复权因子)
+
+        Returns:
+            有新增交易日、复权因子被修正或尚未缓存的股票代码
+        """
+        rebuild, append = self._classify(adj_factor)
+        return sorted(set(rebuild) | set(append['ts_code']))
+
+    def _append_rows(self, append: pd.DataFrame) -> int:
+        """
+        把新交易日的后复权价格追加到缓存 (历史行不变)
+
+        Args:
+            append: 新交易日的复权因子行 (ts_code, trade_date, adj_factor)
+        """
+        state = self.state
+        codes = sorted(append['ts_code'].unique())
+        daily = self.lake.query(
+            'daily', ts_codes=codes, start_date=append['trade_date'].min()
+        )
+        if daily.empty:
+            return 0
+
+        daily = daily.drop(columns=['adj_factor'], errors='ignore').merge(
+            state, left_on='ts_code', right_index=True
+        )
+        daily = daily[daily['trade_date'] > daily['last_trade_date']]
+        df = daily.merge(append, on=['ts_code', 'trade_date'], how='left')
+        df = df.sort_values(['ts_code', 'trade_date'], kind='stable').reset_index(drop=True)
+
+        # 缺失的复权因子沿用前值，首行沿用缓存中的最新复权因子
+        df['adj_factor'] = df.groupby('ts_code', sort=False)['adj_factor'].ffill()
+        df['adj_factor'] = df['adj_factor'].fillna(df['last_adj_factor'].astype(float))
+
+        cols = [c for c in self.PRICE_COLS if c in df.columns]
+        df[cols] = df[cols].mul(df['adj_factor'], axis=0)
+        keep = ['ts_code', 'trade_date', 'adj_factor'] + cols
+        for ts_code, group in df[keep].groupby('ts_code', sort=False):
+            self.cache.write_stock(self.DATASET, ts_code, group, merge=True)
+
+        last = append.sort_values('trade_date', kind='stable').groupby('ts_code').last()
+        self._state.loc[last.index, 'last_trade_date'] = last['trade_date']
+        self._state.loc[last.index, 'last_adj_factor'] = last['adj_factor']
+        return len(df)
+
+    def refresh(
+        self,
+        adj_factor: Optional[pd.DataFrame] = None,
+        batch_size: int = 500
+    ) -> List[str]:
+        """
+        增量刷新缓存
+
+        新交易日只追加新行；已缓存区间内复权因子被修正或首次出现的股票整段重建
+
+        Args:
+            adj_factor: 新到达的复权因子行 (默认自动从数据湖检测)
+            batch_size: 每批重建的股票数
+
+        Returns:
+            已刷新的股票代码
+        """
+        rebuild, append = self._classify(adj_factor)
+        for i in range(0, len(rebuild), batch_size):
+            self._rebuild_stocks(rebuild[i:i + batch_size])
+        if not append.empty:
+            self._append_rows(append)
+
+        affected = sorted(set(rebuild) | set(append['ts_code']))
+        if affected:
+            self._save_state()
+        self.logger.info(
+            f"复权缓存刷新: 追加 {append['ts_code'].nunique()} 只股票, "
+            f"重建 {len(rebuild)} 只股票"
+        )
+        return affected
+
+    def load(
+        self,
+        how: str = 'qfq',
+        ts_codes: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        fields: Sequence[str] = ('close',)
+    ) -> pd.DataFrame:
+        """
+        从缓存读取复权价格长表
+
+        Args:
+            how: 'qfq' 前复权 / 'hfq' 后复权
+            ts_codes: 股票范围
+            start_date: 开始日期
+            end_date: 结束日期
+            fields: 价格字段
+
+        Returns:
+            DataFrame: ts_code, trade_date, fields...
+        """
+        df = self.cache.query(
+            self.DATASET, ts_codes=ts_codes, start_date=start_date,
+            end_date=end_date, columns=list(fields)
+        )
+        if how == 'qfq' and not df.empty:
+            latest = self.state['last_adj_factor'].astype(float)
+            df[list(fields)] = df[list(fields)].div(df['ts_code'].map(latest), axis=0)
+        elif how not in ('qfq', 'hfq'):
+            raise ValueError(f"未知的复权方式: {how}")
+        return df
+
+    def load_panel(
+        self,
+        field: str = 'close',
+        how: str = 'qfq',
+        ts_codes: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        读取复权价格面板
+
+        Returns:
+            日期 × 股票 DataFrame
+        """
+        df = self.load(how, ts_codes, start_date, end_date, fields=(field,))
+        return self.to_panel(df, field)
@@ -0,0 +1,195 @@
+"""财报宽表构建"""
+
+from functools import reduce
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import get_data_path
+from ..utils.io import load_parquet, save_parquet
+from ..utils.logger import get_logger
+from ..data_source.lake import ParquetLake
+from ..data_source.pit_store import PITStore, _to_int_dates
+from .statements import StatementEngine, dedup_reports
+
+
+class FundamentalsBuilder:
+    """
+    财报宽表: income / balancesheet / cashflow / fina_indicator 合并为一张表
+
+    - 各表按列投影从数据湖一次读取全部股票，不逐股票请求
+    - 更正记录按 (股票, 报告期, 公告日, 更新标志) 排序后 drop_duplicates 去重，
+      保留首次公告 (keep='first'，无未来信息) 或最新更正 (keep='last')
+    - 利润表、现金流量表的累计值额外生成单季度、TTM 及其同比 (见 StatementEngine)
+    - 按 (ts_code, end_date) 外连接；ann_date 取各表公告日的最大值，
+      即整行数据全部可得的日期，可直接用于 PITStore 时点对齐
+    - 数值列统一为 float64，日期列为 YYYYMMDD 字符串
+
+    输出: {data_processed}/fundamental/fundamentals_wide.parquet
+    下游质量、成长、估值计算统一读取此文件 (load / pit_store)，不再各自拼接原始报表
+    """
+
+    TABLE_COLUMNS: Dict[str, List[str]] = {
+        'income': [
+            'total_revenue', 'revenue', 'oper_cost', 'sell_exp', 'admin_exp', 'fin_exp',
+            'rd_exp', 'operate_profit', 'total_profit', 'income_tax', 'n_income',
+            'n_income_attr_p', 'basic_eps',
+        ],
+        'balancesheet': [
+            'money_cap', 'accounts_receiv', 'inventories', 'total_cur_assets', 'fix_assets',
+            'goodwill', 'total_assets', 'st_borr', 'total_cur_liab', 'lt_borr', 'total_liab',
+            'total_hldr_eqy_exc_min_int', 'minority_int',
+        ],
+        'cashflow': [
+            'n_cashflow_act', 'c_pay_for_fix_assets', 'n_cashflow_inv_act',
+            'c_pay_for_dvd_int', 'n_cash_flows_fnc_act',
+        ],
+        'fina_indicator': [
+            'roe', 'roe_dt', 'roa', 'grossprofit_margin', 'netprofit_margin',
+            'current_ratio', 'quick_ratio', 'debt_to_assets', 'ocf_to_netprofit',
+            'q_sales_yoy', 'q_profit_yoy', 'basic_eps_yoy', 'netprofit_yoy',
+        ],
+    }
+
+    # 数值为年初至今累计的报表
+    FLOW_TABLES = ('income', 'cashflow')
+
+    KEY_COLS = ['ts_code', 'end_date']
+    META_COLS = ['ann_date', 'report_type', 'update_flag']
+
+    def __init__(
+        self,
+        lake: Optional[ParquetLake] = None,
+        output_path: Optional[Union[str, Path]] = None,
+        keep: str = 'first',
+        table_columns: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        Args:
+            lake: 原始数据湖 (默认 data/raw)
+            output_path: 宽表路径 (默认 {data_processed}/fundamental/fundamentals_wide.parquet)
+            keep: 更正记录保留 'first' (首次公告) 或 'last' (最新更正)
+            table_columns: 各表读取的字段 (默认 TABLE_COLUMNS)
+        """
+        self.logger = get_logger('fundamentals')
+        self.lake = lake if lake is not None else ParquetLake()
+        if output_path is None:
+            output_path = get_data_path('processed') / 'fundamental' / 'fundamentals_wide.parquet'
+        self.output_path = Path(output_path)
+        self.keep = keep
+        self.table_columns = table_columns or self.TABLE_COLUMNS
+
+    def load_table(
+        self,
+        table: str,
+        columns: Optional[List[str]] = None,
+        ts_codes: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        读取单张报表 (列投影) 并去重
+
+        Returns:
+            每个 (ts_code, end_date) 一行的 DataFrame，日期列为 YYYYMMDD 字符串
+        """
+        columns = columns if columns is not None else self.table_columns[table]
+        df = self.lake.query(
+            table, ts_codes=ts_codes, columns=self.KEY_COLS + self.META_COLS + list(columns)
+        )
+        if df.empty:
+            return pd.DataFrame(columns=self.KEY_COLS + ['ann_date'])
+
+        df = dedup_reports(df, keep=self.keep)
+        for col in ('end_date', 'ann_date'):
+            if col in df.columns:
+                df[col] = _to_int_dates(df[col].values).astype(str)
+        fields = [c for c in columns if c in df.columns]
+        df[fields] = df[fields].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+        return df[self.KEY_COLS + ['ann_date'] + fields]
+
+    def build(
+        self,
+        ts_codes: Optional[List[str]] = None,
+        flow_bases: Sequence[str] = ('q', 'ttm')
+    ) -> pd.DataFrame:
+        """
+        构建宽表
+
+        Args:
+            ts_codes: 股票代码 (None 为全部)
+            flow_bases: 累计值报表额外生成的口径
+
+        Returns:
+            每个 (ts_code, end_date) 一行的宽表
+        """
+        frames = []
+        for table, columns in self.table_columns.items():
+            df = self.load_table(table, columns, ts_codes)
+            n_rows = len(df)
+            if df.empty:
+                self.logger.warning(f"{table} 无数据")
+                continue
+
+            fields = [c for c in df.columns if c not in self.KEY_COLS + ['ann_date']]
+            if table in self.FLOW_TABLES and flow_bases:
+                engine = StatementEngine(df, fields=fields, report_type=None)
+                derived = engine.build(fields, bases=flow_bases).drop(columns=['ann_date'])
+                df = df.merge(
+                    derived.drop(columns=fields), on=self.KEY_COLS, how='left', validate='1:1'
+                )
+
+            # 字段重名时保留先读取的表
+            seen = {c for f in frames for c in f.columns}
+            df = df[[c for c in df.columns if c in self.KEY_COLS or c not in seen or c == 'ann_date']]
+            frames.append(df.rename(columns={'ann_date': f'_ann_{table}'}))
+            self.logger.info(f"{table}: {n_rows} 行, {len(df.columns) - 3} 个字段")
+
+        if not frames:
+            return pd.DataFrame(columns=self.KEY_COLS + ['ann_date'])
+
+        wide = reduce(
+            lambda left, right: left.merge(right, on=self.KEY_COLS, how='outer'), frames
+        )
+
+        # 整行可得日期: 各表公告日的最大值
+        ann_cols = [c for c in wide.columns if c.startswith('_ann_')]
+        ann = np.max(
+            np.stack([_to_int_dates(wide[c].fillna('').values) for c in ann_cols]), axis=0
+        )
+        wide.insert(2, 'ann_date', np.where(ann > 0, ann.astype(str), None))
+        wide = wide.drop(columns=ann_cols)
+
+        wide = wide.sort_values(self.KEY_COLS, kind='stable').reset_index(drop=True)
+        self.logger.info(f"财报宽表: {len(wide)} 行 × {len(wide.columns)} 列")
+        return wide
+
+    def run(self, ts_codes: Optional[List[str]] = None) -> Path:
+        """构建宽表并写入 output_path"""
+        wide = self.build(ts_codes)
+        save_parquet(wide, self.output_path, index=False)
+        self.logger.info(f"已写入 {self.output_path}")
+        return self.output_path
+
+    def load(
+        self,
+        columns: Optional[List[str]] = None,
+        ts_codes: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        读取宽表 (列投影、按股票过滤下推)
+
+        Args:
+            columns: 字段 (主键与 ann_date 总会返回)
+            ts_codes: 股票代码
+        """
+        if columns is not None:
+            columns = self.KEY_COLS + ['ann_date'] + [
+                c for c in columns if c not in self.KEY_COLS + ['ann_date']
+            ]
+        filters = [('ts_code', 'in', list(ts_codes))] if ts_codes is not None else None
+        return load_parquet(self.output_path, columns=columns, filters=filters)
+
+    def pit_store(self, columns: Optional[List[str]] = None, **kwargs) -> PITStore:
+        """由宽表构建时点存储 (见 PITStore)"""
+        return PITStore(self.load(columns), **kwargs)
@@ -0,0 +1,289 @@
+"""财务报表单季度 / TTM 计算"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..utils.logger import get_logger
+from ..data_source.pit_store import _to_int_dates
+
+
+# (股票, 报告期序号) 整数编码的进位
+_PERIOD_BASE = 10 ** 6
+
+
+def dedup_reports(
+    data: pd.DataFrame,
+    keep: str = 'last',
+    report_type: Optional[str] = '1'
+) -> pd.DataFrame:
+    """
+    财报去重: 每个 (ts_code, end_date) 保留一条记录
+
+    按 (股票, 报告期, 公告日, 更新标志) 一次排序后 drop_duplicates，不做逐股票处理
+
+    Args:
+        data: 财报长表，需包含 ts_code、end_date (ann_date、update_flag、report_type 可选)
+        keep: 'last' 最新更正版本；'first' 首次公告版本 (同日多条取更新标志最大者)，无未来信息
+        report_type: 只保留该报表类型 (默认 '1' 合并报表；None 不过滤)
+
+    Returns:
+        去重后的 DataFrame (按 ts_code、end_date 排序，重置索引)
+    """
+    if keep not in ('last', 'first'):
+        raise ValueError(f"keep 只能为 'last' 或 'first': {keep}")
+
+    df = data
+    if report_type is not None and 'report_type' in df.columns:
+        df = df[df['report_type'].astype(str) == str(report_type)]
+
+    df = df.assign(
+        _period=_to_int_dates(df['end_date'].values),
+        _ann=_to_int_dates(df['ann_date'].values) if 'ann_date' in df.columns else 0
+    )
+    flag_cols = ['update_flag'] if 'update_flag' in df.columns else []
+    df = df.sort_values(['ts_code', '_period', '_ann'] + flag_cols, kind='stable')
+    if keep == 'first':
+        first_ann = df.groupby(['ts_code', '_period'], sort=False)['_ann'].transform('min')
+        df = df[df['_ann'] == first_ann]
+    df = df.drop_duplicates(subset=['ts_code', '_period'], keep='last')
+    return df.drop(columns=['_period', '_ann']).reset_index(drop=True)
+
+
+class StatementEngine:
+    """
+    财务报表 (income / cashflow) 向量化加工
+
+    Tushare 利润表、现金流量表的数值为年初至今累计 (YTD)，且同一报告期可能有多条更正记录。
+    本引擎对全部股票一次完成:
+
+    - 去重: 每个 (ts_code, end_date) 保留一条记录 (默认最新更正，可选首次公告)
+    - 报告期编码为季度序号 p = 年 × 4 + 季度 - 1，(股票, p) 编为有序整数键，
+      任意滞后期均按键精确查找 (np.searchsorted)，缺失的报告期得到 NaN 而不是错位
+    - 单季度 = YTD - 上一季度 YTD (一季度即 YTD)
+    - TTM = YTD + 上年年报 - 上年同期 YTD (四季度即 YTD)
+    - 同比 = (本期 - 上年同期) / |上年同期|
+    """
+
+    KEY_COLS = ['ts_code', 'end_date', 'ann_date']
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        fields: Optional[Sequence[str]] = None,
+        keep: str = 'last',
+        report_type: Optional[str] = '1'
+    ):
+        """
+        Args:
+            data: 财报长表，需包含 ts_code、end_date (ann_date 可选，用于更正记录排序)
+            fields: 需要加工的累计值字段 (默认全部数值列)
+            keep: 同一报告期多条记录时保留 'last' (最新更正) 或 'first' (首次公告，无未来信息)
+            report_type: 只保留该报表类型 (默认 '1' 合并报表；None 不过滤)
+        """
+        self.logger = get_logger('statements')
+        for col in ('ts_code', 'end_date'):
+            if col not in data.columns:
+                raise ValueError(f"需要 {col} 列")
+        self.key_cols = [c for c in self.KEY_COLS if c in data.columns]
+        if fields is None:
+            exclude = set(self.key_cols) | {
+                'f_ann_date', 'report_type', 'comp_type', 'end_type', 'update_flag'
+            }
+            fields = [
+                c for c in data.columns
+                if c not in exclude and pd.api.types.is_numeric_dtype(data[c])
+            ]
+        self.fields = list(fields)
+
+        extra_cols = [c for c in ('report_type', 'update_flag') if c in data.columns]
+        df = dedup_reports(data[self.key_cols + self.fields + extra_cols], keep, report_type)
+        self.logger.info(f"财报去重: {len(data)} -> {len(df)} 行")
+
+        df['_period'] = _to_int_dates(df['end_date'].values)
+        df = df[(df['_period'] > 0) & np.isin(df['_period'] // 100 % 100, (3, 6, 9, 12))]
+        df = df.reset_index(drop=True)
+
+        period = df['_period'].to_numpy(dtype=np.int64)
+        self.quarter = (period // 100 % 100) // 3  # 1-4
+        self.period = (period // 10000) * 4 + self.quarter - 1
+
+        self._codes = pd.Index(np.sort(df['ts_code'].unique()))
+        self._keys = self._codes.get_indexer(df['ts_code']).astype(np.int64) * _PERIOD_BASE \
+            + self.period
+
+        self.frame = df.drop(columns=['_period'] + extra_cols)
+        self._values = {
+            f: pd.to_numeric(df[f], errors='coerce').to_numpy(dtype=float) for f in self.fields
+        }
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # =========================================================================
+    # 精确键滞后
+    # =========================================================================
+
+    def _find(self, target: np.ndarray) -> np.ndarray:
+        """有序键中精确查找，不存在为 -1"""
+        if not len(self._keys):
+            return np.full(np.shape(target), -1, dtype=np.int64)
+        idx = np.searchsorted(self._keys, target)
+        safe = np.minimum(idx, len(self._keys) - 1)
+        return np.where(self._keys[safe] == target, safe, -1)
+
+    def lag_index(self, k) -> np.ndarray:
+        """
+        滞后 k 个季度的同股票报告期所在行号
+
+        Args:
+            k: 滞后季度数 (整数或与行数等长的数组)
+
+        Returns:
+            行号数组，该报告期缺失时为 -1
+        """
+        return self._find(self._keys - np.asarray(k, dtype=np.int64))
+
+    def lag(self, values: np.ndarray, k) -> np.ndarray:
+        """取滞后 k 个季度的值，缺失为 NaN"""
+        idx = self.lag_index(k)
+        if not len(idx):
+            return np.asarray(values, dtype=float)
+        return np.where(idx >= 0, np.asarray(values, dtype=float)[np.maximum(idx, 0)], np.nan)
+
+    # =========================================================================
+    # 单季度 / TTM / 同比
+    # =========================================================================
+
+    def ytd(self, field: str) -> np.ndarray:
+        """年初至今累计值"""
+        if field not in self._values:
+            raise KeyError(f"未加工的字段: {field}")
+        return self._values[field]
+
+    def single_quarter(self, field: str) -> np.ndarray:
+        """单季度值: YTD - 上一季度 YTD (一季度即 YTD)"""
+        key = ('q', field)
+        if key not in self._cache:
+            ytd = self.ytd(field)
+            self._cache[key] = np.where(self.quarter == 1, ytd, ytd - self.lag(ytd, 1))
+        return self._cache[key]
+
+    def ttm(self, field: str) -> np.ndarray:
+        """滚动四季度值: YTD + 上年年报 - 上年同期 YTD (四季度即 YTD)"""
+        key = ('ttm', field)
+        if key not in self._cache:
+            ytd = self.ytd(field)
+            last_annual = self.lag(ytd, self.quarter)
+            self._cache[key] = np.where(
+                self.quarter == 4, ytd, ytd + last_annual - self.lag(ytd, 4)
+            )
+        return self._cache[key]
+
+    def series(self, field: str, basis: str = 'q') -> np.ndarray:
+        """
+        按口径取值
+
+        Args:
+            field: 字段
+            basis: 'q' 单季度, 'ttm' 滚动四季度, 'ytd' 年初至今
+        """
+        if basis == 'q':
+            return self.single_quarter(field)
+        if basis == 'ttm':
+            return self.ttm(field)
+        if basis == 'ytd':
+            return self.ytd(field)
+        raise ValueError(f"未知口径: {basis}")
+
+    def yoy(self, field: str, basis: str = 'q', abs_base: bool = True) -> np.ndarray:
+        """
+        同比增速 (%)
+
+        abs_base=True:  (本期 - 上年同期) / |上年同期| × 100，
+                        上年同期为 0 时为 NaN，亏损收窄为正增长
+        abs_base=False: (本期 / 上年同期 - 1) × 100，与 pct_change 一致
+                        (分母带符号，上年同期为 0 时为 ±inf)
+
+        上年同期缺失时为 NaN
+        """
+        current = self.series(field, basis)
+        base = self.lag(current, 4)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if not abs_base:
+                return (current / base - 1) * 100
+            growth = (current - base) / np.abs(base) * 100
+        return np.where(base != 0, growth, np.nan)
+
+    def cagr(self, field: str, years: int, basis: str = 'ttm') -> np.ndarray:
+        """
+        复合年化增长率 (%): (本期 / years 年前同期)^(1 / years) - 1
+
+        起点或终点不为正时为 NaN
+        """
+        current = self.series(field, basis)
+        start = self.lag(current, 4 * years)
+        ok = (current > 0) & (start > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            growth = (np.power(current / start, 1.0 / years) - 1) * 100
+        return np.where(ok, growth, np.nan)
+
+    # =========================================================================
+    # 输出
+    # =========================================================================
+
+    def build(
+        self,
+        fields: Optional[List[str]] = None,
+        bases: Sequence[str] = ('q', 'ttm')
+    ) -> pd.DataFrame:
+        """
+        生成加工后的财报长表
+
+        Args:
+            fields: 字段 (默认全部)
+            bases: 输出的口径
+
+        Returns:
+            DataFrame: ts_code, end_date, ann_date, 以及每个字段的
+                {field} (YTD)、{field}_{basis}、{field}_{basis}_yoy
+        """
+        result = self.frame[self.key_cols].copy()
+        columns = {}
+        for field in fields or self.fields:
+            columns[field] = self.ytd(field)
+            for basis in bases:
+                name = field if basis == 'ytd' else f'{field}_{basis}'
+                columns[name] = self.series(field, basis)
+                columns[f'{name}_yoy'] = self.yoy(field, basis)
+        return pd.concat([result, pd.DataFrame(columns, index=result.index)], axis=1)
+
+    def locate(self, ts_codes: Sequence[str], end_dates: Sequence) -> np.ndarray:
+        """
+        定位 (ts_code, end_date) 在引擎中的行号
+
+        Returns:
+            行号数组，不存在时为 -1
+        """
+        code_idx = self._codes.get_indexer(pd.Index(ts_codes)).astype(np.int64)
+        period = _to_int_dates(end_dates)
+        month = period // 100 % 100
+        target = code_idx * _PERIOD_BASE + (period // 10000) * 4 + month // 3 - 1
+        idx = self._find(target)
+        valid = (code_idx >= 0) & (period > 0) & (month % 3 == 0)
+        return np.where(valid, idx, -1)
+
+    def align(
+        self,
+        values: np.ndarray,
+        ts_codes: Sequence[str],
+        end_dates: Sequence
+    ) -> np.ndarray:
+        """将引擎行上的数组对齐到给定的 (ts_code, end_date)，缺失为 NaN"""
+        idx = self.locate(ts_codes, end_dates)
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return np.full(len(idx), np.nan)
+        return np.where(idx >= 0, values[np.maximum(idx, 0)], np.nan)
@@ -3,12 +3,12 @@
 
 from .config import load_config, get_config
 from .logger import setup_logger, get_logger
-from .io import save_parquet, load_parquet, ensure_dir
+from .io import save_parquet, load_parquet, load_parquet_dataset, ensure_dir
 from .calendar import TradingCalendar
 
 __all__ = [
     'load_config', 'get_config',
     'setup_logger', 'get_logger',
-    'save_parquet', 'load_parquet', 'ensure_dir',
+    'save_parquet', 'load_parquet', 'load_parquet_dataset', 'ensure_dir',
     'TradingCalendar',
 ]
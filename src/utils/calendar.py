@@ -1,150 +1,315 @@
-# src/utils/calendar.py
 """交易日历工具"""
 
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 from typing import List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
 
+DateLike = Union[str, int, datetime, date]
+
+
+def _to_int(dates) -> np.ndarray:
+    """
+    将日期 (YYYYMMDD / YYYY-MM-DD 字符串、整数、datetime、Timestamp) 转为 int64 YYYYMMDD
+
+    Args:
+        dates: 单个日期或日期序列
+
+    Returns:
+        int64 数组 (单个日期时为 0 维数组)，无法解析的日期为 -1
+    """
+    scalar = np.ndim(dates) == 0
+    values = pd.Series([dates] if scalar else dates)
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        out = (values.dt.year * 10000 + values.dt.month * 100 + values.dt.day) \
+            .fillna(-1).to_numpy(dtype=np.int64)
+    elif pd.api.types.is_integer_dtype(values):
+        out = values.to_numpy(dtype=np.int64)
+    elif len(values) and isinstance(values.iloc[0], (datetime, date)):
+        out = _to_int(pd.to_datetime(values))
+    else:
+        try:
+            out = values.to_numpy().astype(np.int64)
+        except (TypeError, ValueError):
+            out = pd.to_numeric(
+                values.astype(str).str.replace('-', '', regex=False), errors='coerce'
+            ).fillna(-1).to_numpy(dtype=np.int64)
+    return out[0] if scalar else out
+
+
 class TradingCalendar:
-    """A股交易日历"""
-    
+    """
+    A股交易日历
+
+    交易日以有序 int64 (YYYYMMDD) 数组保存，所有查询均为 np.searchsorted，
+    单次调用复杂度 O(log n)，数组接口 (shift / ordinal / between_count) 一次处理任意多个日期
+    """
+
     def __init__(self, trade_dates: Optional[List[str]] = None):
         """
         初始化交易日历
-        
+
         Args:
             trade_dates: 交易日期列表 (格式: YYYYMMDD)
                         如为 None，将从数据文件加载
         """
-        self._trade_dates = None
-        
+        self._days: Optional[np.ndarray] = None
+        self._trade_dates: Optional[pd.DatetimeIndex] = None
+
         if trade_dates is not None:
-            self._trade_dates = pd.to_datetime(trade_dates, format='%Y%m%d')
-            self._trade_dates = pd.DatetimeIndex(sorted(self._trade_dates))
-    
+            self._set_dates(trade_dates)
+
+    def _set_dates(self, trade_dates) -> None:
+        """设置交易日并预计算月末、季末位置"""
+        days = np.unique(_to_int(trade_dates))
+        self._days = days[days > 0]
+        self._trade_dates = pd.DatetimeIndex(
+            pd.to_datetime(self._days.astype(str), format='%Y%m%d')
+        )
+
+        # 下一个交易日跨月 (跨季) 即为月末 (季末) 交易日，最后一个交易日视为期末
+        month = self._days // 100
+        quarter = (month // 100) * 10 + (month % 100 - 1) // 3
+        self._is_month_end = np.append(month[1:] != month[:-1], True) if len(month) else \
+            np.zeros(0, dtype=bool)
+        self._is_quarter_end = np.append(quarter[1:] != quarter[:-1], True) if len(quarter) else \
+            np.zeros(0, dtype=bool)
+        self._month_end_pos = np.flatnonzero(self._is_month_end)
+        self._quarter_end_pos = np.flatnonzero(self._is_quarter_end)
+
+        # 直接寻址表: 日历范围内每个 YYYYMMDD 整数 -> searchsorted(side='right') 结果，
+        # 批量查询时以一次下标索引代替二分查找
+        if len(self._days):
+            self._base = int(self._days[0])
+            span = np.arange(self._base, int(self._days[-1]) + 1, dtype=np.int64)
+            self._right_table = np.searchsorted(self._days, span, side='right').astype(np.int64)
+            self._exact_table = np.zeros(len(span), dtype=bool)
+            self._exact_table[self._days - self._base] = True
+
     def load_from_file(self, path: str) -> 'TradingCalendar':
         """从文件加载交易日历"""
-        df = pd.read_parquet(path)
-        self._trade_dates = pd.to_datetime(df['trade_date'], format='%Y%m%d')
-        self._trade_dates = pd.DatetimeIndex(sorted(self._trade_dates))
+        df = pd.read_parquet(path, columns=['trade_date'])
+        self._set_dates(df['trade_date'])
         return self
-    
-    def is_trade_date(self, dt: Union[str, datetime, date]) -> bool:
-        """判断是否为交易日"""
-        if self._trade_dates is None:
+
+    def _check(self) -> np.ndarray:
+        if self._days is None:
             raise ValueError("交易日历未初始化")
-        
-        if isinstance(dt, str):
-            dt = pd.to_datetime(dt)
-        elif isinstance(dt, date) and not isinstance(dt, datetime):
-            dt = pd.Timestamp(dt)
-        
-        return dt in self._trade_dates
-    
+        return self._days
+
+    def _locate(self, q: np.ndarray) -> tuple:
+        """
+        批量定位日期
+
+        Returns:
+            (left, right, exact): 等价于 searchsorted 的 left/right 插入点与是否为交易日
+        """
+        days = self._check()
+        q = np.asarray(q, dtype=np.int64)
+        if not len(days):
+            zeros = np.zeros(np.shape(q), dtype=np.int64)
+            return zeros, zeros, zeros.astype(bool)
+
+        offset = q - self._base
+        inside = (offset >= 0) & (offset < len(self._right_table))
+        safe = np.where(inside, offset, 0)
+        right = np.where(inside, self._right_table[safe], np.where(offset < 0, 0, len(days)))
+        exact = inside & self._exact_table[safe]
+        return right - exact, right, exact
+
+    def __len__(self) -> int:
+        return 0 if self._days is None else len(self._days)
+
+    @property
+    def days(self) -> np.ndarray:
+        """全部交易日 (int64 YYYYMMDD)"""
+        return self._check()
+
+    # =========================================================================
+    # 单日期接口
+    # =========================================================================
+
+    def is_trade_date(self, dt: DateLike) -> bool:
+        """判断是否为交易日"""
+        return bool(self.is_trade_dates([dt])[0])
+
     def get_trade_dates(
-        self, 
-        start_date: str, 
+        self,
+        start_date: str,
         end_date: str
     ) -> pd.DatetimeIndex:
         """
         获取日期范围内的交易日
-        
+
         Args:
             start_date: 开始日期 (YYYYMMDD 或 YYYY-MM-DD)
             end_date: 结束日期
-            
+
         Returns:
             交易日 DatetimeIndex
         """
-        if self._trade_dates is None:
-            raise ValueError("交易日历未初始化")
-        
-        start = pd.to_datetime(start_date)
-        end = pd.to_datetime(end_date)
-        
-        mask = (self._trade_dates >= start) & (self._trade_dates <= end)
-        return self._trade_dates[mask]
-    
+        lo, hi = self._range(start_date, end_date)
+        return self._trade_dates[lo:hi]
+
     def get_prev_trade_date(
-        self, 
-        dt: Union[str, datetime], 
+        self,
+        dt: Union[str, datetime],
         n: int = 1
     ) -> datetime:
         """
         获取前 n 个交易日
-        
+
         Args:
             dt: 当前日期
             n: 向前推移的交易日数
-            
+
         Returns:
             前 n 个交易日
         """
-        if self._trade_dates is None:
-            raise ValueError("交易日历未初始化")
-        
-        if isinstance(dt, str):
-            dt = pd.to_datetime(dt)
-        
-        # 找到当前日期之前的交易日
-        prev_dates = self._trade_dates[self._trade_dates < dt]
-        
-        if len(prev_dates) < n:
+        pos = int(self._locate(_to_int(dt))[0]) - n
+        if pos < 0:
             raise ValueError(f"没有足够的历史交易日 (需要 {n} 天)")
-        
-        return prev_dates[-n]
-    
+        return self._trade_dates[pos]
+
     def get_next_trade_date(
-        self, 
-        dt: Union[str, datetime], 
+        self,
+        dt: Union[str, datetime],
         n: int = 1
     ) -> datetime:
         """
         获取后 n 个交易日
-        
+
         Args:
             dt: 当前日期
             n: 向后推移的交易日数
-            
+
         Returns:
             后 n 个交易日
         """
-        if self._trade_dates is None:
-            raise ValueError("交易日历未初始化")
-        
-        if isinstance(dt, str):
-            dt = pd.to_datetime(dt)
-        
-        # 找到当前日期之后的交易日
-        next_dates = self._trade_dates[self._trade_dates > dt]
-        
-        if len(next_dates) < n:
+        pos = int(self._locate(_to_int(dt))[1]) + n - 1
+        if pos >= len(self._days):
             raise ValueError(f"没有足够的未来交易日 (需要 {n} 天)")
-        
-        return next_dates[n - 1]
-    
+        return self._trade_dates[pos]
+
+    def _range(self, start_date: DateLike, end_date: DateLike) -> tuple:
+        """[start_date, end_date] 对应的交易日位置区间 [lo, hi)"""
+        days = self._check()
+        lo = int(np.searchsorted(days, _to_int(start_date), side='left'))
+        hi = int(np.searchsorted(days, _to_int(end_date), side='right'))
+        return lo, max(lo, hi)
+
     def get_month_end_trade_dates(
-        self, 
-        start_date: str, 
+        self,
+        start_date: str,
         end_date: str
     ) -> pd.DatetimeIndex:
-        """获取月末交易日"""
-        trade_dates = self.get_trade_dates(start_date, end_date)
-        df = pd.DataFrame({'date': trade_dates})
-        df['month'] = df['date'].dt.to_period('M')
-        month_ends = df.groupby('month')['date'].last()
-        return pd.DatetimeIndex(month_ends.values)
-    
+        """获取月末交易日 (区间最后一个交易日总是包含在内)"""
+        lo, hi = self._range(start_date, end_date)
+        mask = self._is_month_end[lo:hi].copy()
+        if len(mask):
+            mask[-1] = True
+        return self._trade_dates[lo:hi][mask]
+
     def get_quarter_end_trade_dates(
-        self, 
-        start_date: str, 
+        self,
+        start_date: str,
         end_date: str
     ) -> pd.DatetimeIndex:
-        """获取季末交易日"""
-        trade_dates = self.get_trade_dates(start_date, end_date)
-        df = pd.DataFrame({'date': trade_dates})
-        df['quarter'] = df['date'].dt.to_period('Q')
-        quarter_ends = df.groupby('quarter')['date'].last()
-        return pd.DatetimeIndex(quarter_ends.values)
+        """获取季末交易日 (区间最后一个交易日总是包含在内)"""
+        lo, hi = self._range(start_date, end_date)
+        mask = self._is_quarter_end[lo:hi].copy()
+        if len(mask):
+            mask[-1] = True
+        return self._trade_dates[lo:hi][mask]
+
+    # =========================================================================
+    # 数组接口
+    # =========================================================================
+
+    def is_trade_dates(self, dates) -> np.ndarray:
+        """
+        批量判断是否为交易日
+
+        Args:
+            dates: 日期序列
+
+        Returns:
+            bool 数组
+        """
+        return self._locate(_to_int(dates))[2]
+
+    def ordinal(self, dates) -> np.ndarray:
+        """
+        交易日序号: 不晚于该日期的最近一个交易日在日历中的位置
+
+        Args:
+            dates: 日期序列
+
+        Returns:
+            int64 数组，早于日历起点的日期为 -1
+        """
+        return self._locate(_to_int(dates))[1] - 1
+
+    def shift(self, dates, n: Union[int, np.ndarray]) -> np.ndarray:
+        """
+        批量平移交易日
+
+        n < 0 与 get_prev_trade_date(dt, -n) 一致，n > 0 与 get_next_trade_date(dt, n) 一致，
+        n == 0 返回不晚于该日期的最近交易日
+
+        Args:
+            dates: 日期序列
+            n: 平移的交易日数 (整数或与 dates 等长的数组)
+
+        Returns:
+            int64 YYYYMMDD 数组，超出日历范围为 -1
+        """
+        days = self._check()
+        left, right, _ = self._locate(_to_int(dates))
+        n = np.asarray(n, dtype=np.int64)
+        pos = np.where(n < 0, left + n, np.where(n > 0, right + n - 1, right - 1))
+
+        if not len(days):
+            return np.full(np.shape(pos), -1, dtype=np.int64)
+        valid = (pos >= 0) & (pos < len(days))
+        return np.where(valid, days[np.clip(pos, 0, len(days) - 1)], -1)
+
+    def between_count(self, start_dates, end_dates) -> np.ndarray:
+        """
+        批量统计 [start, end] 闭区间内的交易日数
+
+        Args:
+            start_dates: 开始日期序列
+            end_dates: 结束日期序列 (与 start_dates 等长或为单个日期)
+
+        Returns:
+            int64 数组
+        """
+        lo = self._locate(_to_int(start_dates))[0]
+        hi = self._locate(_to_int(end_dates))[1]
+        return np.maximum(hi - lo, 0)
+
+    def is_month_end(self, dates) -> np.ndarray:
+        """批量判断是否为月末交易日"""
+        _, right, exact = self._locate(_to_int(dates))
+        return exact & self._is_month_end[np.maximum(right - 1, 0)]
+
+    def is_quarter_end(self, dates) -> np.ndarray:
+        """批量判断是否为季末交易日"""
+        _, right, exact = self._locate(_to_int(dates))
+        return exact & self._is_quarter_end[np.maximum(right - 1, 0)]
+
+    @property
+    def month_end_positions(self) -> np.ndarray:
+        """月末交易日在日历中的位置"""
+        self._check()
+        return self._month_end_pos
+
+    @property
+    def quarter_end_positions(self) -> np.ndarray:
+        """季末交易日在日历中的位置"""
+        self._check()
+        return self._quarter_end_pos
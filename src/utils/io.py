@@ -84,6 +84,50 @@ def load_parquet(
     )
 
 
+def load_parquet_dataset(
+    paths: List[Union[str, Path]],
+    columns: Optional[List[str]] = None,
+    filters: Optional[List] = None,
+    schema=None
+) -> pd.DataFrame:
+    """
+    将多个 Parquet 文件作为一个数据集读取
+    
+    列投影与过滤条件下推到 PyArrow，只读取需要的列和行组
+    
+    Args:
+        paths: 文件路径列表
+        columns: 要读取的列
+        filters: 过滤条件 (PyArrow DNF 格式，同 load_parquet)
+        schema: 数据集 schema (pyarrow.Schema，各文件按其转换类型)；
+                None 时合并全部文件的 schema
+        
+    Returns:
+        DataFrame
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    
+    paths = [str(p) for p in paths]
+    if not paths:
+        return pd.DataFrame(columns=columns)
+    
+    if schema is None:
+        schema = pa.unify_schemas(
+            [pq.read_schema(p) for p in paths],
+            promote_options='permissive'
+        )
+    
+    if columns is not None:
+        columns = [c for c in columns if c in schema.names]
+    
+    dataset = ds.dataset(paths, schema=schema, format='parquet')
+    expression = pq.filters_to_expression(filters) if filters else None
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas()
+
+
 def list_parquet_files(directory: Union[str, Path]) -> List[Path]:
     """
     列出目录下所有 Parquet 文件
@@ -0,0 +1,24 @@
+"""测试公共夹具"""
+
+import pytest
+
+from src.utils import config
+
+
+@pytest.fixture
+def project_config(tmp_path, monkeypatch):
+    """把配置与数据目录指向临时目录"""
+    cfg = {
+        '_project_root': str(tmp_path),
+        'tushare': {'token': 'test', 'max_workers': 2},
+        'paths': {
+            'data_raw': 'data/raw',
+            'data_processed': 'data/processed',
+            'data_meta': 'data/meta',
+            'logs': 'logs',
+        },
+        'data': {'start_date': '2023-01-01'},
+        'logging': {'file_enabled': False, 'console_enabled': False},
+    }
+    monkeypatch.setattr(config, '_config_cache', cfg)
+    return cfg
@@ -0,0 +1,61 @@
+"""DataHub 本地数据湖读取测试"""
+
+import pandas as pd
+import pytest
+
+from src.data_source.datahub import DataHub
+
+
+CODES = ['000001.SZ', '600000.SH']
+
+
+class StubSource:
+    """记录调用的 Tushare 替身"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_trade_calendar(self, start_date=None, end_date=None):
+        days = pd.date_range(start_date or '20230101', end_date or '20231231')
+        return pd.DataFrame({
+            'cal_date': days.strftime('%Y%m%d'),
+            'is_open': (days.dayofweek < 5).astype(int),
+        })
+
+    def get_daily(self, ts_code=None, trade_date=None, start_date=None, end_date=None):
+        self.calls.append((ts_code, trade_date, start_date, end_date))
+        if trade_date is None:
+            return pd.DataFrame()
+        return pd.DataFrame({
+            'ts_code': CODES,
+            'trade_date': trade_date,
+            'close': [10.0, 20.0],
+        })
+
+
+@pytest.fixture
+def hub(project_config):
+    hub = DataHub()
+    hub._ts_source = StubSource()
+    return hub
+
+
+def test_get_daily_served_from_sync_market(hub):
+    hub.sync_market('20230102', '20230331', datasets=('daily',))
+    hub.ts.calls.clear()
+
+    df = hub.get_daily(ts_code='000001.SZ', start_date='20230201', end_date='20230228')
+
+    assert hub.ts.calls == []
+    assert len(df) == 20
+    assert set(df['ts_code']) == {'000001.SZ'}
+    assert df['trade_date'].is_monotonic_decreasing
+
+
+def test_get_daily_fetches_only_uncovered_range(hub):
+    hub.sync_market('20230102', '20230331', datasets=('daily',))
+    hub.ts.calls.clear()
+
+    hub.get_daily(ts_code='000001.SZ', start_date='20230301', end_date='20230410')
+
+    assert hub.ts.calls == [('000001.SZ', None, '20230401', '20230410')]
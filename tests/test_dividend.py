@@ -0,0 +1,21 @@
+"""分红历史面板测试"""
+
+import numpy as np
+import pandas as pd
+
+from src.factors.dividend import DividendFactors
+
+
+def test_build_dps_panel_without_implemented_events():
+    events = pd.DataFrame({
+        'ts_code': ['000001.SZ', '000001.SZ', '600000.SH'],
+        'end_date': ['20201231', '20211231', '20221231'],
+        'div_proc': ['预案', '股东大会通过', '预案'],
+        'cash_div_tax': [0.1, 0.2, 0.3],
+    })
+
+    panel = DividendFactors().build_dps_panel(events)
+
+    assert panel.index.tolist() == [2020, 2021, 2022]
+    np.testing.assert_array_equal(panel['000001.SZ'].to_numpy(), [0.0, 0.0, 0.0])
+    np.testing.assert_array_equal(panel['600000.SH'].to_numpy(), [np.nan, np.nan, 0.0])
@@ -0,0 +1,38 @@
+"""成长因子同比口径测试"""
+
+import numpy as np
+import pandas as pd
+
+from src.factors.growth import GrowthFactors
+
+
+PERIODS = ['20220331', '20220630', '20220930', '20221231',
+           '20230331', '20230630', '20230930', '20231231']
+
+
+def _income(net_profit):
+    return pd.DataFrame({
+        'ts_code': '000001.SZ', 'end_date': PERIODS, 'net_profit': net_profit,
+    })
+
+
+def test_profit_yoy_negative_base_matches_fallback(project_config):
+    df = _income([-10.0, -20.0, -30.0, -40.0, 5.0, 10.0, 15.0, 20.0])
+    growth = GrowthFactors()
+
+    keyed = growth.calc_profit_yoy(df)
+    fallback = growth.calc_profit_yoy(df[['net_profit']])
+
+    np.testing.assert_allclose(keyed.iloc[4:], [-150.0] * 4)
+    pd.testing.assert_series_equal(keyed, fallback, check_names=False)
+
+
+def test_profit_yoy_zero_base_matches_fallback(project_config):
+    df = _income([0.0, 1.0, 2.0, 3.0, 5.0, 1.0, 2.0, 6.0])
+    growth = GrowthFactors()
+
+    keyed = growth.calc_profit_yoy(df)
+    fallback = growth.calc_profit_yoy(df[['net_profit']])
+
+    assert np.isinf(keyed.iloc[4])
+    pd.testing.assert_series_equal(keyed, fallback, check_names=False)
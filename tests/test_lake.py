@@ -0,0 +1,111 @@
+"""ParquetLake 布局路由与 schema 测试"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.data_source.catalog import MARKET_CODE
+from src.data_source.coverage import CoverageIndex
+from src.data_source.lake import ParquetLake
+
+
+CODES = ['000001.SZ', '000002.SZ', '600000.SH']
+
+
+def _daily(dates, codes=CODES):
+    return pd.DataFrame(
+        [(c, d, 10.0 + i) for i, d in enumerate(dates) for c in codes],
+        columns=['ts_code', 'trade_date', 'close']
+    )
+
+
+@pytest.fixture
+def lake(tmp_path):
+    coverage = CoverageIndex(tmp_path / 'meta' / 'coverage.parquet')
+    lake = ParquetLake(tmp_path / 'raw', coverage=coverage)
+
+    # 按股票分区: 完整历史
+    history = pd.bdate_range('2023-01-02', '2023-12-29').strftime('%Y%m%d').tolist()
+    for code, group in _daily(history).groupby('ts_code'):
+        lake.write_stock('daily', code, group)
+        coverage.add('daily', code, history[0], history[-1])
+
+    # 按交易日分区: 只有最近几天
+    for trade_date, group in _daily(history[-3:]).groupby('trade_date'):
+        lake.write_date('daily', trade_date, group)
+    coverage.add('daily', MARKET_CODE, history[-3], history[-1])
+
+    lake.history = history
+    return lake
+
+
+def test_partial_by_date_not_chosen_for_long_range(lake):
+    history = lake.history
+    assert lake.choose_layout('daily', start_date=history[0]) == 'by_stock'
+    assert lake.choose_layout('daily') == 'by_stock'
+
+    df = lake.query('daily', start_date=history[0], end_date=history[-1])
+    assert len(df) == len(history) * len(CODES)
+    assert df['trade_date'].min() == history[0]
+
+
+def test_partial_by_date_chosen_when_covered(lake):
+    history = lake.history
+    assert lake.choose_layout('daily', start_date=history[-2]) == 'by_date'
+
+
+def test_merges_layouts_when_neither_covers(lake, tmp_path):
+    history = lake.history
+    # 新交易日只落地到按交易日分区
+    new_date = '20240102'
+    lake.write_date('daily', new_date, _daily([new_date]))
+    lake.coverage.add('daily', MARKET_CODE, history[-2], new_date)
+
+    assert lake.choose_layout('daily', ts_codes=CODES[:1]) == 'both'
+    df = lake.query('daily', ts_codes=CODES[:1])
+    assert df['trade_date'].tolist() == history + [new_date]
+
+
+def test_without_coverage_merges_layouts(lake):
+    uncovered = ParquetLake(lake.root)
+    df = uncovered.query('daily', start_date=lake.history[0])
+    assert len(df) == len(lake.history) * len(CODES)
+
+
+def test_fixed_schema_across_files(tmp_path):
+    lake = ParquetLake(tmp_path / 'raw')
+    dates = pd.bdate_range('2024-01-01', periods=30).strftime('%Y%m%d').tolist()
+    for i, trade_date in enumerate(dates):
+        df = _daily([trade_date])
+        # 中间文件的 pe 列全空，其余文件为浮点
+        df['pe'] = None if i == 15 else 12.5
+        df['vol'] = 100
+        lake.write_date('daily', trade_date, df)
+
+    schema = lake.dataset_schema('daily')
+    assert schema.field('pe').type == pa.float64()
+    assert schema.field('vol').type == pa.float64()
+
+    df = lake.query('daily', layout='by_date')
+    assert len(df) == len(dates) * len(CODES)
+    assert df['pe'].isna().sum() == len(CODES)
+    assert ParquetLake(tmp_path / 'raw').dataset_schema('daily') == schema
+
+
+def test_legacy_schema_inferred_from_all_files(tmp_path):
+    lake = ParquetLake(tmp_path / 'raw')
+    dates = pd.bdate_range('2024-01-01', periods=20).strftime('%Y%m%d').tolist()
+    for i, trade_date in enumerate(dates):
+        df = _daily([trade_date])
+        # 旧版本把全空列写为 string
+        pe = pa.array([None] * len(df), pa.string()) if i == 10 \
+            else pa.array([12.5] * len(df))
+        table = pa.Table.from_pandas(df, preserve_index=False).append_column('pe', pe)
+        path = lake.date_path('daily', trade_date)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, path)
+
+    assert lake.dataset_schema('daily').field('pe').type == pa.float64()
+    df = lake.query('daily', layout='by_date')
+    assert df['pe'].isna().sum() == len(CODES)
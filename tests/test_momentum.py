@@ -0,0 +1,14 @@
+"""动量引擎测试"""
+
+import logging
+
+from src.factors.momentum import MomentumEngine
+
+
+def test_skip_renames_factors_and_warns_on_dropped_windows(project_config, caplog):
+    with caplog.at_level(logging.WARNING, logger='momentum'):
+        engine = MomentumEngine(windows=[21, 63, 126], skip=21)
+
+    assert engine.windows == [63, 126]
+    assert engine.factor_names() == ['factor_ret_3m_skip21', 'factor_ret_6m_skip21']
+    assert '[21]' in caplog.text
@@ -0,0 +1,28 @@
+"""PanelStore 追加测试"""
+
+import numpy as np
+import pandas as pd
+
+from src.data_source.panel_store import PanelStore
+
+
+def _close(dates, codes, start):
+    values = np.arange(len(dates) * len(codes), dtype=float).reshape(len(dates), -1)
+    return pd.DataFrame(values + start, index=dates, columns=codes)
+
+
+def test_append_discards_bytes_from_interrupted_append(tmp_path):
+    codes = ['000001.SZ', '600000.SH']
+    store = PanelStore(tmp_path / 'panels')
+    directory = store.write({'close': _close(['20240102', '20240103'], codes, 0)})
+
+    # 模拟上次追加在写数据之后、写元数据之前中断
+    with open(directory / 'close.f32', 'ab') as f:
+        np.full(len(codes), 999, dtype=np.float32).tofile(f)
+
+    store.append({'close': _close(['20240104'], codes, 100)})
+
+    panel = store.frame('close')
+    assert panel.index.tolist() == ['20240102', '20240103', '20240104']
+    np.testing.assert_array_equal(panel.loc['20240104'].to_numpy(), [100, 101])
+    assert (directory / 'close.f32').stat().st_size == 3 * len(codes) * 4
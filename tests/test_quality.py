@@ -0,0 +1,21 @@
+"""质量因子滚动统计测试"""
+
+import numpy as np
+import pandas as pd
+
+from src.factors.quality import QualityFactors
+
+
+def test_roe_rolling_last_row_matches_tail_on_short_history():
+    rng = np.random.default_rng(0)
+    roe = pd.DataFrame(rng.normal(10, 2, size=(6, 3)), columns=['a', 'b', 'c'])
+    roe.iloc[:5, 2] = np.nan  # 只有 1 期有效值
+    quality = QualityFactors()
+
+    window = quality.roe_years * 4
+    pd.testing.assert_series_equal(
+        quality.calc_roe_stability(roe).iloc[-1], roe.tail(window).std(), check_names=False
+    )
+    pd.testing.assert_series_equal(
+        quality.calc_roe_mean(roe).iloc[-1], roe.tail(window).mean(), check_names=False
+    )